@@ -0,0 +1,425 @@
+"""JSON API behind student_login.html, student_register.py and student_dashboard.html
+
+An ASGI app (Starlette) serving the /api/student/* routes on port 5000:
+
+    POST /api/student/register                 create a student, returns {token, user}
+    POST /api/student/login                    returns {token, user}
+    GET  /api/student/dashboard                the whole dashboard payload in one response
+    GET  /api/student/skills                   skills, skill gaps and recommendations
+    POST /api/student/skills                   replace the student's skills
+    POST /api/student/interview/start          returns {interview_id, questions}
+    POST /api/student/interview/{id}/submit    evaluate {answers}
+    GET  /metrics                              instrumentation, Prometheus text format
+    GET  /api/metrics                          instrumentation snapshot as JSON
+
+The metrics routes are not for the pages: with PLACEMENTPRO_METRICS_TOKEN
+set they need `Authorization: Bearer <token>`, otherwise they only answer
+same-host requests that carry no Origin header (so no page can read them
+through the CORS policy).
+
+SQLite calls are blocking, so every one runs on a worker thread through
+run_db(), limited to database.POOL_SIZE at once so threads never queue
+inside the connection pool. The dashboard is built by one thread hop
+(one pooled connection, one analyzer pass) and kept in a per-student
+cache until the student writes or DASHBOARD_TTL runs out; with
+PLACEMENTPRO_SNAPSHOT_DIR set, standards, readiness and course rankings
+come from the nightly cohort_snapshot while the student's skills are
+unchanged since it was built; responses carry
+an ETag so the browser can revalidate without receiving the body again.
+Password hashing runs on auth.PasswordHasher's pool; every request after
+login is authenticated by its signed auth.TokenSigner token alone.
+
+Set PLACEMENTPRO_METRICS=1 to collect metrics (see instrumentation.py)
+and PLACEMENTPRO_PROFILE=<path> to sample the server's stacks while it
+runs and write them to <path> as collapsed stacks on shutdown.
+
+    python api.py                # or: uvicorn api:app --port 5000
+"""
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial
+from typing import Dict, Optional, Tuple
+
+import anyio
+import anyio.to_thread
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+import cohort_snapshot
+import database
+import instrumentation
+from auth import HasherBusy, PasswordHasher, TokenSigner
+from interview_store import AlreadyAnswered, InterviewStore
+from mock_interview_engine import MockInterviewEngine
+from profiles import STUDENT_PROFILE_FIELDS, save_student_profile
+from skill_analyzer import get_analyzer
+from student_skills import set_student_skills
+
+API_HOST = os.getenv('PLACEMENTPRO_API_HOST', '127.0.0.1')
+API_PORT = int(os.getenv('PLACEMENTPRO_API_PORT', '5000'))
+# Scratch databases for benchmarks; app.db otherwise
+API_DB = os.getenv('PLACEMENTPRO_DB')
+PROFILE_PATH = os.getenv('PLACEMENTPRO_PROFILE')
+# Bearer token for the metrics routes; unset limits them to same-host scrapers
+METRICS_TOKEN = os.getenv('PLACEMENTPRO_METRICS_TOKEN')
+LOOPBACK_HOSTS = {'127.0.0.1', '::1', 'localhost'}
+
+# Seconds a cached dashboard is served when the student wrote nothing; 0 disables the cache
+DASHBOARD_TTL = float(os.getenv('PLACEMENTPRO_DASHBOARD_TTL', '30'))
+DASHBOARD_CACHE_ENTRIES = 10000
+INTERVIEW_QUESTIONS = 5
+DEFAULT_TARGET_ROLE = 'Data Scientist'
+
+
+class APIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# -- Dashboard cache -------------------------------------------------------
+
+class DashboardCache:
+    """Serialized dashboard payloads per student: user_id -> (expires_at, etag, payload, body)
+
+    Writes through the API call invalidate(); DASHBOARD_TTL bounds how long
+    writes made elsewhere (another worker, the Streamlit pages) go unseen.
+    """
+
+    def __init__(self, ttl: float = DASHBOARD_TTL, max_entries: int = DASHBOARD_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = self.misses = 0
+
+    def get(self, user_id: int) -> Optional[Tuple[str, Dict, bytes]]:
+        entry = self.entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1:]
+
+    def put(self, user_id: int, payload: Dict) -> Tuple[str, Dict, bytes]:
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        if len(self.entries) >= self.max_entries:
+            # Dicts keep insertion order; drop the oldest entry
+            self.entries.pop(next(iter(self.entries)), None)
+        self.entries[user_id] = (time.monotonic() + self.ttl, etag, payload, body)
+        return etag, payload, body
+
+    def invalidate(self, user_id: int) -> None:
+        self.entries.pop(user_id, None)
+
+    def stats(self) -> Dict:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+# -- Blocking work, run on worker threads ------------------------------------
+
+def _user_json(row: Tuple) -> Dict:
+    user_id, email, full_name, role = row
+    return {'id': user_id, 'email': email, 'full_name': full_name, 'role': role}
+
+
+def find_login(email: str) -> Optional[Tuple]:
+    with database.connection() as conn:
+        return conn.execute(
+            "SELECT id, email, full_name, role, password_hash FROM users WHERE email = ?",
+            (database.normalize_email(email),)
+        ).fetchone()
+
+
+def record_login(user_id: int, password_hash: Optional[str] = None) -> None:
+    """Stamp last_login, replacing the password hash when it was upgraded"""
+    with database.transaction() as conn:
+        if password_hash is None:
+            conn.execute("UPDATE users SET last_login = ? WHERE id = ?", (datetime.now().isoformat(), user_id))
+        else:
+            conn.execute(
+                "UPDATE users SET last_login = ?, password_hash = ? WHERE id = ?",
+                (datetime.now().isoformat(), password_hash, user_id)
+            )
+
+
+def create_student(email: str, full_name: str, password_hash: str, profile: Dict) -> Dict:
+    """Insert the user and their profile; raises APIError(409) for a taken email"""
+    email = database.normalize_email(email)
+    try:
+        with database.transaction() as conn:
+            user_id = conn.execute(
+                "INSERT INTO users (email, password_hash, full_name, role, created_at) VALUES (?, ?, ?, 'student', ?)",
+                (email, password_hash, full_name, datetime.now().isoformat())
+            ).lastrowid
+    except sqlite3.IntegrityError:
+        raise APIError(409, 'An account with this email already exists')
+    save_student_profile(user_id, **profile)
+    return {'id': user_id, 'email': email, 'full_name': full_name, 'role': 'student'}
+
+
+def build_dashboard(user_id: int) -> Dict:
+    """Everything student_dashboard.html shows, from one pooled connection"""
+    with database.connection() as conn:
+        user = conn.execute("SELECT id, email, full_name, role FROM users WHERE id = ?", (user_id,)).fetchone()
+        if user is None:
+            raise APIError(404, 'Unknown user')
+        profile = conn.execute(
+            f"SELECT {', '.join(STUDENT_PROFILE_FIELDS)} FROM student_profiles WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        skills = conn.execute(
+            "SELECT skill, proficiency, category FROM student_skills WHERE user_id = ? ORDER BY skill", (user_id,)
+        ).fetchall()
+        interviews, score_sum, scored = conn.execute("""
+            SELECT COUNT(*), TOTAL(score_sum), TOTAL(scored_count)
+            FROM interview_sessions
+            WHERE user_id = ? AND status = 'completed'
+        """, (user_id,)).fetchone()
+
+    profile = dict(zip(STUDENT_PROFILE_FIELDS, profile)) if profile else None
+    skills = [{'skill_name': skill, 'proficiency': proficiency, 'category': category}
+              for skill, proficiency, category in skills]
+    target_role = (profile or {}).get('target_role') or DEFAULT_TARGET_ROLE
+
+    analyzer = get_analyzer()
+    matrix = analyzer.build_skill_matrix([skills])
+    snapshot = cohort_snapshot.current()
+    stored = snapshot.precomputed(user_id, matrix[0], target_role, analyzer) if snapshot else None
+    if stored is None:
+        standards = analyzer.nearest_standards(matrix, target_role)
+        placement_score = analyzer.readiness(matrix, standards)[0]
+        slot_skills, courses = analyzer.rank_courses(matrix, standards)
+    else:
+        standards, placement_score = stored['standards'], stored['readiness']
+        slot_skills, courses = stored['slot_skills'], stored['courses']
+    skill_gaps = analyzer.analyze_matrix(matrix, target_role, standards)[0]
+
+    return {
+        'user': _user_json(user),
+        'profile': profile,
+        'skills': skills,
+        'skill_gaps': skill_gaps,
+        'placement_score': int(placement_score),
+        'recommendations': analyzer.recommend_ranked(matrix, standards, slot_skills, courses)[0],
+        'stats': {
+            'total_interviews': interviews,
+            'average_score': round(score_sum / scored, 1) if scored else 0.0,
+        },
+    }
+
+
+# -- Request handling --------------------------------------------------------
+
+# One worker thread per pooled connection, so no thread waits inside acquire()
+DB_LIMITER = anyio.CapacityLimiter(database.POOL_SIZE)
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking database call on a worker thread without stalling the event loop"""
+    return await anyio.to_thread.run_sync(partial(fn, *args, **kwargs), limiter=DB_LIMITER)
+
+
+async def read_json(request: Request) -> Dict:
+    try:
+        data = await request.json()
+    except ValueError:
+        raise APIError(400, 'Request body must be JSON')
+    if not isinstance(data, dict):
+        raise APIError(400, 'Request body must be a JSON object')
+    return data
+
+
+def authenticate(request: Request) -> int:
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    user_id = request.app.state.tokens.user_id(token) if scheme.lower() == 'bearer' and token else None
+    if user_id is None:
+        raise APIError(401, 'Not signed in')
+    return user_id
+
+
+def authorize_metrics(request: Request) -> None:
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get('authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+            raise APIError(401, 'Metrics token required')
+        return
+    host = request.client.host if request.client else None
+    if host not in LOOPBACK_HOSTS or 'origin' in request.headers:
+        raise APIError(403, 'Metrics are only served to local scrapers')
+
+
+async def dashboard_data(request: Request, user_id: int) -> Tuple[str, Dict, bytes]:
+    cache = request.app.state.dashboards
+    cached = cache.get(user_id)
+    if cached is not None:
+        return cached
+    return cache.put(user_id, await run_db(build_dashboard, user_id))
+
+
+def cached_json(request: Request, etag: str, body: bytes) -> Response:
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+async def register(request: Request) -> Response:
+    data = await read_json(request)
+    email = database.normalize_email(str(data.get('email') or ''))
+    full_name = str(data.get('full_name') or '').strip()
+    password = str(data.get('password') or '')
+    if not email or not full_name or not password:
+        raise APIError(400, 'Email, full name and password are required')
+
+    profile = {field: data[field] for field in STUDENT_PROFILE_FIELDS if data.get(field) not in (None, '')}
+    password_hash = await request.app.state.hasher.hash(password)
+    user = await run_db(create_student, email, full_name, password_hash, profile)
+    return JSONResponse({'token': request.app.state.tokens.issue(user['id']), 'user': user}, status_code=201)
+
+
+async def login(request: Request) -> Response:
+    data = await read_json(request)
+    email = database.normalize_email(str(data.get('email') or ''))
+    password = str(data.get('password') or '')
+
+    row = await run_db(find_login, email)
+    # Unknown emails still cost a bcrypt check, so timing doesn't reveal which accounts exist
+    matches, upgraded_hash = await request.app.state.hasher.verify_and_upgrade(password, row[4] if row else None)
+    if row is None or not matches:
+        raise APIError(401, 'Invalid email or password')
+    await run_db(record_login, row[0], upgraded_hash)
+    return JSONResponse({'token': request.app.state.tokens.issue(row[0]), 'user': _user_json(row[:4])})
+
+
+async def dashboard(request: Request) -> Response:
+    etag, _, body = await dashboard_data(request, authenticate(request))
+    return cached_json(request, etag, body)
+
+
+async def skills(request: Request) -> Response:
+    user_id = authenticate(request)
+    if request.method == 'GET':
+        _, payload, _ = await dashboard_data(request, user_id)
+        return JSONResponse({key: payload[key] for key in ('skills', 'skill_gaps', 'recommendations')})
+
+    data = await read_json(request)
+    if not isinstance(data.get('skills'), list):
+        raise APIError(400, 'skills must be a list')
+    await run_db(set_student_skills, user_id, data['skills'])
+    request.app.state.dashboards.invalidate(user_id)
+    return JSONResponse({'message': 'Skills saved'})
+
+
+async def start_interview(request: Request) -> Response:
+    user_id = authenticate(request)
+    _, payload, _ = await dashboard_data(request, user_id)
+    interview = await run_db(request.app.state.engine.start_interview, user_id, payload['skill_gaps'], INTERVIEW_QUESTIONS)
+    return JSONResponse(interview)
+
+
+async def submit_interview(request: Request) -> Response:
+    user_id = authenticate(request)
+    interview_id = request.path_params['interview_id']
+    data = await read_json(request)
+    answers = data.get('answers')
+    if not isinstance(answers, list) or not all(isinstance(a, str) for a in answers):
+        raise APIError(400, 'answers must be a list of strings')
+
+    engine = request.app.state.engine
+    session = await run_db(engine.store.get_session, interview_id)
+    if session is None or session['user_id'] != user_id:
+        raise APIError(404, 'Unknown interview')
+    try:
+        result = await engine.submit_answers(interview_id, answers)
+    except AlreadyAnswered:
+        # A concurrent submit answered the same questions first
+        raise APIError(409, 'Interview answers were already submitted')
+    request.app.state.dashboards.invalidate(user_id)
+    return JSONResponse(result)
+
+
+async def metrics(request: Request) -> Response:
+    authorize_metrics(request)
+    return PlainTextResponse(instrumentation.prometheus_text(), media_type='text/plain; version=0.0.4')
+
+
+async def metrics_snapshot(request: Request) -> Response:
+    authorize_metrics(request)
+    return JSONResponse(instrumentation.snapshot())
+
+
+async def api_error(request: Request, exc: APIError) -> Response:
+    return JSONResponse({'error': exc.message}, status_code=exc.status)
+
+
+async def hasher_busy(request: Request, exc: HasherBusy) -> Response:
+    return JSONResponse({'error': 'Too many sign-ins right now, please retry'}, status_code=503,
+                        headers={'Retry-After': '1'})
+
+
+def _startup() -> MockInterviewEngine:
+    if API_DB:
+        database.DB_NAME = API_DB
+    database.ensure_schema()
+    get_analyzer()
+    return MockInterviewEngine(store=InterviewStore())
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    app.state.hasher = PasswordHasher()
+    app.state.tokens = TokenSigner()
+    app.state.dashboards = DashboardCache()
+    app.state.engine = await anyio.to_thread.run_sync(_startup)
+    instrumentation.register_cache('dashboard', app.state.dashboards.stats)
+    instrumentation.register_cache('evaluation', app.state.engine.cache_stats)
+    profiler = instrumentation.SamplingProfiler().start() if PROFILE_PATH else None
+    yield
+    if profiler is not None:
+        profiler.stop()
+        with open(PROFILE_PATH, 'w', encoding='utf-8') as f:
+            f.write(profiler.collapsed())
+    app.state.hasher.close()
+    database.close_pool()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/student/register', register, methods=['POST']),
+        Route('/api/student/login', login, methods=['POST']),
+        Route('/api/student/dashboard', dashboard, methods=['GET']),
+        Route('/api/student/skills', skills, methods=['GET', 'POST']),
+        Route('/api/student/interview/start', start_interview, methods=['POST']),
+        Route('/api/student/interview/{interview_id:int}/submit', submit_interview, methods=['POST']),
+        Route('/metrics', metrics, methods=['GET']),
+        Route('/api/metrics', metrics_snapshot, methods=['GET']),
+    ],
+    middleware=[
+        # The pages are opened straight from disk or another port
+        Middleware(
+            CORSMiddleware,
+            allow_origins=['*'],
+            allow_methods=['GET', 'POST'],
+            allow_headers=['Authorization', 'Content-Type'],
+            expose_headers=['ETag'],
+        ),
+    ],
+    exception_handlers={APIError: api_error, HasherBusy: hasher_busy},
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host=API_HOST, port=API_PORT)
@@ -1,7 +1,10 @@
 import streamlit as st
-from database import create_tables, add_user, get_users
+from database import add_user, get_users_page
+from streamlit_cache import init_database
 
-create_tables()
+PAGE_SIZE = 20
+
+init_database()
 
 st.title("SQLite Data Structure Demo")
 
@@ -13,5 +16,20 @@ if st.button("Add User"):
     st.success("User added successfully!")
 
 st.subheader("Stored Users")
-users = get_users()
-st.table(users)
\ No newline at end of file
+
+# Keyset cursors for the pages visited so far; the last one is current
+if "user_cursors" not in st.session_state:
+    st.session_state.user_cursors = [0]
+cursors = st.session_state.user_cursors
+
+users, next_cursor = get_users_page(cursors[-1], PAGE_SIZE)
+st.table(users)
+
+prev_col, page_col, next_col = st.columns([1, 2, 1])
+if prev_col.button("Previous", disabled=len(cursors) == 1):
+    cursors.pop()
+    st.rerun()
+page_col.caption(f"Page {len(cursors)}")
+if next_col.button("Next", disabled=next_cursor is None):
+    cursors.append(next_cursor)
+    st.rerun()
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""Password hashing and session tokens for the API and the SQLAlchemy models
+
+bcrypt is deliberately slow, so a login storm is CPU-bound. PasswordHasher
+runs hashing on a dedicated worker pool (threads by default, since bcrypt
+releases the GIL; processes on request) and bounds how many hashes may
+queue for it. Once max_pending calls are waiting, new ones fail fast with
+HasherBusy instead of piling up behind the pool. The cost factor comes
+from BCRYPT_ROUNDS (PLACEMENTPRO_BCRYPT_ROUNDS). verify_and_upgrade()
+reports a fresh hash whenever a stored one used another cost, so raising
+the cost upgrades accounts as their owners log in. A missing hash (an
+unknown email, or an account without a password) is checked against a
+dummy hash of the same cost, so a failed login takes as long whether or
+not the account exists.
+
+After login, requests authenticate with a TokenSigner token: an
+HMAC-signed (user_id, expiry) pair, checked with one SHA-256 and no
+database or password work. Set PLACEMENTPRO_SECRET_KEY so that tokens
+survive restarts and are accepted by every worker; without it each
+process signs with a random key of its own.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv('PLACEMENTPRO_BCRYPT_ROUNDS', '12'))
+# Hashing workers; bcrypt is CPU-bound so more than the cores only adds queueing
+HASH_WORKERS = os.cpu_count() or 1
+# Hashes allowed to wait for a worker before callers get HasherBusy
+HASH_MAX_PENDING = 64 * HASH_WORKERS
+TOKEN_TTL = 3600
+SECRET_KEY = os.getenv('PLACEMENTPRO_SECRET_KEY')
+
+# bcrypt only reads the first 72 bytes; flask_bcrypt truncated silently and
+# bcrypt>=5 raises instead, so truncate to keep existing hashes valid
+_BCRYPT_MAX_BYTES = 72
+
+
+class HasherBusy(Exception):
+    """Raised instead of queueing when PasswordHasher already has max_pending calls waiting"""
+
+
+def _secret(password: str) -> bytes:
+    return password.encode('utf-8')[:_BCRYPT_MAX_BYTES]
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds)).decode('ascii')
+
+
+@lru_cache(maxsize=None)
+def _dummy_hash(rounds: int) -> bytes:
+    return hash_password(secrets.token_urlsafe(16), rounds).encode('ascii')
+
+
+def verify_password(password: str, password_hash: Optional[str], rounds: int = BCRYPT_ROUNDS) -> bool:
+    """Check a password against a bcrypt hash; no hash costs a `rounds` check and fails"""
+    if not password_hash:
+        bcrypt.checkpw(_secret(password), _dummy_hash(rounds))
+        return False
+    try:
+        return bcrypt.checkpw(_secret(password), password_hash.encode('ascii'))
+    except ValueError:
+        return False
+
+
+def needs_rehash(password_hash: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    """True unless the hash is bcrypt with exactly `rounds` (so costs can go down as well as up)"""
+    parts = password_hash.split('$')
+    return len(parts) != 4 or parts[1] not in ('2a', '2b', '2y') or parts[2] != f"{rounds:02d}"
+
+
+def _verify_and_upgrade(password: str, password_hash: Optional[str], rounds: int) -> Tuple[bool, Optional[str]]:
+    if not verify_password(password, password_hash, rounds):
+        return False, None
+    return True, hash_password(password, rounds) if needs_rehash(password_hash, rounds) else None
+
+
+class PasswordHasher:
+    """bcrypt on a dedicated pool, with bounded queueing, for use from async code"""
+
+    def __init__(
+        self,
+        rounds: int = BCRYPT_ROUNDS,
+        workers: int = HASH_WORKERS,
+        max_pending: int = HASH_MAX_PENDING,
+        processes: bool = False,
+    ):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor: Executor = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(workers)
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.rejected = 0
+
+    async def _run(self, fn, *args):
+        with self.lock:
+            if self.pending >= self.workers + self.max_pending:
+                self.rejected += 1
+                raise HasherBusy(f"{self.pending} password hashes already in progress")
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: Optional[str]) -> bool:
+        return await self._run(verify_password, password, password_hash)
+
+    async def verify_and_upgrade(self, password: str, password_hash: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """(matches, new hash or None); a new hash means the stored one should be replaced
+
+        The rehash runs in the same pool call as the check, so an upgrade
+        costs the caller one extra hash and no extra queueing.
+        """
+        return await self._run(_verify_and_upgrade, password, password_hash, self.rounds)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+class TokenSigner:
+    """Stateless bearer tokens: "<user_id>.<expires_at>.<HMAC-SHA256 signature>" """
+
+    def __init__(self, secret: Optional[str] = SECRET_KEY, ttl: int = TOKEN_TTL):
+        self.key = secret.encode('utf-8') if secret else secrets.token_bytes(32)
+        self.ttl = ttl
+
+    def _signature(self, payload: str) -> str:
+        return _b64(hmac.new(self.key, payload.encode('utf-8'), hashlib.sha256).digest())
+
+    def issue(self, user_id: int, now: Optional[float] = None) -> str:
+        payload = f"{user_id}.{int((now or time.time()) + self.ttl)}"
+        return f"{payload}.{self._signature(payload)}"
+
+    def user_id(self, token: str, now: Optional[float] = None) -> Optional[int]:
+        """The token's user id, or None if it is malformed, forged or expired"""
+        payload, _, signature = token.rpartition('.')
+        if not hmac.compare_digest(signature.encode('utf-8'), self._signature(payload).encode('ascii')):
+            return None
+        user_id, _, expires_at = payload.partition('.')
+        try:
+            if int(expires_at) < (now or time.time()):
+                return None
+            return int(user_id)
+        except ValueError:
+            return None
@@ -0,0 +1,72 @@
+"""Measure SkillAnalyzer cold-start and warm-construction times.
+
+Cold numbers come from fresh interpreters so nothing is cached:
+importing skill_analyzer, training and saving the model when no model
+file exists, and loading an existing model file. Warm numbers compare
+constructing SkillAnalyzer() per request with get_analyzer().
+
+    python -m benchmarks.bench_analyzer_startup
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import skill_analyzer
+
+COLD_SCRIPT = """
+import time
+start = time.perf_counter()
+import skill_analyzer
+imported = time.perf_counter()
+skill_analyzer.SkillAnalyzer({path!r})
+built = time.perf_counter()
+print(imported - start, built - imported)
+"""
+
+
+def cold_start(model_path: str, runs: int) -> tuple:
+    imports, builds = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", COLD_SCRIPT.format(path=model_path)],
+            check=True, capture_output=True, text=True,
+        ).stdout.split()
+        imports.append(float(out[0]))
+        builds.append(float(out[1]))
+    return min(imports), min(builds)
+
+
+def per_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per cold measurement")
+    parser.add_argument("--repeat", type=int, default=200, help="constructions per warm measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="placementpro-bench-") as workdir:
+        model_path = os.path.join(workdir, "skill_model.npz")
+
+        import_s, train_s = cold_start(model_path, 1)
+        print(f"cold import skill_analyzer:   {import_s * 1000:8.1f}ms")
+        print(f"cold train + save model:      {train_s * 1000:8.1f}ms")
+        _, load_s = cold_start(model_path, args.runs)
+        print(f"cold load from .npz:          {load_s * 1000:8.1f}ms")
+
+        construct = per_call(lambda: skill_analyzer.SkillAnalyzer(model_path), args.repeat)
+        skill_analyzer.get_analyzer(model_path)
+        cached = per_call(lambda: skill_analyzer.get_analyzer(model_path), args.repeat * 100)
+        print(f"warm SkillAnalyzer():         {construct * 1000:8.3f}ms")
+        print(f"warm get_analyzer():          {cached * 1000:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
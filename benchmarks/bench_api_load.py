@@ -0,0 +1,217 @@
+"""Load-test the student JSON API and report p50/p99 latency per endpoint.
+
+Seeds --students students (profile, skills, one shared password) in a
+scratch database and starts api.py under uvicorn in a subprocess. Then
+--clients concurrent keep-alive clients each log in as their own student
+and run --requests requests drawn from a dashboard-heavy mix:
+
+    80%  GET  /api/student/dashboard
+    10%  GET  /api/student/skills
+     5%  POST /api/student/skills
+     5%  POST /api/student/interview/start, then .../submit
+
+The run is repeated with the dashboard cache disabled
+(PLACEMENTPRO_DASHBOARD_TTL=0) for comparison. Point --url at a running
+server to load-test it instead; the students must then already exist.
+
+    python -m benchmarks.bench_api_load --clients 32 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import database
+from auth import hash_password
+from skill_analyzer import SKILL_LABELS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "placement-season"
+BATCHES = ["2024", "2025", "2026", "2027"]
+DEPARTMENTS = ["CSE", "IT", "ECE", "Mechanical"]
+ANSWER = "I would start from the data, validate my assumptions and explain the trade-offs."
+
+
+def seed(students: int, rng: random.Random) -> None:
+    # One hash for everyone: bcrypt per student would dominate seeding
+    password_hash = hash_password(PASSWORD)
+    now = datetime.now().isoformat()
+    with database.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (full_name, email, password_hash, role, created_at) VALUES (?, ?, ?, 'student', ?)",
+            ((f"Student {i}", f"student{i}@college.edu", password_hash, now) for i in range(students)),
+        )
+        conn.executemany(
+            "INSERT INTO student_profiles (user_id, university, batch, department, cgpa) VALUES (?, ?, ?, ?, ?)",
+            ((user_id, "State University", rng.choice(BATCHES), rng.choice(DEPARTMENTS), round(rng.uniform(5, 10), 2))
+             for user_id in range(1, students + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO student_skills (user_id, skill, proficiency, category, updated_at) VALUES (?, ?, ?, 'technical', ?)",
+            ((user_id, skill, rng.randrange(101), now)
+             for user_id in range(1, students + 1) for skill in SKILL_LABELS if rng.random() < 0.7),
+        )
+
+
+class Client:
+    """Minimal HTTP/1.1 keep-alive client, enough for JSON requests to uvicorn"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+        self.token = None
+
+    async def request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, Dict]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        headers = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(payload)}\r\n"
+        if payload:
+            headers += "Content-Type: application/json\r\n"
+        if self.token:
+            headers += f"Authorization: Bearer {self.token}\r\n"
+        self.writer.write(headers.encode("ascii") + b"\r\n" + payload)
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        length = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = await self.reader.readexactly(length)
+        return status, json.loads(data) if data else {}
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def timed(latencies: Dict[str, List[float]], label: str, client: Client, method: str, path: str,
+                body: Optional[Dict] = None) -> Dict:
+    start = time.perf_counter()
+    status, data = await client.request(method, path, body)
+    latencies[label].append(time.perf_counter() - start)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path}: HTTP {status} {data}")
+    return data
+
+
+async def run_client(host: str, port: int, student: int, requests: int, rng: random.Random,
+                     latencies: Dict[str, List[float]]) -> None:
+    client = Client(host, port)
+    try:
+        login = await timed(latencies, "login", client, "POST", "/api/student/login",
+                            {"email": f"student{student}@college.edu", "password": PASSWORD})
+        client.token = login["token"]
+        for _ in range(requests):
+            roll = rng.random()
+            if roll < 0.80:
+                await timed(latencies, "dashboard", client, "GET", "/api/student/dashboard")
+            elif roll < 0.90:
+                await timed(latencies, "skills (get)", client, "GET", "/api/student/skills")
+            elif roll < 0.95:
+                skills = [{"skill_name": s, "proficiency": rng.randrange(101), "category": "technical"}
+                          for s in rng.sample(SKILL_LABELS, 6)]
+                await timed(latencies, "skills (save)", client, "POST", "/api/student/skills", {"skills": skills})
+            else:
+                interview = await timed(latencies, "interview start", client, "POST", "/api/student/interview/start")
+                await timed(latencies, "interview submit", client, "POST",
+                            f"/api/student/interview/{interview['interview_id']}/submit",
+                            {"answers": [ANSWER] * len(interview["questions"])})
+    finally:
+        client.close()
+
+
+async def load(host: str, port: int, clients: int, requests: int, students: int, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    latencies = defaultdict(list)
+    picked = rng.sample(range(students), clients)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(host, port, student, requests, random.Random(rng.random()), latencies) for student in picked
+    ))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"  {total} requests in {elapsed:.2f}s ({total / elapsed:,.0f} req/s)")
+    for label, values in sorted(latencies.items()):
+        ordered = sorted(values)
+        p50 = ordered[len(ordered) // 2]
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"  {label:<18} n={len(ordered):<6} p50 {p50 * 1000:7.2f}ms  p99 {p99 * 1000:7.2f}ms")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: str, port: int, dashboard_ttl: Optional[float]) -> subprocess.Popen:
+    env = dict(os.environ, PLACEMENTPRO_DB=db_path)
+    if dashboard_ttl is not None:
+        env["PLACEMENTPRO_DASHBOARD_TTL"] = str(dashboard_ttl)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("API server exited during startup")
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("API server did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=2_000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="load-test a running server instead of starting one")
+    args = parser.parse_args()
+
+    if args.url:
+        parts = urlsplit(args.url)
+        asyncio.run(load(parts.hostname, parts.port or 80, args.clients, args.requests, args.students, args.seed))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "api.db")
+        database.create_tables()
+        seed(args.students, random.Random(args.seed))
+        database.close_pool()
+
+        for label, ttl in (("dashboard cache on", None), ("dashboard cache off", 0)):
+            port = free_port()
+            server = start_server(database.DB_NAME, port, ttl)
+            try:
+                print(f"{label}: {args.clients} clients x {args.requests} requests, {args.students} students")
+                asyncio.run(load("127.0.0.1", port, args.clients, args.requests, args.students, args.seed))
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure bulk import throughput against one-at-a-time inserts.
+
+Writes synthetic CSV/JSONL files (with a sprinkling of duplicate emails),
+imports them into a scratch database with bulk_add_users/bulk_add_records,
+and times a sample of plain add_user calls for comparison.
+
+    python -m benchmarks.bench_bulk_import --rows 100000
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import database
+
+
+def write_users_csv(path: str, rows: int, duplicate_rate: float, rng: random.Random) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "email"])
+        for i in range(rows):
+            # Re-use an earlier address now and then to exercise duplicate reporting
+            n = rng.randrange(i) if i and rng.random() < duplicate_rate else i
+            writer.writerow([f"Student {i}", f"student{n}@college.edu"])
+
+
+def write_records_jsonl(path: str, rows: int, max_user_id: int, rng: random.Random) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            f.write(json.dumps({
+                "user_id": rng.randint(1, max_user_id),
+                "title": f"Record {i}",
+                "description": "Synthetic benchmark record",
+            }) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=2000,
+                        help="add_user calls timed for the one-at-a-time baseline")
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--chunk-size", type=int, default=database.IMPORT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="placementpro-bench-")
+    try:
+        users_path = os.path.join(workdir, "users.csv")
+        records_path = os.path.join(workdir, "records.jsonl")
+        write_users_csv(users_path, args.rows, args.duplicate_rate, rng)
+        write_records_jsonl(records_path, args.rows, args.rows, rng)
+
+        database.DB_NAME = os.path.join(workdir, "baseline.db")
+        database.create_tables()
+        start = time.perf_counter()
+        for i in range(args.sample):
+            database.add_user(f"Student {i}", f"student{i}@college.edu")
+        per_row = (time.perf_counter() - start) / args.sample
+        print(f"add_user loop:     {1 / per_row:10.0f} rows/s "
+              f"(~{per_row * args.rows:.1f}s for {args.rows} rows)")
+
+        database.DB_NAME = os.path.join(workdir, "bulk.db")
+        database.create_tables()
+
+        start = time.perf_counter()
+        report = database.bulk_add_users(database.read_rows(users_path), args.chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"bulk_add_users:    {args.rows / elapsed:10.0f} rows/s "
+              f"({elapsed:.2f}s, {report['inserted']} inserted, "
+              f"{len(report['errors'])} duplicates reported)")
+
+        start = time.perf_counter()
+        report = database.bulk_add_records(database.read_rows(records_path), args.chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"bulk_add_records:  {args.rows / elapsed:10.0f} rows/s "
+              f"({elapsed:.2f}s, {report['inserted']} inserted, "
+              f"{len(report['errors'])} rejected)")
+        database.close_pool()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
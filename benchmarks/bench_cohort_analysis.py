@@ -0,0 +1,55 @@
+"""Compare per-student and cohort skill-gap analysis.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_cohort_analysis --students 5000
+"""
+import argparse
+import random
+import time
+
+from skill_analyzer import SKILL_MAPPING, SkillAnalyzer
+
+
+def make_students(count: int, seed: int = 42) -> list:
+    """Build a seeded cohort of student skill lists using every known alias."""
+    rng = random.Random(seed)
+    aliases = list(SKILL_MAPPING)
+    students = []
+    for _ in range(count):
+        picked = rng.sample(aliases, rng.randint(0, len(aliases)))
+        students.append([
+            {'skill_name': name, 'proficiency': rng.randint(0, 100)}
+            for name in picked
+        ])
+    return students
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    analyzer = SkillAnalyzer()
+    students = make_students(args.students, args.seed)
+
+    start = time.perf_counter()
+    expected = [analyzer.analyze_skill_gaps(s) for s in students]
+    per_student = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = analyzer.analyze_cohort(students)
+    cohort = time.perf_counter() - start
+
+    if actual != expected:
+        raise SystemExit("analyze_cohort output differs from analyze_skill_gaps")
+
+    print(f"students:     {args.students}")
+    print(f"per-student:  {per_student:.3f}s")
+    print(f"cohort:       {cohort:.3f}s")
+    print(f"speedup:      {per_student / cohort:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark materialized cohort analytics against computing them live.
+
+Seeds --students students (profiles plus student_skills rows) in a
+scratch database, builds the aggregates once, then compares a TPO page's
+worth of queries (CGPA histogram, gap distribution, readiness
+percentiles for one batch/department) read from the aggregates with the
+same numbers computed from the raw tables. Also times the incremental
+update that runs on every skills or profile write.
+
+    python -m benchmarks.bench_cohort_analytics --students 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+import cohort_analytics
+import database
+from profiles import save_student_profile
+from skill_analyzer import SKILL_LABELS, get_analyzer
+from student_skills import set_student_skills, skill_matrix
+
+BATCHES = ["2024", "2025", "2026", "2027"]
+DEPARTMENTS = ["CSE", "IT", "ECE", "Mechanical"]
+
+
+def seed(students: int, rng: random.Random) -> None:
+    now = datetime.now().isoformat()
+    with database.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (full_name, email, role, created_at) VALUES (?, ?, 'student', ?)",
+            ((f"Student {i}", f"student{i}@college.edu", now) for i in range(students)),
+        )
+        conn.executemany(
+            "INSERT INTO student_profiles (user_id, batch, department, cgpa) VALUES (?, ?, ?, ?)",
+            ((user_id, rng.choice(BATCHES), rng.choice(DEPARTMENTS), round(rng.uniform(5, 10), 2))
+             for user_id in range(1, students + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO student_skills (user_id, skill, proficiency, updated_at) VALUES (?, ?, ?, ?)",
+            ((user_id, skill, rng.randrange(101), now)
+             for user_id in range(1, students + 1) for skill in SKILL_LABELS if rng.random() < 0.9),
+        )
+
+
+def live(batch: str, department: str) -> tuple:
+    """The same three aggregates computed from the raw tables"""
+    with database.connection() as conn:
+        cgpa = np.array([row[0] for row in conn.execute(
+            "SELECT cgpa FROM student_profiles WHERE batch = ? AND department = ?", (batch, department))])
+    _, matrix = skill_matrix(batch=batch, department=department)
+    analyzer = get_analyzer()
+    standards = analyzer.nearest_standards(matrix, "Data Scientist")
+    readiness = analyzer.readiness(matrix, standards).astype(int)
+    gaps = np.clip(standards - matrix, 0, None) // cohort_analytics.GAP_BUCKET
+    size = 100 // cohort_analytics.GAP_BUCKET + 1
+    return (
+        np.bincount((cgpa // cohort_analytics.CGPA_BUCKET).astype(int), minlength=41),
+        np.stack([np.bincount(gaps[:, k].astype(int), minlength=size) for k in range(len(SKILL_LABELS))]),
+        np.percentile(readiness, cohort_analytics.READINESS_PERCENTILES, method="inverted_cdf").astype(int),
+    )
+
+
+def materialized(batch: str, department: str) -> tuple:
+    _, cgpa = cohort_analytics.cgpa_histogram(batch, department)
+    _, _, gaps = cohort_analytics.gap_distribution(batch, department)
+    percentiles = cohort_analytics.readiness_percentiles(batch, department)
+    return cgpa, gaps, np.array(list(percentiles.values()))
+
+
+def timed(label: str, fn, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<44} {best * 1000:9.2f}ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "analytics.db")
+        database.create_tables()
+        seed(args.students, rng)
+
+        start = time.perf_counter()
+        with database.transaction() as conn:
+            cohort_analytics.rebuild(conn)
+        print(f"initial build for {args.students} students: {time.perf_counter() - start:.2f}s")
+
+        expected = timed("live from raw tables (2025 / CSE)", lambda: live("2025", "CSE"), repeat=2)
+        actual = timed("materialized (2025 / CSE)", lambda: materialized("2025", "CSE"))
+        for want, got in zip(expected, actual):
+            assert np.array_equal(want, got), (want, got)
+        timed("export(), all cohorts", cohort_analytics.export)
+
+        start = time.perf_counter()
+        for _ in range(args.writes):
+            user_id = rng.randrange(1, args.students + 1)
+            if rng.random() < 0.5:
+                set_student_skills(user_id, [{"skill_name": s, "proficiency": rng.randrange(101)} for s in SKILL_LABELS])
+            else:
+                save_student_profile(user_id, cgpa=round(rng.uniform(5, 10), 2), batch=rng.choice(BATCHES))
+        elapsed = time.perf_counter() - start
+        print(f"writes with incremental refresh: {elapsed / args.writes * 1000:.2f}ms each")
+
+        expected = live("2025", "CSE")
+        assert all(np.array_equal(want, got) for want, got in zip(expected, materialized("2025", "CSE")))
+        print("aggregates still match the raw tables after the writes")
+        database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Compare dashboard and cohort reads from the database with reads from a cohort snapshot.
+
+Generates a seeded cohort of --students students (synthetic_cohort.py)
+in a scratch database and publishes a cohort_snapshot of it. Then:
+
+  * dashboard: api.build_dashboard for --requests sampled students with
+    the snapshot off and on, p50/p99 per page, checking both pages match
+    (and that a student whose skills changed after publishing is computed,
+    not served from the snapshot);
+  * cohort view: skills, standards and readiness for every (batch,
+    department) cohort, queried and computed versus sliced from the snapshot;
+  * memory: --processes worker processes each serve the dashboard sample
+    and every cohort view, all alive at once, and report RSS, PSS and
+    private memory from /proc/self/smaps_rollup, minus that of as many
+    idle workers.
+
+    python -m benchmarks.bench_cohort_snapshot --students 100000 --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+import api
+import cohort_snapshot
+import database
+from benchmarks.synthetic_cohort import write_database
+from skill_analyzer import SkillAnalyzer, get_analyzer
+from student_skills import set_student_skills, skill_matrix_for
+
+
+def cohort_from_db(conn, analyzer: SkillAnalyzer, batch: str, department: str):
+    """What CohortSnapshot.cohort() holds, computed from the database"""
+    profiles = conn.execute("""
+        SELECT user_id, target_role FROM student_profiles
+        WHERE COALESCE(batch, '') = ? AND COALESCE(department, '') = ?
+        ORDER BY user_id
+    """, (batch, department)).fetchall()
+    user_ids = [user_id for user_id, _ in profiles]
+    matrix = skill_matrix_for(conn, user_ids)
+    standards = analyzer.nearest_standards(matrix, [role or cohort_snapshot.DEFAULT_TARGET_ROLE for _, role in profiles])
+    return np.array(user_ids), matrix, standards, analyzer.readiness(matrix, standards)
+
+
+def cohort_views(snapshot_root, cohorts):
+    """Every cohort's readiness, from the snapshot when snapshot_root is set"""
+    analyzer = get_analyzer()
+    if snapshot_root:
+        snapshot = cohort_snapshot.current(snapshot_root)
+        return [float(snapshot.cohort(batch, department)['readiness'].mean()) for batch, department in cohorts]
+    with database.connection() as conn:
+        return [float(cohort_from_db(conn, analyzer, batch, department)[3].mean()) for batch, department in cohorts]
+
+
+def memory() -> dict:
+    """This process's memory in MB, from smaps_rollup"""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {'rss': fields['Rss'], 'pss': fields['Pss'],
+            'private': fields['Private_Clean'] + fields['Private_Dirty']}
+
+
+def worker(db_path, snapshot_root, user_ids, cohorts, results, release):
+    database.DB_NAME = db_path
+    cohort_snapshot.SNAPSHOT_DIR = snapshot_root
+    get_analyzer()
+    if user_ids:
+        for user_id in user_ids:
+            api.build_dashboard(user_id)
+        cohort_views(snapshot_root, cohorts)
+    results.put(memory())
+    release.wait()
+    database.close_pool()
+
+
+def per_worker(db_path, snapshot_root, user_ids, cohorts, processes: int) -> dict:
+    """Mean memory of processes workers running at the same time"""
+    context = multiprocessing.get_context('spawn')
+    results, release = context.Queue(), context.Event()
+    workers = [context.Process(target=worker, args=(db_path, snapshot_root, user_ids, cohorts, results, release))
+               for _ in range(processes)]
+    for process in workers:
+        process.start()
+    reports = [results.get() for _ in workers]
+    release.set()
+    for process in workers:
+        process.join()
+    return {key: sum(report[key] for report in reports) / len(reports) for key in reports[0]}
+
+
+def latencies(user_ids) -> np.ndarray:
+    times = []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        api.build_dashboard(user_id)
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "snapshot.db")
+        root = os.path.join(workdir, "snapshots")
+        print(f"generating {args.students} students ...")
+        write_database(db_path, args.students, args.seed)
+        database.DB_NAME = db_path
+
+        start = time.perf_counter()
+        path = cohort_snapshot.publish(db_path, root)
+        size = sum(os.path.getsize(os.path.join(path, entry)) for entry in os.listdir(path))
+        print(f"snapshot published in {time.perf_counter() - start:.1f}s, {size / 2**20:.1f} MB")
+
+        sample = random.Random(args.seed).sample(range(1, args.students + 1), min(args.requests, args.students))
+        cohort_snapshot.SNAPSHOT_DIR = None
+        expected = {user_id: api.build_dashboard(user_id) for user_id in sample}
+        from_db = latencies(sample)
+        cohort_snapshot.SNAPSHOT_DIR = root
+        from_snapshot = latencies(sample)
+        for user_id in sample:
+            assert api.build_dashboard(user_id) == expected[user_id], user_id
+
+        # A student edited after publishing must not be served stale values
+        edited = sample[0]
+        set_student_skills(edited, [{'skill_name': 'Python', 'proficiency': 99}])
+        snapshot = cohort_snapshot.current()
+        skills = api.build_dashboard(edited)['skills']
+        assert snapshot.precomputed(edited, get_analyzer().build_skill_matrix([skills])[0],
+                                    snapshot.role_names[snapshot.roles[snapshot.row(edited)]], get_analyzer()) is None
+        cohort_snapshot.SNAPSHOT_DIR = None
+        fresh = api.build_dashboard(edited)
+        cohort_snapshot.SNAPSHOT_DIR = root
+        assert api.build_dashboard(edited) == fresh
+        print(f"dashboards match for all {len(sample)} sampled students; edited students are recomputed")
+
+        print(f"{'dashboard':<22} {'p50':>10} {'p99':>10}")
+        for label, times in (("database", from_db), ("snapshot", from_snapshot)):
+            print(f"{label:<22} {np.percentile(times, 50) * 1e6:8.0f}us {np.percentile(times, 99) * 1e6:8.0f}us")
+
+        cohorts = list(snapshot.cohorts)
+        analyzer = get_analyzer()
+        with database.connection() as conn:
+            for batch, department in cohorts:
+                user_ids, matrix, standards, readiness = cohort_from_db(conn, analyzer, batch, department)
+                view = snapshot.cohort(batch, department)
+                changed = user_ids == edited
+                assert np.array_equal(view['user_ids'], user_ids)
+                assert np.array_equal(view['standards'][~changed], standards[~changed])
+                assert np.array_equal(view['readiness'][~changed], readiness[~changed])
+        print(f"{'cohort views':<22} {'total':>10} {'per view':>10}   ({len(cohorts)} cohorts)")
+        for label, source in (("database", None), ("snapshot", root)):
+            start = time.perf_counter()
+            cohort_views(source, cohorts)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<22} {elapsed * 1e3:8.1f}ms {elapsed / len(cohorts) * 1e3:8.2f}ms")
+        database.close_pool()
+
+        print(f"{'memory per worker':<22} {'RSS':>10} {'PSS':>10} {'private':>10}   "
+              f"({args.processes} workers, over as many idle ones)")
+        idle = per_worker(db_path, None, [], cohorts, args.processes)
+        for label, source in (("database", None), ("snapshot", root)):
+            used = per_worker(db_path, source, sample, cohorts, args.processes)
+            print(f"{label:<22} " + " ".join(f"{used[key] - idle[key]:8.1f}MB" for key in ('rss', 'pss', 'private')))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Hammer the database layer with concurrent reader and writer threads.
+
+Runs the same workload twice against copies of app.db, both migrated to
+the current schema: once with the old connect-per-call functions on a
+rollback journal, and once through the pooled WAL connections in
+database.py.
+
+    python -m benchmarks.bench_db_concurrency --readers 16 --writers 4
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import database
+from migrations import migrate
+
+
+def legacy_add_user(db_name: str, name: str, email: str) -> None:
+    conn = sqlite3.connect(db_name)
+    conn.execute(
+        "INSERT INTO users (full_name, email, created_at) VALUES (?, ?, ?)",
+        (name, email, datetime.now().isoformat()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_users(db_name: str) -> list:
+    conn = sqlite3.connect(db_name)
+    data = conn.execute("SELECT * FROM users").fetchall()
+    conn.close()
+    return data
+
+
+def run_workload(add_user, get_users, readers: int, writers: int, ops: int, tag: str) -> dict:
+    """Start all threads together and collect per-operation latencies."""
+    barrier = threading.Barrier(readers + writers)
+    latencies = {"read": [], "write": []}
+    errors = []
+    lock = threading.Lock()
+
+    def worker(kind: str, index: int) -> None:
+        local = []
+        barrier.wait()
+        for op in range(ops):
+            start = time.perf_counter()
+            try:
+                if kind == "write":
+                    add_user(f"bench {index}-{op}", f"{tag}-{index}-{op}@bench.local")
+                else:
+                    get_users()
+            except sqlite3.Error as exc:
+                with lock:
+                    errors.append(repr(exc))
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies[kind].extend(local)
+
+    threads = [threading.Thread(target=worker, args=("read", i)) for i in range(readers)]
+    threads += [threading.Thread(target=worker, args=("write", i)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {"elapsed": elapsed, "latencies": latencies, "errors": errors}
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label: str, result: dict) -> None:
+    total = sum(len(v) for v in result["latencies"].values())
+    print(f"{label}: {total} ops in {result['elapsed']:.2f}s "
+          f"({total / result['elapsed']:.0f} ops/s), {len(result['errors'])} errors")
+    for kind, values in result["latencies"].items():
+        print(f"  {kind:5s} p50 {percentile(values, 50) * 1000:7.2f}ms"
+              f"  p99 {percentile(values, 99) * 1000:7.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="app.db", help="source database to copy")
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=200, help="operations per thread")
+    parser.add_argument("--in-place", action="store_true",
+                        help="run the pooled workload against --db itself instead of a copy")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="placementpro-bench-")
+    try:
+        legacy_db = os.path.join(workdir, "legacy.db")
+        shutil.copy(args.db, legacy_db)
+        conn = sqlite3.connect(legacy_db)
+        # The same schema as the pooled run, whatever version --db is at
+        migrate(conn)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+        report("connect-per-call", run_workload(
+            lambda name, email: legacy_add_user(legacy_db, name, email),
+            lambda: legacy_get_users(legacy_db),
+            args.readers, args.writers, args.ops, "legacy",
+        ))
+
+        if args.in_place:
+            database.DB_NAME = args.db
+        else:
+            database.DB_NAME = os.path.join(workdir, "pooled.db")
+            shutil.copy(args.db, database.DB_NAME)
+        database.create_tables()
+
+        report("pooled WAL", run_workload(
+            database.add_user, database.get_users,
+            args.readers, args.writers, args.ops, f"pooled-{time.time_ns()}",
+        ))
+        database.close_pool()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure what instrumentation costs when it is off and when it is on.
+
+Times the same calls three ways: without the decorator (the function's
+__wrapped__), decorated with instrumentation disabled, and decorated with
+it enabled. Covers an empty function (the raw wrapper cost), timer(),
+SkillAnalyzer.analyze_skill_gaps and a keyset page read from a scratch
+database of --users users, which also exercises per-statement timing.
+
+    python -m benchmarks.bench_instrumentation --calls 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import database
+import instrumentation
+from skill_analyzer import SkillAnalyzer
+
+
+@instrumentation.timed('bench.noop')
+def noop():
+    pass
+
+
+def per_call(fn, calls: int) -> float:
+    """Best of three runs, in seconds per call"""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def row(label: str, bare: float, off: float, on: float) -> None:
+    print(f"{label:<22} {bare * 1e9:10.0f}ns {off * 1e9:10.0f}ns ({(off - bare) * 1e9:+6.0f}ns) "
+          f"{on * 1e9:10.0f}ns ({(on - bare) * 1e9:+6.0f}ns)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'':<22} {'undecorated':>12} {'disabled':>21} {'enabled':>21}")
+
+    def timed_block(name):
+        with instrumentation.timer(name):
+            pass
+
+    def measure(label, bare, decorated, calls=args.calls):
+        instrumentation.disable()
+        base = per_call(bare, calls)
+        off = per_call(decorated, calls)
+        instrumentation.enable()
+        on = per_call(decorated, calls)
+        instrumentation.disable()
+        row(label, base, off, on)
+
+    measure("empty function", noop.__wrapped__, noop)
+    measure("timer() block", lambda: None, lambda: timed_block('bench.block'))
+
+    analyzer = SkillAnalyzer()
+    skills = [{'skill_name': 'Python', 'proficiency': 70}, {'skill_name': 'sql', 'proficiency': 40},
+              {'skill_name': 'Statistics', 'proficiency': 55}]
+    bare = SkillAnalyzer.analyze_skill_gaps.__wrapped__
+    measure("analyze_skill_gaps", lambda: bare(analyzer, skills), lambda: analyzer.analyze_skill_gaps(skills),
+            args.calls // 10)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "instrumented.db")
+        database.create_tables()
+        now = datetime.now().isoformat()
+        with database.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO users (full_name, email, created_at) VALUES (?, ?, ?)",
+                ((f"Student {i}", f"student{i}@college.edu", now) for i in range(args.users)),
+            )
+        page = database.get_users_page.__wrapped__
+        after = args.users // 2
+
+        # Plain connections, as opened while instrumentation is off
+        database.close_pool()
+        base = per_call(lambda: page(after, 20), args.calls // 10)
+        off = per_call(lambda: database.get_users_page(after, 20), args.calls // 10)
+        # Instrumented connections, opened while it is on
+        instrumentation.enable()
+        database.close_pool()
+        on = per_call(lambda: database.get_users_page(after, 20), args.calls // 10)
+        instrumentation.disable()
+        row("get_users_page", base, off, on)
+        database.close_pool()
+
+    instrumentation.enable()
+    snapshot = instrumentation.snapshot()
+    print(f"db statements timed while enabled: {snapshot['db']['queries']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark evaluate_batch against a local stub evaluation server.
+
+Starts an in-process HTTP server that sleeps --latency seconds per request
+and fails a --failure-rate fraction of them, then scores --answers answers
+through HTTPEvaluator, first one at a time with evaluate_answer, then
+with evaluate_batch, then again with a warm evaluation cache. No network
+access is needed.
+
+    python -m benchmarks.bench_interview_batch --answers 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from mock_interview_engine import HTTPEvaluator, MockInterviewEngine
+
+
+async def start_stub_server(latency: float, failure_rate: float, seed: int) -> asyncio.AbstractServer:
+    rng = random.Random(seed)
+    stats = {"requests": 0, "failures": 0}
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                      if line.lower().startswith(b"content-length"))
+        request = json.loads(await reader.readexactly(length))
+        stats["requests"] += 1
+        await asyncio.sleep(latency)
+
+        if rng.random() < failure_rate:
+            stats["failures"] += 1
+            status, body = "503 Service Unavailable", b"{}"
+        else:
+            status = "200 OK"
+            body = json.dumps({
+                "score": 40 + len(request["answer"]) % 60,
+                "feedback": "stub evaluation",
+                "strengths": [],
+                "improvements": [],
+            }).encode()
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: {len(body)}\r\n"
+                     f"Content-Type: application/json\r\n\r\n".encode() + body)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=1024)
+    server.stats = stats
+    return server
+
+
+async def run(args: argparse.Namespace) -> None:
+    server = await start_stub_server(args.latency, args.failure_rate, args.seed)
+    port = server.sockets[0].getsockname()[1]
+    engine = MockInterviewEngine(HTTPEvaluator(f"http://127.0.0.1:{port}/evaluate"))
+    rng = random.Random(args.seed)
+    items = [(f"Question {i % 12}", f"Answer text {rng.randrange(args.distinct_answers)}")
+             for i in range(args.answers)]
+
+    sample = items[:args.sequential_sample]
+    start = time.perf_counter()
+    for question, answer in sample:
+        await engine.evaluate_answer(question, answer)
+    sequential = (time.perf_counter() - start) / len(sample)
+    print(f"sequential evaluate_answer: {1 / sequential:8.1f} answers/s "
+          f"(~{sequential * len(items):.1f}s for {len(items)})")
+
+    start = time.perf_counter()
+    first = None
+    done = 0
+    async for _position, _evaluation in engine.evaluate_batch(
+        items, concurrency=args.concurrency, timeout=args.timeout, backoff=0.05,
+    ):
+        done += 1
+        if first is None:
+            first = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    print(f"evaluate_batch x{args.concurrency}:    {done / elapsed:8.1f} answers/s "
+          f"({elapsed:.2f}s, first result after {first * 1000:.0f}ms)")
+    print(f"stub server: {server.stats['requests']} requests, "
+          f"{server.stats['failures']} injected failures (retried)")
+
+    start = time.perf_counter()
+    async for _ in engine.evaluate_batch(items, concurrency=args.concurrency):
+        pass
+    elapsed = time.perf_counter() - start
+    print(f"evaluate_batch, warm cache: {len(items) / elapsed:8.1f} answers/s ({elapsed:.3f}s)")
+    stats = engine.cache_stats()
+    print(f"cache: {stats['hits']} hits, {stats['misses']} misses, "
+          f"hit ratio {stats['hit_ratio']:.1%}, {stats['entries']} entries")
+
+    server.close()
+    await server.wait_closed()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub seconds per request")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--distinct-answers", type=int, default=10_000,
+                        help="answers are drawn from this many distinct texts")
+    parser.add_argument("--sequential-sample", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
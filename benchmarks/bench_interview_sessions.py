@@ -0,0 +1,87 @@
+"""Benchmark the interview session store.
+
+Creates --sessions interviews of --questions questions each for
+--students students in a temporary database, records a scored answer for
+every question, then compares reading per-skill averages from the running
+totals against recomputing them from every stored evaluation.
+
+    python -m benchmarks.bench_interview_sessions --sessions 5000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from interview_store import InterviewStore
+
+SKILLS = ["Python", "Machine Learning", "SQL", "Statistics", "Deep Learning"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5_000)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = InterviewStore(os.path.join(tmp, "sessions.db"))
+
+        start = time.perf_counter()
+        sessions = []
+        for i in range(args.sessions):
+            questions = [(f"Question {rng.randrange(1000)}", rng.choice(SKILLS)) for _ in range(args.questions)]
+            sessions.append(store.create_session(i % args.students, questions))
+        elapsed = time.perf_counter() - start
+        print(f"create_session: {args.sessions / elapsed:,.0f} sessions/s")
+
+        answers = args.sessions * args.questions
+        start = time.perf_counter()
+        for session_id in sessions:
+            for position in range(args.questions):
+                evaluation = {"score": rng.randrange(101), "feedback": "benchmark", "strengths": [], "improvements": []}
+                summary = store.record_answer(session_id, position, "An answer " * 20, evaluation)
+        elapsed = time.perf_counter() - start
+        print(f"record_answer:  {answers / elapsed:,.0f} answers/s "
+              f"({elapsed / answers * 1e6:.0f}us each, score and skill totals included)")
+        assert summary["status"] == "completed"
+
+        students = range(min(args.students, 200))
+        start = time.perf_counter()
+        running = {user_id: store.skill_scores(user_id) for user_id in students}
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recomputed = {}
+        with store._connection() as conn:
+            for user_id in students:
+                totals = {}
+                for skill, evaluation in conn.execute("""
+                    SELECT q.skill, q.evaluation
+                    FROM interview_sessions s JOIN interview_questions q ON q.session_id = s.id
+                    WHERE s.user_id = ?
+                """, (user_id,)):
+                    score = json.loads(evaluation)["score"]
+                    count, total = totals.get(skill, (0, 0))
+                    totals[skill] = (count + 1, total + score)
+                recomputed[user_id] = {skill: total / count for skill, (count, total) in totals.items()}
+        full_scan = time.perf_counter() - start
+
+        for user_id in students:
+            for row in running[user_id]:
+                assert abs(row["average_score"] - recomputed[user_id][row["skill"]]) < 1e-9
+        print(f"per-skill averages for {len(students)} students: running totals {incremental * 1000:.1f}ms, "
+              f"recomputed from answers {full_scan * 1000:.1f}ms ({full_scan / incremental:.1f}x)")
+
+        start = time.perf_counter()
+        history = store.skill_history("SQL")
+        print(f"skill_history('SQL'): {len(history)} scores in {(time.perf_counter() - start) * 1000:.1f}ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
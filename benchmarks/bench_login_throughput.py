@@ -0,0 +1,134 @@
+"""Benchmark login throughput and event-loop stalls during a login storm.
+
+Fires --logins concurrent password checks at one event loop while a
+ticker task measures how late the loop wakes it (the delay every other
+request would see). Compares:
+
+    inline    bcrypt on the event loop, as the Flask models did
+    pool      auth.PasswordHasher (dedicated workers, bounded queue)
+    bounded   the same with --max-pending, so the overflow is rejected fast
+    token     auth.TokenSigner checks, what requests after login pay
+
+Also prints the cost of one hash per bcrypt cost factor and the price of
+the transparent upgrade when the configured cost goes up.
+
+    python -m benchmarks.bench_login_throughput --logins 64 --rounds 10
+"""
+import argparse
+import asyncio
+import time
+from typing import List, Tuple
+
+from auth import HASH_WORKERS, HasherBusy, PasswordHasher, TokenSigner, hash_password, needs_rehash, verify_password
+
+PASSWORD = "placement-season"
+TICK = 0.005
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def storm(logins: int, check) -> Tuple[float, List[float], List[float], int]:
+    """Run `logins` concurrent checks; returns (elapsed, latencies, loop lags, rejected)"""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    latencies = []
+    rejected = 0
+
+    # Every login arrives at once, so latency counts the time spent queued
+    async def login() -> None:
+        nonlocal rejected
+        try:
+            assert await check()
+        except HasherBusy:
+            rejected += 1
+            return
+        latencies.append(time.perf_counter() - start)
+
+    tick = asyncio.ensure_future(ticker())
+    await asyncio.sleep(TICK * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    return elapsed, latencies, lags, rejected
+
+
+def report(label: str, result: Tuple[float, List[float], List[float], int]) -> None:
+    elapsed, latencies, lags, rejected = result
+    line = (f"{label:<8} {len(latencies) / elapsed:9,.1f} logins/s  "
+            f"login p50 {percentile(latencies, 0.5) * 1000:8.1f}ms  p99 {percentile(latencies, 0.99) * 1000:8.1f}ms  "
+            f"loop lag p99 {percentile(lags, 0.99) * 1000:8.1f}ms")
+    if rejected:
+        line += f"  rejected {rejected}"
+    print(line)
+
+
+async def run(args: argparse.Namespace) -> None:
+    stored = hash_password(PASSWORD, args.rounds)
+
+    async def inline() -> bool:
+        return verify_password(PASSWORD, stored)
+    report("inline", await storm(args.logins, inline))
+
+    hasher = PasswordHasher(rounds=args.rounds, workers=args.workers, processes=args.processes)
+    report("pool", await storm(args.logins, lambda: hasher.verify(PASSWORD, stored)))
+    hasher.close()
+
+    bounded = PasswordHasher(rounds=args.rounds, workers=args.workers, max_pending=args.max_pending,
+                             processes=args.processes)
+    report("bounded", await storm(args.logins, lambda: bounded.verify(PASSWORD, stored)))
+    bounded.close()
+
+    signer = TokenSigner(secret="bench")
+    token = signer.issue(1)
+
+    async def check_token() -> bool:
+        return signer.user_id(token) == 1
+    report("token", await storm(args.logins, check_token))
+
+    hasher = PasswordHasher(rounds=args.rounds, workers=args.workers)
+    old = hash_password(PASSWORD, args.rounds - 2)
+    start = time.perf_counter()
+    matches, upgraded = await hasher.verify_and_upgrade(PASSWORD, old)
+    upgrade = time.perf_counter() - start
+    assert matches and upgraded and not needs_rehash(upgraded, args.rounds)
+    start = time.perf_counter()
+    matches, again = await hasher.verify_and_upgrade(PASSWORD, upgraded)
+    assert matches and again is None
+    print(f"upgrade from cost {args.rounds - 2} to {args.rounds}: {upgrade * 1000:.1f}ms for the login that rehashes, "
+          f"{(time.perf_counter() - start) * 1000:.1f}ms afterwards")
+    hasher.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=HASH_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=8)
+    parser.add_argument("--processes", action="store_true", help="hash in worker processes instead of threads")
+    args = parser.parse_args()
+
+    print("cost per hash:")
+    for rounds in range(8, args.rounds + 3):
+        start = time.perf_counter()
+        hash_password(PASSWORD, rounds)
+        print(f"  cost {rounds:2d}: {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+    print(f"{args.logins} concurrent logins, cost {args.rounds}, {args.workers} workers:")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare the old per-student nightly job with nightly_pipeline at several worker counts.
+
+Generates a seeded cohort of --students students (synthetic_cohort.py)
+in a scratch database. The old job built a SkillAnalyzer per student and
+ran analyze_skill_gaps, generate_recommendations and generate_questions
+one student at a time; it is timed on --legacy-sample students and
+extrapolated. The pipeline then runs over the whole cohort once per
+--workers count, and its stored gaps and recommendations are checked
+against the old job's for the sampled students.
+
+    python -m benchmarks.bench_nightly_pipeline --students 100000 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import database
+import nightly_pipeline
+from benchmarks.synthetic_cohort import write_database
+from mock_interview_engine import EvaluatorBackend, MockInterviewEngine
+from skill_analyzer import SkillAnalyzer
+from student_skills import get_student_skills
+
+
+def legacy_job(user_ids, roles, model_path: str) -> dict:
+    """The old nightly loop, one student at a time"""
+    engine = MockInterviewEngine(backend=EvaluatorBackend())
+    results = {}
+    for user_id, role in zip(user_ids, roles):
+        analyzer = SkillAnalyzer(model_path)
+        gaps = analyzer.analyze_skill_gaps(get_student_skills(user_id), role)
+        recommendations = analyzer.generate_recommendations(gaps)
+        engine.generate_questions(gaps, nightly_pipeline.QUESTIONS_PER_STUDENT, rng=random.Random(user_id))
+        results[user_id] = (gaps, recommendations)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunk-size", type=int, default=nightly_pipeline.CHUNK_SIZE)
+    parser.add_argument("--legacy-sample", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "nightly.db")
+        model_path = os.path.join(workdir, "skill_model.npz")
+        print(f"generating {args.students} students ...")
+        write_database(db_path, args.students, args.seed)
+        database.DB_NAME = db_path
+        SkillAnalyzer(model_path)
+
+        with database.connection() as conn:
+            sample = random.Random(args.seed).sample(range(1, args.students + 1), min(args.legacy_sample, args.students))
+            roles = dict(conn.execute(
+                f"SELECT user_id, target_role FROM student_profiles WHERE user_id IN ({','.join('?' * len(sample))})",
+                sample
+            ).fetchall())
+        start = time.perf_counter()
+        expected = legacy_job(sample, [roles[user_id] for user_id in sample], model_path)
+        legacy_rate = len(sample) / (time.perf_counter() - start)
+        print(f"{'old per-student job':<24} {legacy_rate:10,.0f} students/s  "
+              f"(~{args.students / legacy_rate:,.0f}s for the cohort, from {len(sample)} students)")
+
+        print(f"{os.cpu_count()} CPU(s) available")
+        base_rate = None
+        for workers in args.workers:
+            report = nightly_pipeline.run_pipeline(
+                db_path, workers, args.chunk_size, resume=False, model_path=model_path
+            )
+            rate = report['students_per_second']
+            base_rate = base_rate or rate
+            busy = report['read_seconds'] + report['compute_seconds'] + report['write_seconds']
+            print(f"{f'pipeline, {workers} worker(s)':<24} {rate:10,.0f} students/s  {report['seconds']:7.1f}s  "
+                  f"x{rate / legacy_rate:5.1f} vs old job, x{rate / base_rate:4.2f} vs {args.workers[0]} worker(s)  "
+                  f"(write {report['write_seconds'] / busy:.0%} of worker time)")
+
+        with database.connection() as conn:
+            for user_id in sample:
+                gaps, recommendations = conn.execute(
+                    "SELECT skill_gaps, recommendations FROM student_insights WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                assert (json.loads(gaps), json.loads(recommendations)) == expected[user_id], user_id
+        print(f"stored results match the old job for all {len(sample)} sampled students")
+        database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
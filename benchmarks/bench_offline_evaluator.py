@@ -0,0 +1,86 @@
+"""Measure offline answer-scoring throughput.
+
+Builds --answers synthetic answers by sampling words from each question's
+reference answer (plus filler), then scores them one at a time through
+evaluate(), in one score_batch() call, and through the engine's
+evaluate_batch(). Also checks that scoring is deterministic.
+
+    python -m benchmarks.bench_offline_evaluator --answers 20000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from evaluation_cache import EvaluationCache
+from mock_interview_engine import MockInterviewEngine
+from offline_evaluator import REFERENCE_ANSWERS_PATH, OfflineEvaluator
+from question_bank import QuestionBank
+
+FILLER = "so basically I think that this is used a lot in practice and it depends".split()
+
+
+def make_answers(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    with open(REFERENCE_ANSWERS_PATH, encoding="utf-8") as f:
+        references = json.load(f)
+    questions = list(references)
+    pairs = []
+    for _ in range(count):
+        question = rng.choice(questions)
+        words = references[question]["answer"].split()
+        kept = rng.sample(words, rng.randint(0, len(words)))
+        kept += rng.choices(FILLER, k=rng.randint(0, 20))
+        rng.shuffle(kept)
+        pairs.append((question, " ".join(kept)))
+    return pairs
+
+
+async def engine_batch(engine: MockInterviewEngine, pairs: list) -> int:
+    done = 0
+    async for _ in engine.evaluate_batch(pairs):
+        done += 1
+    return done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=20_000)
+    parser.add_argument("--single-sample", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    pairs = make_answers(args.answers, args.seed)
+    question_bank = QuestionBank.load().as_dict()
+    start = time.perf_counter()
+    evaluator = OfflineEvaluator(question_bank)
+    print(f"index build:           {(time.perf_counter() - start) * 1000:8.1f}ms "
+          f"({len(evaluator.vocab)} terms)")
+
+    sample = pairs[:args.single_sample]
+    start = time.perf_counter()
+    single = [asyncio.run(evaluator.evaluate(q, a)) for q, a in sample]
+    elapsed = time.perf_counter() - start
+    print(f"evaluate() one by one: {len(sample) / elapsed:8.0f} answers/s")
+
+    start = time.perf_counter()
+    batch = evaluator.score_batch(pairs)
+    elapsed = time.perf_counter() - start
+    print(f"score_batch():         {len(pairs) / elapsed:8.0f} answers/s ({elapsed:.2f}s)")
+
+    if batch[:len(single)] != single or evaluator.score_batch(pairs) != batch:
+        raise SystemExit("offline scoring is not deterministic")
+
+    engine = MockInterviewEngine(backend=evaluator, cache=EvaluationCache(max_entries=len(pairs)))
+    start = time.perf_counter()
+    done = asyncio.run(engine_batch(engine, pairs))
+    elapsed = time.perf_counter() - start
+    print(f"engine.evaluate_batch: {done / elapsed:8.0f} answers/s (cold cache)")
+
+    scores = sorted(e["score"] for e in batch)
+    print(f"score distribution: min {scores[0]}, median {scores[len(scores) // 2]}, max {scores[-1]}")
+
+
+if __name__ == "__main__":
+    main()
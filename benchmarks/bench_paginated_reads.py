@@ -0,0 +1,74 @@
+"""Compare full-table reads with keyset pages and streaming iteration.
+
+Seeds a scratch database with --records rows (1M by default) and reports
+latency and peak Python memory for get_records(), one get_records_page()
+call deep into the table, and a full pass with iter_records().
+
+    python -m benchmarks.bench_paginated_reads --records 1000000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import database
+
+
+def seed(users: int, records: int) -> None:
+    now = datetime.now().isoformat()
+    with database.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (full_name, email, created_at) VALUES (?, ?, ?)",
+            ((f"Student {i}", f"student{i}@college.edu", now) for i in range(users)),
+        )
+        conn.executemany(
+            "INSERT INTO records (user_id, title, description, created_at) VALUES (?, ?, ?, ?)",
+            ((i % users + 1, f"Record {i}", "Synthetic benchmark record", now)
+             for i in range(records)),
+        )
+
+
+def measure(label: str, fn) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:32s} {elapsed * 1000:10.1f}ms  peak {peak / 2**20:8.1f} MiB  rows {rows}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=database.PAGE_SIZE)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="placementpro-bench-")
+    try:
+        database.DB_NAME = os.path.join(workdir, "bench.db")
+        database.create_tables()
+        start = time.perf_counter()
+        seed(args.users, args.records)
+        print(f"seeded {args.records} records in {time.perf_counter() - start:.1f}s")
+
+        measure("get_records() fetchall", lambda: len(database.get_records()))
+        measure("get_records_page() first page",
+                lambda: len(database.get_records_page(0, args.page_size)[0]))
+        measure("get_records_page() mid-table",
+                lambda: len(database.get_records_page(args.records // 2, args.page_size)[0]))
+        measure("get_records_page() one user",
+                lambda: len(database.get_records_page(0, args.page_size, user_id=42)[0]))
+        measure("iter_records() full stream",
+                lambda: sum(1 for _ in database.iter_records()))
+        database.close_pool()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
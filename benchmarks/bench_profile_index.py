@@ -0,0 +1,69 @@
+"""Microbenchmark ProfileIndex against sklearn StandardScaler + NearestNeighbors.
+
+Checks that both return the same neighbours (and distances to within
+float rounding) and times scale + kneighbors for 1, 1k and 100k queries.
+--profiles controls the reference set size; above
+profile_index.BRUTE_FORCE_MAX the KD-tree backend is used.
+
+    python -m benchmarks.bench_profile_index
+    python -m benchmarks.bench_profile_index --profiles 20000
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+
+from profile_index import ProfileIndex
+from role_catalog import RoleCatalog
+from skill_analyzer import NUM_SKILLS, SKILL_LABELS
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=0,
+                        help="random reference profiles (default: the role catalog)")
+    parser.add_argument("--queries", type=int, nargs="+", default=[1, 1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if not args.profiles:
+        profiles = RoleCatalog.load(skills=SKILL_LABELS).vectors
+    else:
+        profiles = rng.uniform(40, 100, size=(args.profiles, NUM_SKILLS))
+
+    scaler = StandardScaler().fit(profiles)
+    model = NearestNeighbors(n_neighbors=2, metric="euclidean").fit(scaler.transform(profiles))
+    index = ProfileIndex(n_neighbors=2).fit(profiles)
+    backend = "kd_tree" if index.tree is not None else "brute"
+    print(f"profiles: {len(profiles)} (ProfileIndex backend: {backend})")
+
+    for n in args.queries:
+        X = rng.uniform(0, 100, size=(n, NUM_SKILLS))
+
+        expected_dist, expected_idx = model.kneighbors(scaler.transform(X))
+        actual_dist, actual_idx = index.kneighbors(index.transform(X))
+        if not (np.array_equal(expected_idx, actual_idx)
+                and np.allclose(expected_dist, actual_dist)):
+            raise SystemExit(f"ProfileIndex disagrees with sklearn for {n} queries")
+
+        sk = best_of(lambda: model.kneighbors(scaler.transform(X)), args.repeat)
+        np_ = best_of(lambda: index.kneighbors(index.transform(X)), args.repeat)
+        print(f"{n:>7} queries  sklearn {sk * 1000:9.3f}ms  "
+              f"ProfileIndex {np_ * 1000:9.3f}ms  speedup {sk / np_:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark gap-weighted question sampling from a large question bank.
+
+Writes a JSON Lines bank of --questions questions over --skills skills to
+a temporary file, loads it, then runs --interviews interviews of
+--per-interview questions each for --students students through
+MockInterviewEngine.generate_questions. Checks that no student is asked a
+question twice before seeing the whole bank, that asking for more
+questions than a tiny bank holds returns, and reports how the draws split
+between skills compared to their weights.
+
+    python -m benchmarks.bench_question_sampler --questions 50000 --interviews 20000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from mock_interview_engine import GAP_BASE_WEIGHT, MockInterviewEngine
+from offline_evaluator import OfflineEvaluator
+from question_bank import QuestionBank
+
+
+def write_bank(path: str, questions: int, skills: int, seed: int) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(questions):
+            skill = f"Skill {rng.randrange(skills)}"
+            f.write(json.dumps({"skill": skill, "question": f"{skill} question {i}?"}) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=50_000)
+    parser.add_argument("--skills", type=int, default=40)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--interviews", type=int, default=20_000)
+    parser.add_argument("--per-interview", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "questions.jsonl")
+        write_bank(path, args.questions, args.skills, args.seed)
+        start = time.perf_counter()
+        bank = QuestionBank.load(path)
+        print(f"loaded {len(bank)} questions over {len(bank.skills)} skills "
+              f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    rng = random.Random(args.seed)
+    engine = MockInterviewEngine(backend=OfflineEvaluator(), question_bank=bank)
+    # Every student has the same three gaps, largest first
+    gaps = [{"skill": "Skill 0", "gap": 60}, {"skill": "Skill 1", "gap": 30}, {"skill": "Skill 2", "gap": 10}]
+
+    asked = {}
+    counts = Counter()
+    start = time.perf_counter()
+    for i in range(args.interviews):
+        student = i % args.students
+        questions = engine.generate_questions(gaps, args.per_interview, student_id=student, rng=rng)
+        asked.setdefault(student, []).extend(questions)
+        counts.update(q.split(" question ")[0] for q in questions)
+    elapsed = time.perf_counter() - start
+    print(f"generate_questions: {args.interviews / elapsed:,.0f} interviews/s "
+          f"({elapsed / args.interviews * 1e6:.0f}us each, {args.per_interview} questions)")
+
+    for student, questions in asked.items():
+        first_round = questions[:len(bank)]
+        if len(set(first_round)) != len(first_round):
+            raise SystemExit(f"student {student} was asked a question twice")
+    print("no repeated questions per student")
+
+    tiny = MockInterviewEngine(backend=OfflineEvaluator(), question_bank=QuestionBank({"SQL": ["a", "b", "c"]}))
+    start = time.perf_counter()
+    results = [tiny.generate_questions(gaps, 10, student_id=1, rng=rng) for _ in range(1000)]
+    if any(sorted(r) != ["a", "b", "c"] for r in results):
+        raise SystemExit("tiny bank did not return each question once")
+    print(f"tiny bank (3 questions, 10 asked): returned 3 per call, "
+          f"{(time.perf_counter() - start) / len(results) * 1e6:.0f}us each")
+
+    total = sum(counts.values())
+    per_skill = len(bank) / len(bank.skills)
+    weights = {g["skill"]: GAP_BASE_WEIGHT + g["gap"] for g in gaps}
+    mass = {s: weights.get(s, GAP_BASE_WEIGHT) * len(ids) for s, ids in zip(bank.skills, bank.by_skill)}
+    print(f"draw share (expected from weights, ~{per_skill:.0f} questions per skill):")
+    for skill in ["Skill 0", "Skill 1", "Skill 2", "Skill 3"]:
+        print(f"  {skill}: {counts[skill] / total:6.2%} ({mass[skill] / sum(mass.values()):6.2%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare per-student and cohort course recommendations.
+
+Builds a seeded cohort of --students proficiency vectors with mixed
+target roles, computes their gaps once, then times:
+
+    legacy        the old generate_recommendations (3 skills, course dict
+                  rebuilt per call, exact level match) per student
+    per-student   generate_recommendations on each student's gap list
+    cohort        recommend_cohort on the whole matrix in one pass
+
+and checks the cohort pass matches the per-student one exactly.
+
+    python -m benchmarks.bench_recommendations --students 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from skill_analyzer import NUM_SKILLS, SkillAnalyzer
+
+ROLES = ["Data Scientist", "ML Engineer", "Data Analyst", "Research Scientist"]
+
+
+def legacy_recommendations(skill_gaps, student_level='intermediate'):
+    """generate_recommendations as it was before the course catalog"""
+    recommendations = []
+    course_resources = {
+        'Python': [
+            {'name': 'Python for Data Science', 'url': 'https://coursera.org/python-data-science', 'level': 'beginner'},
+            {'name': 'Advanced Python Programming', 'url': 'https://udemy.com/advanced-python', 'level': 'advanced'}
+        ],
+        'Machine Learning': [
+            {'name': 'Machine Learning Specialization', 'url': 'https://coursera.org/ml-specialization', 'level': 'intermediate'},
+            {'name': 'Hands-On ML with Scikit-Learn', 'url': 'https://amazon.com/hands-on-ml', 'level': 'intermediate'}
+        ],
+        'SQL': [
+            {'name': 'SQL for Data Analysis', 'url': 'https://datacamp.com/sql-data-analysis', 'level': 'beginner'},
+            {'name': 'Advanced SQL Queries', 'url': 'https://udemy.com/advanced-sql', 'level': 'advanced'}
+        ]
+    }
+    for gap in skill_gaps[:3]:
+        skill = gap['skill']
+        if skill in course_resources:
+            for course in course_resources[skill]:
+                if course['level'] == student_level:
+                    recommendations.append({
+                        'type': 'course_recommendation',
+                        'skill': skill,
+                        'gap': gap['gap'],
+                        'recommendation': f"Take '{course['name']}' to improve {skill}",
+                        'resource_url': course['url'],
+                        'priority': gap['priority']
+                    })
+                    break
+    if len(recommendations) < 3:
+        recommendations.append({
+            'type': 'general_recommendation',
+            'recommendation': 'Practice mock interviews focusing on your weak areas',
+            'priority': 'Medium'
+        })
+    return recommendations
+
+
+def timed(label: str, fn, students: int):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {elapsed:8.3f}s  ({elapsed / students * 1e6:7.1f}us per student)")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    matrix = rng.integers(0, 101, (args.students, NUM_SKILLS)).astype(float)
+    roles = rng.choice(ROLES, args.students).tolist()
+
+    analyzer = SkillAnalyzer()
+    standards = analyzer.nearest_standards(matrix, roles)
+    gaps = analyzer.analyze_matrix(matrix, roles, standards)
+
+    legacy = timed("legacy", lambda: [legacy_recommendations(g) for g in gaps], args.students)
+    expected = timed("per-student", lambda: [analyzer.generate_recommendations(g) for g in gaps], args.students)
+    actual = timed("cohort", lambda: analyzer.recommend_cohort(matrix, roles, standards), args.students)
+    if actual != expected:
+        raise SystemExit("recommend_cohort output differs from generate_recommendations")
+
+    def courses(recommendations):
+        return sum(r['type'] == 'course_recommendation' for rs in recommendations for r in rs) / args.students
+    print(f"courses per student: legacy {courses(legacy):.2f}, catalog {courses(actual):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark skill-name normalization over a stream of free-text skills.
+
+Generates --strings skill names (1M by default) by mangling the known
+aliases with case changes, stray whitespace/punctuation and typos, mixed
+with unknown skills, then normalizes them all with the shared
+SKILL_NORMALIZER. Reports throughput with a warm cache and the cost of
+resolving every distinct spelling uncached.
+
+    python -m benchmarks.bench_skill_normalizer --strings 1000000
+"""
+import argparse
+import random
+import time
+
+from skill_analyzer import SKILL_MAPPING, SKILL_NORMALIZER
+
+UNKNOWN_SKILLS = ["Java", "Excel", "Tableau", "Pandas", "Spark", "Docker", "R", "NLP", "Git"]
+
+
+def mangle(name: str, rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.3:
+        return name.upper() if rng.random() < 0.5 else name.lower()
+    if roll < 0.5:
+        return f"  {name.replace(' ', rng.choice(['  ', '-', '_']))} "
+    if roll < 0.7 and len(name) > 4:
+        i = rng.randrange(len(name) - 1)
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name
+
+
+def make_strings(count: int, distinct: int, seed: int) -> list:
+    """Draw count strings from a pool of distinct spellings, Zipf-ish skewed"""
+    rng = random.Random(seed)
+    names = list(SKILL_MAPPING) + UNKNOWN_SKILLS
+    pool = [mangle(rng.choice(names), rng) for _ in range(distinct)]
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    return rng.choices(pool, weights=weights, k=count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strings", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    strings = make_strings(args.strings, args.distinct, args.seed)
+    distinct = list(dict.fromkeys(strings))
+
+    SKILL_NORMALIZER.cache_clear()
+    start = time.perf_counter()
+    for name in distinct:
+        SKILL_NORMALIZER.index(name)
+    cold = time.perf_counter() - start
+    matched = sum(SKILL_NORMALIZER.index(name) is not None for name in distinct)
+
+    SKILL_NORMALIZER.cache_clear()
+    start = time.perf_counter()
+    for name in strings:
+        SKILL_NORMALIZER.index(name)
+    elapsed = time.perf_counter() - start
+    info = SKILL_NORMALIZER.cache_info()
+
+    print(f"distinct spellings: {len(distinct)} ({matched} matched a skill), "
+          f"resolved uncached in {cold:.3f}s ({len(distinct) / cold:,.0f}/s)")
+    print(f"normalized {len(strings):,} strings in {elapsed:.3f}s "
+          f"({len(strings) / elapsed:,.0f}/s), cache hit rate "
+          f"{info.hits / (info.hits + info.misses):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Measure app.py rerun latency with and without the caching layer.
+
+Runs a scripted session through Streamlit's AppTest against a scratch
+database of --users users: load the page, type a name and an email one
+keystroke at a time (each keystroke is a rerun), add the user, then page
+forward and back. The session runs against three versions of the page:
+
+    original   create_tables() and the full get_users() table every rerun
+    keyset     create_tables() and an uncached keyset page every rerun
+    cached     app.py: schema setup and pool cached once, keyset pages read per rerun
+
+AppTest adds ~10ms of its own to every rerun, so the per-rerun cost of
+the page's database calls alone is reported as well.
+
+    python -m benchmarks.bench_streamlit_reruns --users 5000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from streamlit.testing.v1 import AppTest
+
+import database
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+ORIGINAL_APP = '''
+import streamlit as st
+from database import create_tables, add_user, get_users
+
+create_tables()
+
+st.title("SQLite Data Structure Demo")
+
+name = st.text_input("Name")
+email = st.text_input("Email")
+
+if st.button("Add User"):
+    add_user(name, email)
+    st.success("User added successfully!")
+
+st.subheader("Stored Users")
+users = get_users()
+st.table(users)
+'''
+
+# app.py with keyset pages but before the caching layer
+UNCACHED_APP = '''
+import streamlit as st
+from database import create_tables, add_user, get_users_page
+
+PAGE_SIZE = 20
+
+create_tables()
+
+st.title("SQLite Data Structure Demo")
+
+name = st.text_input("Name")
+email = st.text_input("Email")
+
+if st.button("Add User"):
+    add_user(name, email)
+    st.success("User added successfully!")
+
+st.subheader("Stored Users")
+
+if "user_cursors" not in st.session_state:
+    st.session_state.user_cursors = [0]
+cursors = st.session_state.user_cursors
+
+users, next_cursor = get_users_page(cursors[-1], PAGE_SIZE)
+st.table(users)
+
+prev_col, page_col, next_col = st.columns([1, 2, 1])
+if prev_col.button("Previous", disabled=len(cursors) == 1):
+    cursors.pop()
+    st.rerun()
+page_col.caption(f"Page {len(cursors)}")
+if next_col.button("Next", disabled=next_cursor is None):
+    cursors.append(next_cursor)
+    st.rerun()
+'''
+
+
+def scripted_session(app: AppTest, tag: str) -> list:
+    """Run the session, returning the wall time of every rerun"""
+    timings = []
+
+    def rerun(action) -> None:
+        start = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - start)
+        assert not app.exception, app.exception
+
+    rerun(app.run)
+    name = f"Student {tag}"
+    for i in range(1, len(name) + 1):
+        rerun(lambda: app.text_input[0].input(name[:i]).run())
+    email = f"{tag}@college.edu"
+    for i in range(1, len(email) + 1):
+        rerun(lambda: app.text_input[1].input(email[:i]).run())
+    rerun(lambda: app.button[0].click().run())
+    if len(app.button) < 3:
+        return timings
+    for _ in range(3):
+        rerun(lambda: app.button[2].click().run())
+    for _ in range(3):
+        rerun(lambda: app.button[1].click().run())
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    ordered = sorted(timings)
+    print(f"{label:<10} {len(timings)} reruns: mean {statistics.mean(timings) * 1000:6.1f}ms  "
+          f"p50 {ordered[len(ordered) // 2] * 1000:6.1f}ms  "
+          f"p90 {ordered[int(len(ordered) * 0.9)] * 1000:6.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "reruns.db")
+        database.create_tables()
+        now = datetime.now().isoformat()
+        with database.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO users (full_name, email, created_at) VALUES (?, ?, ?)",
+                ((f"Student {i}", f"student{i}@college.edu", now) for i in range(args.users)),
+            )
+
+        sessions = [
+            ("original", AppTest.from_string(ORIGINAL_APP, default_timeout=120)),
+            ("keyset", AppTest.from_string(UNCACHED_APP, default_timeout=30)),
+            ("cached", AppTest.from_file(APP_PATH, default_timeout=30)),
+        ]
+        # Same-length tags so every session has the same number of reruns
+        for label, app in sessions:
+            report(label, scripted_session(app, f"{label:>8}".replace(" ", "x")))
+
+        import streamlit_cache
+        print("database calls per rerun:")
+        calls = [
+            ("original", lambda: (database.create_tables(), database.get_users())),
+            ("keyset", lambda: (database.create_tables(), database.get_users_page(0, 20))),
+            ("cached", lambda: (streamlit_cache.init_database(), database.get_users_page(0, 20))),
+        ]
+        for label, call in calls:
+            call()
+            start = time.perf_counter()
+            for _ in range(args.calls):
+                call()
+            print(f"  {label:<10} {(time.perf_counter() - start) / args.calls * 1000:8.3f}ms")
+        database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark cohort skill queries: JSON skills column vs student_skills table.
+
+Seeds --students student profiles with their skills as the legacy JSON
+text column in a scratch database, copies them into student_skills the
+way migration 4 does, then runs the same questions both ways:
+"who has SQL below 60" and "the whole batch's skill matrix".
+
+    python -m benchmarks.bench_student_skills --students 100000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+import database
+from skill_analyzer import SKILL_LABELS, get_analyzer
+from student_skills import copy_json_skills, skill_matrix, students_below
+
+BATCHES = ["2024", "2025", "2026", "2027"]
+DEPARTMENTS = ["CSE", "IT", "ECE", "Mechanical"]
+
+
+def seed(students: int, rng: random.Random) -> None:
+    now = datetime.now().isoformat()
+    with database.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (full_name, email, role, created_at) VALUES (?, ?, 'student', ?)",
+            ((f"Student {i}", f"student{i}@college.edu", now) for i in range(students)),
+        )
+        profiles = []
+        for user_id in range(1, students + 1):
+            skills = [{"skill_name": name, "proficiency": rng.randrange(101), "category": "Technical"}
+                      for name in SKILL_LABELS if rng.random() < 0.9]
+            profiles.append((user_id, rng.choice(BATCHES), rng.choice(DEPARTMENTS),
+                             round(rng.uniform(5, 10), 2), json.dumps(skills)))
+        conn.executemany(
+            "INSERT INTO student_profiles (user_id, batch, department, cgpa, skills) VALUES (?, ?, ?, ?, ?)",
+            profiles,
+        )
+
+
+def timed(label: str, fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<46} {best * 1000:9.1f}ms")
+    return result
+
+
+def json_students_below(skill: str, threshold: float) -> list:
+    with database.connection() as conn:
+        rows = conn.execute("SELECT user_id, skills FROM student_profiles ORDER BY user_id").fetchall()
+    return [user_id for user_id, text in rows
+            if any(s["skill_name"] == skill and s["proficiency"] < threshold for s in json.loads(text))]
+
+
+def json_skill_matrix(batch: str) -> tuple:
+    with database.connection() as conn:
+        rows = conn.execute(
+            "SELECT user_id, skills FROM student_profiles WHERE batch = ? ORDER BY user_id", (batch,)
+        ).fetchall()
+    analyzer = get_analyzer()
+    return (np.array([user_id for user_id, _ in rows]),
+            analyzer.build_skill_matrix([json.loads(text) for _, text in rows]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "skills.db")
+        database.create_tables()
+        seed(args.students, random.Random(args.seed))
+
+        start = time.perf_counter()
+        with database.transaction() as conn:
+            copy_json_skills(conn)
+            copied = conn.execute("SELECT COUNT(*) FROM student_skills").fetchone()[0]
+        print(f"copied {copied} skill rows out of {args.students} JSON columns "
+              f"in {time.perf_counter() - start:.2f}s")
+
+        legacy = timed("JSON column: SQL < 60", lambda: json_students_below("SQL", 60))
+        indexed = timed("student_skills: SQL < 60", lambda: students_below("SQL", 60))
+        assert legacy == indexed
+        print(f"  {len(indexed)} students")
+        timed("student_skills: SQL < 60, batch 2025 / CSE",
+              lambda: students_below("SQL", 60, batch="2025", department="CSE"))
+
+        legacy_ids, legacy_matrix = timed("JSON column: batch 2025 skill matrix", lambda: json_skill_matrix("2025"))
+        ids, matrix = timed("student_skills: batch 2025 skill matrix", lambda: skill_matrix(batch="2025"))
+        # Students without any recorded skill have no student_skills rows
+        keep = np.isin(legacy_ids, ids)
+        assert np.array_equal(legacy_ids[keep], ids) and np.array_equal(legacy_matrix[keep], matrix)
+        print(f"  {matrix.shape[0]} x {matrix.shape[1]} matrix")
+        timed("student_skills: full cohort skill matrix", lambda: skill_matrix(), repeat=1)
+
+        database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""Run repeatable benchmark scenarios on a synthetic cohort and compare them with a baseline.
+
+Builds the seeded cohort for --scale (see synthetic_cohort.py), reusing
+the database saved in --data-dir when its fingerprint still matches,
+then times every scenario --repeat times after --warmup untimed runs
+(looping scenarios shorter than --min-time within each timing):
+
+    analyzer.*   SkillAnalyzer gap analysis and course recommendations, per
+                 student on a --sample of students and for the whole cohort
+    engine.*     MockInterviewEngine question selection and offline scoring
+    db.*         the dashboard page read, cohort pivots, a full keyset scan,
+                 the TPO aggregates and the skills write path
+
+Results are JSON: run metadata (cohort, seed and data fingerprint,
+Python/NumPy versions, platform, git commit) and, per scenario, every
+run's seconds plus min/median/max and the median time per operation.
+--save-baseline keeps a run; --baseline compares the median time per
+operation with a saved run and exits with status 1 when a scenario got
+more than --threshold slower, beyond the spread of either run's timings.
+Baselines are only comparable on the same machine, cohort and seed.
+
+    python -m benchmarks.suite --scale 100k --save-baseline baseline-100k.json
+    python -m benchmarks.suite --scale 100k --baseline baseline-100k.json --output run.json
+    python -m benchmarks.suite --scale 1k --only analyzer. --only db.dashboard
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import cohort_analytics
+import database
+import instrumentation
+from benchmarks.synthetic_cohort import (
+    GENERATOR_VERSION, SCALES, AnswerWriter, Cohort, load_metadata, write_course_catalog, write_database,
+)
+
+DATA_DIR = os.path.join(tempfile.gettempdir(), 'placementpro-benchmarks')
+# Students per call in the whole-cohort analyzer scenarios, bounding memory at 1M
+COHORT_CHUNK = 50_000
+# Courses in the synthetic catalog of the large-catalog scenario
+LARGE_CATALOG_COURSES = 500
+# Students rewritten per run of the write-path scenario
+WRITE_SAMPLE = 200
+# Shortest single timing; faster scenarios are looped until they take this long
+MIN_TIME = 0.2
+# Change in median time per operation counted as a regression (or improvement)
+THRESHOLD = 0.10
+
+
+class Workload:
+    """The cohort, its database and the objects scenarios share, built once per run"""
+
+    def __init__(self, students: int, seed: int, data_dir: str, sample: int, answers: int):
+        self.students = students
+        self.seed = seed
+        self.data_dir = data_dir
+        self.answers = answers
+        os.makedirs(data_dir, exist_ok=True)
+
+        self.cohort = Cohort(students, seed)
+        self.db_path = os.path.join(data_dir, f'cohort-{students}-seed{seed}-v{GENERATOR_VERSION}.db')
+        metadata = load_metadata(self.db_path)
+        if metadata is None or metadata['fingerprint'] != self.cohort.fingerprint:
+            for suffix in ('', '.json', '-wal', '-shm'):
+                if os.path.exists(self.db_path + suffix):
+                    os.remove(self.db_path + suffix)
+            print(f"Generating {students} students into {self.db_path}", file=sys.stderr)
+            metadata = write_database(self.db_path, students, seed,
+                                      progress=lambda line: print(line, file=sys.stderr))
+        self.metadata = metadata
+        database.close_pool()
+        database.DB_NAME = self.db_path
+
+        from skill_analyzer import SkillAnalyzer
+
+        self.model_path = os.path.join(data_dir, 'skill_model.npz')
+        self.analyzer = SkillAnalyzer(self.model_path)
+        rng = np.random.default_rng([seed, 1])
+        # Random order, so point reads don't walk the table front to back
+        self.sample = rng.choice(students, min(sample, students), replace=False)
+        self.sample_ids = self.cohort.user_ids[self.sample].tolist()
+        self.sample_roles = [self.cohort.roles[row] for row in self.sample.tolist()]
+
+    def chunks(self):
+        """(matrix, roles) slices of the whole cohort, COHORT_CHUNK students each"""
+        for start in range(0, self.students, COHORT_CHUNK):
+            yield self.cohort.matrix[start:start + COHORT_CHUNK], self.cohort.roles[start:start + COHORT_CHUNK]
+
+    def sample_gaps(self) -> List[List[Dict]]:
+        return self.analyzer.analyze_matrix(self.cohort.matrix[self.sample], self.sample_roles)
+
+    def engine(self):
+        from mock_interview_engine import MockInterviewEngine
+        from offline_evaluator import OfflineEvaluator
+        from question_bank import QuestionBank
+
+        bank = QuestionBank.load()
+        return MockInterviewEngine(backend=OfflineEvaluator(bank.as_dict()), question_bank=bank)
+
+
+# A scenario takes the workload and returns (run, operations per run, unit)
+Scenario = Callable[[Workload], Tuple[Callable[[], None], int, str]]
+
+
+def analyze_skill_gaps(w: Workload):
+    skills = [w.cohort.skills(row) for row in w.sample.tolist()]
+
+    def run():
+        for student_skills, role in zip(skills, w.sample_roles):
+            w.analyzer.analyze_skill_gaps(student_skills, role)
+    return run, len(skills), 'student'
+
+
+def generate_recommendations(w: Workload):
+    gaps = w.sample_gaps()
+
+    def run():
+        for skill_gaps in gaps:
+            w.analyzer.generate_recommendations(skill_gaps)
+    return run, len(gaps), 'student'
+
+
+def analyze_matrix(w: Workload):
+    def run():
+        for matrix, roles in w.chunks():
+            w.analyzer.analyze_matrix(matrix, roles)
+    return run, w.students, 'student'
+
+
+def recommend_cohort(w: Workload, analyzer=None):
+    analyzer = analyzer or w.analyzer
+
+    def run():
+        for matrix, roles in w.chunks():
+            analyzer.recommend_cohort(matrix, roles)
+    return run, w.students, 'student'
+
+
+def recommend_cohort_large_catalog(w: Workload):
+    from skill_analyzer import SkillAnalyzer
+
+    path = os.path.join(w.data_dir, f'courses-{LARGE_CATALOG_COURSES}-seed{w.seed}.json')
+    write_course_catalog(path, LARGE_CATALOG_COURSES, w.seed)
+    return recommend_cohort(w, SkillAnalyzer(w.model_path, course_catalog_path=path))
+
+
+def generate_questions(w: Workload):
+    engine = w.engine()
+    gaps = w.sample_gaps()
+
+    def run():
+        # Same draws every run: fresh history and a reseeded generator
+        engine.seen.clear()
+        rng = random.Random(w.seed)
+        for user_id, skill_gaps in zip(w.sample_ids, gaps):
+            engine.generate_questions(skill_gaps, 5, user_id, rng)
+    return run, len(gaps), 'student'
+
+
+def evaluate_batch(w: Workload):
+    from evaluation_cache import EvaluationCache
+
+    engine = w.engine()
+    pairs = AnswerWriter().pairs(w.answers, w.seed)
+
+    async def score():
+        async for _ in engine.evaluate_batch(pairs):
+            pass
+
+    def run():
+        # An empty cache each run, so every answer is scored
+        engine.cache = EvaluationCache()
+        asyncio.run(score())
+    return run, len(pairs), 'answer'
+
+
+def dashboard(w: Workload):
+    from api import build_dashboard
+
+    def run():
+        for user_id in w.sample_ids:
+            build_dashboard(user_id)
+    return run, len(w.sample_ids), 'page'
+
+
+def skill_matrix_cohort(w: Workload):
+    from student_skills import skill_matrix
+
+    def run():
+        skill_matrix(batch='2025', department='CSE')
+    return run, 1, 'query'
+
+
+def skill_matrix_all(w: Workload):
+    from student_skills import skill_matrix
+
+    def run():
+        skill_matrix()
+    return run, w.students, 'student'
+
+
+def iter_users(w: Workload):
+    def run():
+        for _ in database.iter_users():
+            pass
+    return run, w.students, 'row'
+
+
+def cohort_export(w: Workload):
+    def run():
+        cohort_analytics.export()
+    return run, 1, 'query'
+
+
+def set_student_skills(w: Workload):
+    from student_skills import set_student_skills as write
+
+    rows = w.sample[:WRITE_SAMPLE].tolist()
+    # Each student's generated skills are written back unchanged, so the database stays as generated
+    writes = [(int(w.cohort.user_ids[row]), w.cohort.skills(row)) for row in rows]
+
+    def run():
+        for user_id, skills in writes:
+            write(user_id, skills)
+    return run, len(writes), 'write'
+
+
+# (name, scenario); run in this order
+SCENARIOS: List[Tuple[str, Scenario]] = [
+    ('analyzer.analyze_skill_gaps', analyze_skill_gaps),
+    ('analyzer.generate_recommendations', generate_recommendations),
+    ('analyzer.analyze_matrix', analyze_matrix),
+    ('analyzer.recommend_cohort', recommend_cohort),
+    ('analyzer.recommend_cohort.large_catalog', recommend_cohort_large_catalog),
+    ('engine.generate_questions', generate_questions),
+    ('engine.evaluate_batch', evaluate_batch),
+    ('db.dashboard', dashboard),
+    ('db.skill_matrix.cohort', skill_matrix_cohort),
+    ('db.skill_matrix.all', skill_matrix_all),
+    ('db.iter_users', iter_users),
+    ('db.cohort_export', cohort_export),
+    ('db.set_student_skills', set_student_skills),
+]
+
+
+def measure(run: Callable[[], None], repeat: int, warmup: int, min_time: float) -> Tuple[List[float], int]:
+    """Seconds per run for each of `repeat` timings, and the runs per timing
+
+    Like timeit's autorange, short scenarios are run in a loop until one
+    timing takes at least min_time, so timer resolution and scheduler
+    noise don't dominate sub-millisecond scenarios.
+    """
+    for _ in range(warmup):
+        run()
+
+    def timing(loops):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        return time.perf_counter() - start
+
+    loops = 1
+    elapsed = timing(loops)
+    while elapsed < min_time:
+        loops *= 2 if elapsed == 0 else min(max(2, int(min_time / elapsed * 1.2)), 1000)
+        elapsed = timing(loops)
+    return [timing(loops) / loops for _ in range(repeat)], loops
+
+
+def summarize(times: List[float], loops: int, ops: int, unit: str) -> Dict:
+    median = statistics.median(times)
+    return {
+        'unit': unit,
+        'ops': ops,
+        'loops': loops,
+        'runs': times,
+        'min': min(times),
+        'median': median,
+        'max': max(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'per_op': median / ops,
+        'ops_per_second': ops / median if median else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_suite(w: Workload, only: List[str], repeat: int, warmup: int, min_time: float, metrics: bool) -> Dict:
+    results = {
+        'meta': {
+            'generator': GENERATOR_VERSION,
+            'students': w.students,
+            'seed': w.seed,
+            'fingerprint': w.cohort.fingerprint,
+            'sample': len(w.sample_ids),
+            'answers': w.answers,
+            'repeat': repeat,
+            'warmup': warmup,
+            'min_time': min_time,
+            'metrics': metrics,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'commit': _git_commit(),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'scenarios': {},
+    }
+    for name, scenario in SCENARIOS:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        run, ops, unit = scenario(w)
+        if metrics:
+            instrumentation.enable()
+            instrumentation.reset()
+        result = summarize(*measure(run, repeat, warmup, min_time), ops, unit)
+        if metrics:
+            result['timers'] = instrumentation.snapshot()['timers']
+            instrumentation.disable()
+        results['scenarios'][name] = result
+        print(f"{name:<42} {result['median']:9.4f}s  {_per_op(result['per_op']):>10}/{unit:<8}"
+              f" {result['ops_per_second']:12,.0f} {unit}/s", file=sys.stderr)
+    database.close_pool()
+    return results
+
+
+def _per_op(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds * 1e6:.1f}us"
+
+
+def compare(results: Dict, baseline: Dict, threshold: float = THRESHOLD) -> List[Tuple[str, Optional[float], Optional[float], Optional[float], str]]:
+    """(scenario, baseline per-op, current per-op, relative change, verdict) for every scenario in either run
+
+    The verdict is 'slower' or 'faster' when the change in median exceeds
+    threshold and the two runs' timings don't overlap (every timing of one
+    run beats every timing of the other), 'same' otherwise, and 'new' or
+    'missing' when only one run has the scenario. Raises ValueError if the
+    runs used different cohorts.
+    """
+    for key in ('generator', 'students', 'seed', 'fingerprint', 'metrics'):
+        if baseline['meta'].get(key) != results['meta'].get(key):
+            raise ValueError(f"Baseline was run with {key}={baseline['meta'].get(key)!r}, "
+                             f"this run with {results['meta'].get(key)!r}")
+
+    rows = []
+    current, previous = results['scenarios'], baseline['scenarios']
+    for name in list(previous) + [name for name in current if name not in previous]:
+        if name not in current:
+            rows.append((name, previous[name]['per_op'], None, None, 'missing'))
+        elif name not in previous:
+            rows.append((name, None, current[name]['per_op'], None, 'new'))
+        else:
+            before, after = previous[name], current[name]
+            change = after['per_op'] / before['per_op'] - 1
+            if change > threshold and after['min'] / after['ops'] > before['max'] / before['ops']:
+                verdict = 'slower'
+            elif change < -threshold and after['max'] / after['ops'] < before['min'] / before['ops']:
+                verdict = 'faster'
+            else:
+                verdict = 'same'
+            before, after = before['per_op'], after['per_op']
+            rows.append((name, before, after, change, verdict))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default='1k')
+    parser.add_argument("--students", type=int, help="overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where cohort databases are kept between runs")
+    parser.add_argument("--sample", type=int, default=1000, help="students in the per-student scenarios")
+    parser.add_argument("--answers", type=int, default=10_000, help="answers scored by engine.evaluate_batch")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--min-time", type=float, default=MIN_TIME,
+                        help="seconds each timing lasts at least; short scenarios are looped")
+    parser.add_argument("--only", action="append", default=[], metavar="PREFIX",
+                        help="run only scenarios starting with PREFIX (repeatable)")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    parser.add_argument("--metrics", action="store_true",
+                        help="attach instrumentation timers per scenario (slows every scenario down)")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also write the results as a baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    if args.list:
+        for name, _ in SCENARIOS:
+            print(name)
+        return
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    workload = Workload(args.students or SCALES[args.scale], args.seed, args.data_dir, args.sample, args.answers)
+    results = run_suite(workload, args.only, args.repeat, args.warmup, args.min_time, args.metrics)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+    if not args.output:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if baseline is not None:
+        try:
+            rows = compare(results, baseline, args.threshold)
+        except ValueError as e:
+            raise SystemExit(f"Cannot compare with {args.baseline}: {e}")
+        print(f"\nCompared with {args.baseline} (commit {baseline['meta'].get('commit')}):", file=sys.stderr)
+        for name, before, after, change, verdict in rows:
+            before = _per_op(before) if before is not None else '-'
+            after = _per_op(after) if after is not None else '-'
+            change = f"{change:+.1%}" if change is not None else ''
+            print(f"  {name:<42} {before:>10} -> {after:>10} {change:>8}  {verdict}", file=sys.stderr)
+        if any(verdict == 'slower' for *_, verdict in rows):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""Seeded synthetic cohorts for benchmarks: users, profiles, skills, interviews and course catalogs.
+
+Students are generated CHUNK_SIZE at a time, each chunk from its own
+seeded generator, so a cohort is identical however it is consumed: the
+in-memory arrays (Cohort) and the database (write_database) hold
+the same students, and the 1M cohort is the 1k cohort plus more rows.
+
+Per student:
+
+    users              student{id}@college.edu, one shared password hash
+    student_profiles   university, batch, department, CGPA, phone and a
+                       target role from the role catalog
+    student_skills     proficiency = ability + role affinity + noise, each
+                       skill recorded with probability SKILL_RECORDED
+    interviews         INTERVIEW_RATE of students have one completed session
+                       of QUESTIONS_PER_INTERVIEW answered, scored questions
+                       (plus skill_score_history / skill_scores rows)
+
+Dates count back from EPOCH rather than now, so two runs write the same
+rows. Write a cohort database for other tools with:
+
+    python -m benchmarks.synthetic_cohort --scale 100k --db /tmp/cohort-100k.db
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import cohort_analytics
+import database
+from auth import hash_password
+from migrations import migrate
+from offline_evaluator import REFERENCE_ANSWERS_PATH
+from question_bank import QuestionBank
+from role_catalog import RoleCatalog
+from skill_analyzer import NUM_SKILLS, SKILL_LABELS
+
+# Bump when a change alters the generated rows, so saved databases and baselines are not reused
+GENERATOR_VERSION = 1
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+# Students per seeded chunk; part of the generated data, like GENERATOR_VERSION
+CHUNK_SIZE = 10_000
+
+EPOCH = datetime(2025, 6, 1)
+DEFAULT_PASSWORD = 'benchmark-password'
+
+UNIVERSITIES = ['IIT Bombay', 'IIT Delhi', 'NIT Trichy', 'BITS Pilani', 'VIT Vellore', 'Anna University',
+                'Pune University', 'Jadavpur University']
+BATCHES = ['2024', '2025', '2026', '2027']
+DEPARTMENTS = ['CSE', 'IT', 'ECE', 'EEE', 'Mechanical', 'Civil']
+FIRST_NAMES = ['Aarav', 'Aditi', 'Arjun', 'Diya', 'Ishaan', 'Kavya', 'Meera', 'Neha', 'Priya', 'Rahul',
+               'Rohan', 'Saanvi', 'Siddharth', 'Sneha', 'Tanvi', 'Vikram']
+LAST_NAMES = ['Agarwal', 'Banerjee', 'Gupta', 'Iyer', 'Joshi', 'Kumar', 'Menon', 'Nair', 'Patel', 'Rao',
+              'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma']
+SOFT_SKILLS = {'Communication'}
+
+# Share of students whose skills row exists for a given skill
+SKILL_RECORDED = 0.85
+INTERVIEW_RATE = 0.4
+QUESTIONS_PER_INTERVIEW = 5
+FILLER = "so basically I think that this is used a lot in practice and it depends".split()
+COURSE_TOPICS = ['Foundations', 'Bootcamp', 'in Practice', 'Deep Dive', 'Projects', 'Masterclass', 'Case Studies']
+
+
+class Roles:
+    """Target roles from the role catalog with each role's skill affinity"""
+
+    def __init__(self):
+        catalog = RoleCatalog.load(skills=SKILL_LABELS)
+        self.names = list(dict.fromkeys(catalog.roles))
+        standards = np.array([catalog.vectors[catalog.role_rows[name.lower()]].mean(axis=0) for name in self.names])
+        # Students lean towards the skills their target role asks most of
+        self.affinity = (standards - standards.mean(axis=1, keepdims=True)) * 0.5
+
+
+def chunk_count(students: int) -> int:
+    return -(-students // CHUNK_SIZE)
+
+
+def student_chunk(seed: int, chunk: int, students: int, roles: Roles) -> Dict[str, np.ndarray]:
+    """Columns for students chunk * CHUNK_SIZE + 1 onwards (ids are 1-based)"""
+    first = chunk * CHUNK_SIZE
+    count = min(CHUNK_SIZE, students - first)
+    rng = np.random.default_rng([seed, chunk])
+
+    role = rng.integers(0, len(roles.names), count)
+    ability = rng.normal(0, 1, count)
+    matrix = 55 + 15 * ability[:, None] + roles.affinity[role] + rng.normal(0, 12, (count, NUM_SKILLS))
+    matrix = np.clip(np.rint(matrix), 0, 100)
+    recorded = rng.random((count, NUM_SKILLS)) < SKILL_RECORDED
+    # Unrecorded skills read back as 0, as in student_skills.skill_matrix
+    matrix[~recorded] = 0
+
+    return {
+        'user_ids': np.arange(first + 1, first + count + 1),
+        'matrix': matrix,
+        'recorded': recorded,
+        'role': role,
+        'cgpa': np.clip(np.round(7.2 + 0.8 * ability + rng.normal(0, 0.7, count), 2), 4.0, 10.0),
+        'batch': rng.integers(0, len(BATCHES), count),
+        'department': rng.integers(0, len(DEPARTMENTS), count),
+        'university': rng.integers(0, len(UNIVERSITIES), count),
+        'created_days': rng.integers(0, 730, count),
+        'interviewed': rng.random(count) < INTERVIEW_RATE,
+    }
+
+
+def iter_chunks(students: int, seed: int, roles: Optional[Roles] = None) -> Iterator[Dict[str, np.ndarray]]:
+    roles = roles or Roles()
+    for chunk in range(chunk_count(students)):
+        yield student_chunk(seed, chunk, students, roles)
+
+
+class Cohort:
+    """A whole generated cohort as arrays, one row per student"""
+
+    def __init__(self, students: int, seed: int):
+        self.students = students
+        self.seed = seed
+        roles = Roles()
+        chunks = list(iter_chunks(students, seed, roles))
+        self.user_ids = np.concatenate([c['user_ids'] for c in chunks])
+        self.matrix = np.concatenate([c['matrix'] for c in chunks])
+        self.recorded = np.concatenate([c['recorded'] for c in chunks])
+        self.roles = [roles.names[i] for c in chunks for i in c['role'].tolist()]
+        self.batches = np.concatenate([c['batch'] for c in chunks])
+        self.departments = np.concatenate([c['department'] for c in chunks])
+        digest = fingerprint(students, seed)
+        for chunk in chunks:
+            add_chunk(digest, chunk)
+        # Tells whether two runs used the same data
+        self.fingerprint = digest.hexdigest()
+
+    def skills(self, row: int) -> List[Dict]:
+        """One student's skills as the dashboard sends them"""
+        return [
+            {'skill_name': skill, 'proficiency': int(self.matrix[row, k]),
+             'category': 'soft' if skill in SOFT_SKILLS else 'technical'}
+            for k, skill in enumerate(SKILL_LABELS) if self.recorded[row, k]
+        ]
+
+
+FINGERPRINT_COLUMNS = ('matrix', 'role', 'cgpa', 'batch', 'department', 'interviewed')
+
+
+def fingerprint(students: int, seed: int):
+    """Running digest of the generated columns; feed it every chunk with add_chunk()"""
+    return hashlib.sha256(f'{GENERATOR_VERSION}:{students}:{seed}'.encode('ascii'))
+
+
+def add_chunk(digest, chunk: Dict[str, np.ndarray]) -> None:
+    for column in FINGERPRINT_COLUMNS:
+        digest.update(np.ascontiguousarray(chunk[column]).tobytes())
+
+
+def _answer(rng: random.Random, reference: List[str], question: str, quality: float) -> str:
+    words = reference or question.split()
+    kept = rng.sample(words, max(1, int(len(words) * quality)))
+    kept += rng.choices(FILLER, k=rng.randint(2, 12))
+    rng.shuffle(kept)
+    return ' '.join(kept)
+
+
+class AnswerWriter:
+    """Question/answer text for generated interviews, from the question bank and reference answers"""
+
+    def __init__(self):
+        bank = QuestionBank.load().as_dict()
+        with open(REFERENCE_ANSWERS_PATH, encoding='utf-8') as f:
+            references = json.load(f)
+        self.questions = {skill: bank.get(skill, []) for skill in SKILL_LABELS}
+        self.references = {q: entry['answer'].split() for q, entry in references.items()}
+
+    def pairs(self, count: int, seed: int) -> List[Tuple[str, str]]:
+        """count (question, answer) pairs of mixed quality"""
+        rng = random.Random(f'answers:{seed}')
+        questions = [q for texts in self.questions.values() for q in texts]
+        pairs = []
+        for _ in range(count):
+            question = rng.choice(questions)
+            pairs.append((question, _answer(rng, self.references.get(question), question, rng.random())))
+        return pairs
+
+    def interview(self, rng: random.Random, proficiency: np.ndarray) -> List[Tuple[str, str, str, int]]:
+        """(skill, question, answer, score) for one session, weakest skills asked most"""
+        skills = [k for k, skill in enumerate(SKILL_LABELS) if self.questions[skill]]
+        weights = [105 - proficiency[k] for k in skills]
+        picked = []
+        for k in rng.choices(skills, weights, k=QUESTIONS_PER_INTERVIEW):
+            skill = SKILL_LABELS[k]
+            question = rng.choice(self.questions[skill])
+            score = int(min(100, max(0, 20 + 0.7 * proficiency[k] + rng.gauss(0, 10))))
+            answer = _answer(rng, self.references.get(question), question, score / 100)
+            picked.append((skill, question, answer, score))
+        return picked
+
+
+def _student_rows(chunk: Dict[str, np.ndarray], roles: Roles, password_hash: str):
+    users, profiles, skills = [], [], []
+    for row, user_id in enumerate(chunk['user_ids'].tolist()):
+        first = FIRST_NAMES[user_id % len(FIRST_NAMES)]
+        last = LAST_NAMES[user_id // len(FIRST_NAMES) % len(LAST_NAMES)]
+        created_at = (EPOCH - timedelta(days=int(chunk['created_days'][row]))).isoformat()
+        users.append((user_id, f'{first} {last}', f'student{user_id}@college.edu', password_hash, created_at))
+        profiles.append((
+            user_id,
+            UNIVERSITIES[chunk['university'][row]],
+            BATCHES[chunk['batch'][row]],
+            float(chunk['cgpa'][row]),
+            DEPARTMENTS[chunk['department'][row]],
+            f'+91 9{user_id:09d}',
+            roles.names[chunk['role'][row]],
+        ))
+        for k, skill in enumerate(SKILL_LABELS):
+            if chunk['recorded'][row, k]:
+                category = 'soft' if skill in SOFT_SKILLS else 'technical'
+                skills.append((user_id, skill, float(chunk['matrix'][row, k]), category, created_at))
+    return users, profiles, skills
+
+
+def _interview_rows(chunk: Dict[str, np.ndarray], seed: int, chunk_no: int, writer: AnswerWriter, next_session: int):
+    rng = random.Random(f'interviews:{seed}:{chunk_no}')
+    sessions, questions, history, totals = [], [], [], {}
+    for row in np.flatnonzero(chunk['interviewed']).tolist():
+        user_id = int(chunk['user_ids'][row])
+        asked = writer.interview(rng, chunk['matrix'][row])
+        started = EPOCH - timedelta(days=rng.randrange(180), seconds=rng.randrange(86_400))
+        session_id = next_session
+        next_session += 1
+        for position, (skill, question, answer, score) in enumerate(asked):
+            answered_at = (started + timedelta(minutes=2 * (position + 1))).isoformat()
+            evaluation = json.dumps({'score': score, 'feedback': 'Generated for benchmarks'})
+            questions.append((session_id, position, question, skill, answer, evaluation, score, answered_at))
+            history.append((user_id, skill, session_id, score, answered_at))
+            attempts, total, best, _, _ = totals.get((user_id, skill), (0, 0, 0, 0, ''))
+            totals[user_id, skill] = (attempts + 1, total + score, max(best, score), score, answered_at)
+        completed_at = (started + timedelta(minutes=2 * len(asked))).isoformat()
+        score_sum = sum(score for _, _, _, score in asked)
+        sessions.append((session_id, user_id, 'completed', len(asked), len(asked), len(asked), score_sum,
+                         started.isoformat(), completed_at))
+    scores = [(user_id, skill) + values for (user_id, skill), values in totals.items()]
+    return sessions, questions, history, scores, next_session
+
+
+def write_database(path: str, students: int, seed: int, progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """Create a cohort database at `path` (which must not exist) and return its metadata
+
+    The metadata is also written next to the database as <path>.json;
+    load_metadata() uses it to tell whether a saved database can be reused.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists")
+    started = time.perf_counter()
+    roles = Roles()
+    writer = AnswerWriter()
+    password_hash = hash_password(DEFAULT_PASSWORD)
+
+    conn = database.get_connection(path)
+    migrate(conn)
+    digest = fingerprint(students, seed)
+    next_session = 1
+    try:
+        for chunk_no, chunk in enumerate(iter_chunks(students, seed, roles)):
+            users, profiles, skills = _student_rows(chunk, roles, password_hash)
+            sessions, questions, history, scores, next_session = _interview_rows(
+                chunk, seed, chunk_no, writer, next_session)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO users (id, full_name, email, password_hash, role, created_at) VALUES (?, ?, ?, ?, 'student', ?)",
+                users)
+            conn.executemany(
+                "INSERT INTO student_profiles (user_id, university, batch, cgpa, department, phone, target_role) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", profiles)
+            conn.executemany(
+                "INSERT INTO student_skills (user_id, skill, proficiency, category, updated_at) VALUES (?, ?, ?, ?, ?)",
+                skills)
+            conn.executemany(
+                "INSERT INTO interview_sessions (id, user_id, status, question_count, answered_count, scored_count, "
+                "score_sum, started_at, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", sessions)
+            conn.executemany(
+                "INSERT INTO interview_questions (session_id, position, question, skill, answer, evaluation, score, "
+                "answered_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", questions)
+            conn.executemany(
+                "INSERT INTO skill_score_history (user_id, skill, session_id, score, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                history)
+            conn.executemany(
+                "INSERT INTO skill_scores (user_id, skill, attempts, score_sum, best_score, last_score, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", scores)
+            conn.commit()
+            add_chunk(digest, chunk)
+            if progress:
+                progress(f"  {min((chunk_no + 1) * CHUNK_SIZE, students):>9} / {students} students")
+
+        if progress:
+            progress("  building cohort aggregates")
+        conn.execute("BEGIN IMMEDIATE")
+        cohort_analytics.rebuild(conn)
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    metadata = {
+        'generator': GENERATOR_VERSION,
+        'students': students,
+        'seed': seed,
+        'fingerprint': digest.hexdigest(),
+        'interview_sessions': next_session - 1,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    with open(f'{path}.json', 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+def load_metadata(path: str) -> Optional[Dict]:
+    """Metadata of a database written by write_database, or None if it is missing or incomplete"""
+    try:
+        with open(f'{path}.json', encoding='utf-8') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return metadata if os.path.exists(path) else None
+
+
+def course_catalog(courses: int, seed: int) -> Dict:
+    """A course catalog of `courses` entries in the data/course_catalog.json format"""
+    rng = random.Random(f'courses:{seed}')
+    levels = ['beginner', 'intermediate', 'advanced']
+    entries = []
+    for i in range(courses):
+        primary = SKILL_LABELS[i % NUM_SKILLS]
+        level = levels[i // NUM_SKILLS % len(levels)]
+        skills = {primary: 1.0}
+        for other in rng.sample([s for s in SKILL_LABELS if s != primary], rng.randint(0, 2)):
+            skills[other] = round(rng.uniform(0.1, 0.6), 2)
+        entries.append({
+            'name': f"{primary} {rng.choice(COURSE_TOPICS)} {i + 1}",
+            'url': f'https://courses.example.edu/{i + 1}',
+            'level': level,
+            'skills': skills,
+        })
+    return {'version': GENERATOR_VERSION, 'levels': levels, 'courses': entries}
+
+
+def write_course_catalog(path: str, courses: int, seed: int) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(course_catalog(courses, seed), f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default='1k')
+    parser.add_argument("--students", type=int, help="overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", required=True, help="database to create")
+    parser.add_argument("--courses", type=int, default=0, help="also write a course catalog of this many courses")
+    args = parser.parse_args()
+
+    students = args.students or SCALES[args.scale]
+    print(f"Generating {students} students (seed {args.seed}) into {args.db}")
+    metadata = write_database(args.db, students, args.seed, progress=print)
+    print(json.dumps(metadata, indent=2))
+    if args.courses:
+        path = os.path.splitext(args.db)[0] + '-courses.json'
+        write_course_catalog(path, args.courses, args.seed)
+        print(f"Course catalog of {args.courses} courses: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""Materialized cohort aggregates for the TPO and faculty views
+
+Every student with a profile contributes one count to a handful of
+histograms, keyed by (batch, department, metric, bucket):
+
+    cgpa          CGPA in CGPA_BUCKET-wide buckets
+    readiness     placement readiness (SkillAnalyzer.readiness), 1-point buckets
+    gap:<skill>   gap to the industry standard, GAP_BUCKET-wide buckets
+
+cohort_members remembers which buckets each student counted towards, so
+refresh_students() can move a student between buckets without rescanning
+the cohort. Interview scores are summed per (batch, department, month)
+in cohort_interview_trends as they are recorded.
+
+Queries read a few hundred counter rows at most and return NumPy arrays;
+export() bundles everything for one cohort as columnar arrays.
+
+Gap and readiness buckets depend on the analyzer, so the histograms
+record the SkillAnalyzer.fingerprint they were counted with in
+cohort_analytics_state. When the role catalog or the model changes,
+the next query or refresh_students() call rebuilds them first.
+"""
+import json
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+import database
+from skill_analyzer import SKILL_LABELS, get_analyzer
+
+CGPA_BUCKET = 0.25
+CGPA_MAX = 10.0
+GAP_BUCKET = 10
+READINESS_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Students per analyzer call when rebuilding
+REFRESH_CHUNK = 5000
+
+
+def _cohort_key(batch, department):
+    # NULL can't be matched with = in the primary key, so blanks stand in for it
+    return batch or '', department or ''
+
+
+def _student_buckets(profiles, matrix):
+    """{user_id: (batch, department, {metric: bucket})} for freshly read profiles"""
+    analyzer = get_analyzer()
+    roles = [target_role for _, _, _, _, target_role in profiles]
+    standards = analyzer.nearest_standards(matrix, roles)
+    readiness = analyzer.readiness(matrix, standards)
+    gaps = np.clip(standards - matrix, 0, None)
+    gap_buckets = (gaps // GAP_BUCKET).astype(int).tolist()
+
+    buckets = {}
+    for row, (user_id, batch, department, cgpa, _) in enumerate(profiles):
+        metrics = {'readiness': int(readiness[row])}
+        if cgpa is not None:
+            metrics['cgpa'] = int(min(cgpa, CGPA_MAX) // CGPA_BUCKET)
+        for skill, bucket in zip(SKILL_LABELS, gap_buckets[row]):
+            metrics[f'gap:{skill}'] = bucket
+        buckets[user_id] = (_cohort_key(batch, department), metrics)
+    return buckets
+
+
+def _bump(conn, deltas):
+    conn.executemany("""
+        INSERT INTO cohort_histograms (batch, department, metric, bucket, count)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (batch, department, metric, bucket) DO UPDATE SET count = count + excluded.count
+    """, [(batch, department, metric, bucket, delta)
+          for (batch, department, metric, bucket), delta in deltas.items() if delta])
+
+
+def refresh_students(conn, user_ids):
+    """Recount the given students after their profile or skills changed
+
+    Runs on the caller's connection so it can share the transaction of the
+    write that triggered it. Costs O(len(user_ids)), whatever the cohort
+    size, unless the counts were made with another analyzer: then every
+    student is recounted.
+    """
+    if _stale(conn):
+        rebuild(conn)
+    else:
+        _recount(conn, user_ids, move_scores=True)
+
+
+def _recount(conn, user_ids, move_scores):
+    from student_skills import skill_matrix_for
+
+    user_ids = list(dict.fromkeys(user_ids))
+    for start in range(0, len(user_ids), REFRESH_CHUNK):
+        chunk = user_ids[start:start + REFRESH_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        deltas = {}
+
+        # Take back what these students counted towards before
+        old = conn.execute(
+            f"SELECT user_id, batch, department, buckets FROM cohort_members WHERE user_id IN ({placeholders})", chunk
+        ).fetchall()
+        for _, batch, department, buckets in old:
+            for metric, bucket in json.loads(buckets).items():
+                key = (batch, department, metric, bucket)
+                deltas[key] = deltas.get(key, 0) - 1
+        conn.execute(f"DELETE FROM cohort_members WHERE user_id IN ({placeholders})", chunk)
+
+        profiles = conn.execute(f"""
+            SELECT user_id, batch, department, cgpa, target_role
+            FROM student_profiles
+            WHERE user_id IN ({placeholders})
+            ORDER BY user_id
+        """, chunk).fetchall()
+        if profiles:
+            matrix = skill_matrix_for(conn, [p[0] for p in profiles])
+            members = []
+            for user_id, ((batch, department), metrics) in _student_buckets(profiles, matrix).items():
+                for metric, bucket in metrics.items():
+                    key = (batch, department, metric, bucket)
+                    deltas[key] = deltas.get(key, 0) + 1
+                members.append((user_id, batch, department, json.dumps(metrics)))
+            conn.executemany(
+                "INSERT INTO cohort_members (user_id, batch, department, buckets) VALUES (?, ?, ?, ?)", members
+            )
+
+        _bump(conn, deltas)
+        if not move_scores:
+            continue
+
+        # Scores recorded without a profile were counted under the blank cohort
+        before = {user_id: (batch, department) for user_id, batch, department, _ in old}
+        after = {user_id: _cohort_key(batch, department) for user_id, batch, department, _, _ in profiles}
+        moved = {user_id: (before.get(user_id, ('', '')), after.get(user_id, ('', ''))) for user_id in chunk}
+        _move_interview_scores(conn, {user_id: keys for user_id, keys in moved.items() if keys[0] != keys[1]})
+
+
+def _move_interview_scores(conn, moved):
+    """Move students' monthly interview totals from their old cohort to their new one
+
+    moved is {user_id: (old (batch, department), new (batch, department))}.
+    """
+    if not moved:
+        return
+    placeholders = ",".join("?" * len(moved))
+    rows = conn.execute(f"""
+        SELECT s.user_id, substr(q.answered_at, 1, 7), COUNT(*), SUM(q.score)
+        FROM interview_sessions s
+        JOIN interview_questions q ON q.session_id = s.id
+        WHERE s.user_id IN ({placeholders}) AND q.score IS NOT NULL
+        GROUP BY 1, 2
+    """, list(moved)).fetchall()
+    for user_id, period, answers, score_sum in rows:
+        (old_batch, old_department), (batch, department) = moved[user_id]
+        conn.execute("""
+            UPDATE cohort_interview_trends SET answers = answers - ?, score_sum = score_sum - ?
+            WHERE batch = ? AND department = ? AND period = ?
+        """, (answers, score_sum, old_batch, old_department, period))
+        conn.execute("""
+            INSERT INTO cohort_interview_trends (batch, department, period, answers, score_sum)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (batch, department, period) DO UPDATE SET
+                answers = answers + excluded.answers,
+                score_sum = score_sum + excluded.score_sum
+        """, (batch, department, period, answers, score_sum))
+
+
+def _stale(conn):
+    """Whether the counts were made with another analyzer than get_analyzer(), or never made"""
+    row = conn.execute("SELECT analyzer FROM cohort_analytics_state WHERE id = 1").fetchone()
+    return row is None or row[0] != get_analyzer().fingerprint
+
+
+def ensure_current(conn):
+    """Rebuild the counts in their own transaction if they are stale; True if they were rebuilt"""
+    if not _stale(conn):
+        return False
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have rebuilt while we waited for the lock
+        rebuilt = _stale(conn)
+        if rebuilt:
+            rebuild(conn)
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return rebuilt
+
+
+def rebuild(conn):
+    """Recount every student from scratch with the current analyzer"""
+    conn.execute("DELETE FROM cohort_members")
+    conn.execute("DELETE FROM cohort_histograms")
+    user_ids = [row[0] for row in conn.execute("SELECT user_id FROM student_profiles WHERE user_id IS NOT NULL")]
+    # Interview trends are recounted from scratch below
+    _recount(conn, user_ids, move_scores=False)
+    conn.execute("""
+        INSERT OR REPLACE INTO cohort_analytics_state (id, analyzer, built_at) VALUES (1, ?, ?)
+    """, (get_analyzer().fingerprint, datetime.now().isoformat()))
+
+    conn.execute("DELETE FROM cohort_interview_trends")
+    conn.execute("""
+        INSERT INTO cohort_interview_trends (batch, department, period, answers, score_sum)
+        SELECT COALESCE(p.batch, ''), COALESCE(p.department, ''), substr(q.answered_at, 1, 7), COUNT(*), SUM(q.score)
+        FROM interview_questions q
+        JOIN interview_sessions s ON s.id = q.session_id
+        LEFT JOIN student_profiles p ON p.user_id = s.user_id
+        WHERE q.score IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+
+
+def record_interview_score(conn, user_id, score, recorded_at=None):
+    """Add one scored answer to its cohort's monthly trend; called by InterviewStore"""
+    period = (recorded_at or datetime.now().isoformat())[:7]
+    conn.execute("""
+        INSERT INTO cohort_interview_trends (batch, department, period, answers, score_sum)
+        SELECT COALESCE(MAX(batch), ''), COALESCE(MAX(department), ''), ?, 1, ?
+        FROM student_profiles WHERE user_id = ?
+        ON CONFLICT (batch, department, period) DO UPDATE SET
+            answers = answers + 1,
+            score_sum = score_sum + excluded.score_sum
+    """, (period, score, user_id))
+
+
+@contextmanager
+def _current_connection():
+    """A pooled connection, after rebuilding the counts if the analyzer changed"""
+    with database.connection() as conn:
+        ensure_current(conn)
+        yield conn
+
+
+def _where(batch, department):
+    clauses, params = [], []
+    if batch is not None:
+        clauses.append("batch = ?")
+        params.append(batch)
+    if department is not None:
+        clauses.append("department = ?")
+        params.append(department)
+    return (" AND " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _counts(conn, metric, size, batch, department):
+    where, params = _where(batch, department)
+    counts = np.zeros(size, dtype=np.int64)
+    for bucket, count in conn.execute(
+        f"SELECT bucket, SUM(count) FROM cohort_histograms WHERE metric = ?{where} GROUP BY bucket",
+        [metric] + params
+    ):
+        counts[max(0, min(bucket, size - 1))] += count
+    return counts
+
+
+def cgpa_histogram(batch=None, department=None):
+    """(bucket lower edges, counts); batch/department None means all"""
+    size = int(CGPA_MAX / CGPA_BUCKET) + 1
+    with _current_connection() as conn:
+        counts = _counts(conn, 'cgpa', size, batch, department)
+    return np.arange(size) * CGPA_BUCKET, counts
+
+
+def gap_distribution(batch=None, department=None):
+    """(skills, bucket lower edges, counts[skill, bucket]) of gaps to the industry standard"""
+    size = 100 // GAP_BUCKET + 1
+    with _current_connection() as conn:
+        counts = np.stack([_counts(conn, f'gap:{skill}', size, batch, department) for skill in SKILL_LABELS])
+    return list(SKILL_LABELS), np.arange(size) * GAP_BUCKET, counts
+
+
+def readiness_percentiles(batch=None, department=None, percentiles=READINESS_PERCENTILES):
+    """{percentile: readiness score}, read off the 1-point readiness histogram"""
+    with _current_connection() as conn:
+        counts = _counts(conn, 'readiness', 101, batch, department)
+    total = counts.sum()
+    if not total:
+        return {p: None for p in percentiles}
+    cumulative = np.cumsum(counts)
+    return {p: int(np.searchsorted(cumulative, total * p / 100)) for p in percentiles}
+
+
+def interview_trend(batch=None, department=None):
+    """(periods, answers, mean scores) per month, oldest first"""
+    where, params = _where(batch, department)
+    with database.connection() as conn:
+        rows = conn.execute(f"""
+            SELECT period, SUM(answers), SUM(score_sum)
+            FROM cohort_interview_trends
+            WHERE 1 = 1{where}
+            GROUP BY period
+            ORDER BY period
+        """, params).fetchall()
+    periods = np.array([row[0] for row in rows], dtype=str)
+    answers = np.array([row[1] for row in rows], dtype=np.int64)
+    scores = np.array([row[2] for row in rows], dtype=float)
+    return periods, answers, np.divide(scores, answers, out=np.zeros_like(scores), where=answers > 0)
+
+
+def cohorts():
+    """(batch, department, students) for every cohort with at least one student"""
+    with _current_connection() as conn:
+        return conn.execute("""
+            SELECT batch, department, SUM(count)
+            FROM cohort_histograms
+            WHERE metric = 'readiness'
+            GROUP BY batch, department
+            HAVING SUM(count) > 0
+            ORDER BY batch, department
+        """).fetchall()
+
+
+def export(batch=None, department=None):
+    """Every aggregate for one cohort as flat NumPy arrays, ready for charting or np.savez"""
+    cgpa_edges, cgpa_counts = cgpa_histogram(batch, department)
+    skills, gap_edges, gap_counts = gap_distribution(batch, department)
+    percentiles = readiness_percentiles(batch, department)
+    periods, answers, mean_scores = interview_trend(batch, department)
+    return {
+        'cgpa_edges': cgpa_edges,
+        'cgpa_counts': cgpa_counts,
+        'gap_skills': np.array(skills),
+        'gap_edges': gap_edges,
+        'gap_counts': gap_counts,
+        'readiness_percentiles': np.array(list(percentiles)),
+        'readiness_scores': np.array([np.nan if v is None else v for v in percentiles.values()], dtype=float),
+        'trend_periods': periods,
+        'trend_answers': answers,
+        'trend_mean_scores': mean_scores,
+    }
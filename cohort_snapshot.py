@@ -0,0 +1,329 @@
+"""Read-only, memory-mapped snapshot of every student's skills, standards, gaps and rankings
+
+The dashboard and the TPO views ask for the same per-student numbers over
+and over: the skill vector, the nearest industry standard, the gaps to it,
+readiness and the ranked course slots. They only change when a student
+edits their skills or a catalog changes, so the nightly pipeline publishes
+them once per run (publish()) as a directory of .npy files:
+
+    <root>/CURRENT                      name of the live snapshot
+    <root>/snapshot-<ms>-<run>/
+        meta.json                       labels, cohort offsets, catalog fingerprints
+        user_ids.npy                    (students,) int64
+        skills.npy, standards.npy,      (students x SKILL_LABELS) float64
+        gaps.npy
+        readiness.npy                   (students,) float64
+        roles.npy                       (students,) int32, index into meta['roles']
+        slot_skills.npy, courses.npy    (students x RECOMMENDED_GAPS) int32, -1 if empty
+        index_ids.npy, index_rows.npy   user_ids sorted, and the row of each
+
+Rows are ordered by (batch, department, user_id), so a cohort, or a whole
+batch, is one contiguous slice. Readers np.load() every array with
+mmap_mode='r': nothing is copied into the process, and every worker on
+the machine shares the same page-cache pages. A snapshot is written under
+a temporary name, renamed into place and only then named in CURRENT with
+os.replace(), so a reader sees either the old snapshot or the new one,
+whole. The previous KEEP_SNAPSHOTS are left on disk for readers that
+still have them open.
+
+A row is only as fresh as the last run, so SkillAnalyzer-derived values
+are served (CohortSnapshot.precomputed) only when the student's current
+skills and target role equal the row's and both catalogs are the ones
+the snapshot was built with; anything else falls back to computing.
+
+    python cohort_snapshot.py --db app.db --root snapshots
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+import database
+from skill_analyzer import RECOMMENDED_GAPS, SKILL_LABELS, SkillAnalyzer, get_analyzer
+
+FORMAT_VERSION = 1
+SNAPSHOT_DIR = os.getenv('PLACEMENTPRO_SNAPSHOT_DIR')
+POINTER = 'CURRENT'
+KEEP_SNAPSHOTS = 2
+DEFAULT_TARGET_ROLE = 'Data Scientist'
+
+# Students per analyzer call when exporting
+EXPORT_CHUNK = 5000
+
+ARRAYS = {
+    'user_ids': (np.int64, ()),
+    'skills': (np.float64, (len(SKILL_LABELS),)),
+    'standards': (np.float64, (len(SKILL_LABELS),)),
+    'gaps': (np.float64, (len(SKILL_LABELS),)),
+    'readiness': (np.float64, ()),
+    'roles': (np.int32, ()),
+    'slot_skills': (np.int32, (RECOMMENDED_GAPS,)),
+    'courses': (np.int32, (RECOMMENDED_GAPS,)),
+}
+
+
+class CohortSnapshot:
+    """One published snapshot, every array memory-mapped read-only"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f"{path}: snapshot format {self.meta.get('format')}, expected {FORMAT_VERSION}")
+
+        for name in list(ARRAYS) + ['index_ids', 'index_rows']:
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+        self.role_names = self.meta['roles']
+        self.role_codes = {role: code for code, role in enumerate(self.role_names)}
+        self.cohorts = {(batch, department): (start, stop) for batch, department, start, stop in self.meta['cohorts']}
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def row(self, user_id: int) -> Optional[int]:
+        """The student's row, or None if they had no profile when the snapshot was built"""
+        position = int(np.searchsorted(self.index_ids, user_id))
+        if position == len(self.index_ids) or self.index_ids[position] != user_id:
+            return None
+        return int(self.index_rows[position])
+
+    def matches(self, analyzer: SkillAnalyzer) -> bool:
+        """Whether the snapshot was built from the catalogs analyzer uses"""
+        return (self.meta['role_catalog'] == analyzer.catalog.fingerprint
+                and self.meta['course_catalog'] == analyzer.courses.fingerprint)
+
+    def precomputed(self, user_id: int, skills, target_role: str, analyzer: SkillAnalyzer) -> Optional[Dict]:
+        """The stored standards, readiness and course ranking for one student, if still current
+
+        skills is the student's vector in SKILL_LABELS order, as
+        build_skill_matrix() makes it. Returns None when the student has no
+        row or the row no longer matches (skills or role edited since, or a
+        catalog changed); callers then compute the values themselves. The
+        arrays are 1-row views into the snapshot, shaped like the matrix
+        argument of the analyzer methods.
+        """
+        row = self.row(user_id)
+        if (row is None or self.role_codes.get(target_role) != self.roles[row]
+                or not np.array_equal(self.skills[row], skills) or not self.matches(analyzer)):
+            return None
+        rows = slice(row, row + 1)
+        return {
+            'standards': self.standards[rows],
+            'readiness': float(self.readiness[row]),
+            'slot_skills': self.slot_skills[rows],
+            'courses': self.courses[rows],
+        }
+
+    def cohort(self, batch: Optional[str] = None, department: Optional[str] = None) -> Dict:
+        """user_ids, skills, standards, gaps and readiness for a cohort, as in student_skills.skill_matrix
+
+        A (batch, department) cohort or a whole batch is a contiguous slice,
+        so the arrays are zero-copy views; department alone spans batches
+        and is gathered into new arrays. Unlike skill_matrix, students who
+        never recorded a skill are included, with a zero row.
+        """
+        spans = [(start, stop) for (cohort_batch, cohort_department), (start, stop) in self.cohorts.items()
+                 if (batch is None or cohort_batch == (batch or ''))
+                 and (department is None or cohort_department == (department or ''))]
+        if not spans:
+            rows = slice(0, 0)
+        elif batch is not None or department is None:
+            # Cohorts sort batch first, so these spans are adjacent
+            rows = slice(min(start for start, _ in spans), max(stop for _, stop in spans))
+        else:
+            rows = np.concatenate([np.arange(start, stop) for start, stop in spans])
+        return {name: getattr(self, name)[rows] for name in ('user_ids', 'skills', 'standards', 'gaps', 'readiness')}
+
+
+# -- Publishing --------------------------------------------------------------
+
+def _fsync(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_arrays(conn, path: str, analyzer: SkillAnalyzer) -> Dict:
+    """Compute and write every array into path; returns meta.json's contents"""
+    from student_skills import skill_matrix_for
+
+    students = conn.execute("SELECT COUNT(*) FROM student_profiles WHERE user_id IS NOT NULL").fetchone()[0]
+    arrays = {
+        name: np.lib.format.open_memmap(os.path.join(path, f'{name}.npy'), mode='w+', dtype=dtype,
+                                        shape=(students,) + shape)
+        for name, (dtype, shape) in ARRAYS.items()
+    }
+
+    roles, role_codes, cohorts = [], {}, []
+    cursor = conn.execute("""
+        SELECT user_id, COALESCE(batch, ''), COALESCE(department, ''), target_role
+        FROM student_profiles
+        WHERE user_id IS NOT NULL
+        ORDER BY 2, 3, 1
+    """)
+    start = 0
+    while True:
+        profiles = cursor.fetchmany(EXPORT_CHUNK)
+        if not profiles:
+            break
+        stop = start + len(profiles)
+        user_ids = [user_id for user_id, _, _, _ in profiles]
+        targets = [role or DEFAULT_TARGET_ROLE for _, _, _, role in profiles]
+        matrix = skill_matrix_for(conn, user_ids)
+        standards = analyzer.nearest_standards(matrix, targets)
+        slot_skills, courses = analyzer.rank_courses(matrix, standards)
+
+        arrays['user_ids'][start:stop] = user_ids
+        arrays['skills'][start:stop] = matrix
+        arrays['standards'][start:stop] = standards
+        arrays['gaps'][start:stop] = np.clip(standards - matrix, 0, None)
+        arrays['readiness'][start:stop] = analyzer.readiness(matrix, standards)
+        arrays['slot_skills'][start:stop] = slot_skills
+        arrays['courses'][start:stop] = courses
+        for role in targets:
+            if role not in role_codes:
+                role_codes[role] = len(roles)
+                roles.append(role)
+        arrays['roles'][start:stop] = [role_codes[role] for role in targets]
+
+        for i, (_, batch, department, _) in enumerate(profiles):
+            if not cohorts or cohorts[-1][:2] != [batch, department]:
+                cohorts.append([batch, department, start + i, start + i])
+            cohorts[-1][3] = start + i + 1
+        start = stop
+
+    order = np.argsort(arrays['user_ids'], kind='stable')
+    np.save(os.path.join(path, 'index_ids.npy'), arrays['user_ids'][order])
+    np.save(os.path.join(path, 'index_rows.npy'), order.astype(np.int64))
+    for array in arrays.values():
+        array.flush()
+    return {
+        'format': FORMAT_VERSION,
+        'students': students,
+        'skills': SKILL_LABELS,
+        'roles': roles,
+        'cohorts': cohorts,
+        'role_catalog': analyzer.catalog.fingerprint,
+        'course_catalog': analyzer.courses.fingerprint,
+    }
+
+
+def publish(db_path: Optional[str] = None, root: Optional[str] = None, run_id: Optional[int] = None,
+            analyzer: Optional[SkillAnalyzer] = None) -> str:
+    """Build a snapshot of every student in db_path, make it the current one under root and return its path"""
+    root = root or SNAPSHOT_DIR
+    if not root:
+        raise ValueError('No snapshot directory: pass root or set PLACEMENTPRO_SNAPSHOT_DIR')
+    analyzer = analyzer or get_analyzer()
+    os.makedirs(root, exist_ok=True)
+    name = f"snapshot-{time.time_ns() // 1_000_000}-{run_id or 0}"
+    staging = os.path.join(root, f'.{name}.tmp')
+    os.makedirs(staging)
+
+    try:
+        conn = database.get_connection(db_path or database.DB_NAME)
+        try:
+            # One read transaction, so the count, the profiles and the skills all see the same rows
+            conn.execute("BEGIN")
+            meta = _write_arrays(conn, staging, analyzer)
+        finally:
+            conn.rollback()
+            conn.close()
+        meta.update(run_id=run_id, created_at=datetime.now().isoformat())
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        for entry in os.listdir(staging):
+            _fsync(os.path.join(staging, entry))
+        path = os.path.join(root, name)
+        os.rename(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer = os.path.join(root, POINTER)
+    with open(pointer + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer + '.tmp', pointer)
+    _fsync(root)
+    _prune(root, name)
+    return path
+
+
+def _prune(root: str, current: str) -> None:
+    """Delete all but the newest KEEP_SNAPSHOTS snapshots besides current"""
+    older = sorted((entry for entry in os.listdir(root) if entry.startswith('snapshot-') and entry != current),
+                   key=lambda entry: int(entry.split('-')[1]))
+    for entry in older[:max(len(older) - KEEP_SNAPSHOTS, 0)]:
+        shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+
+# -- Process-wide reader -----------------------------------------------------
+
+_snapshot = None
+_snapshot_key = None
+_snapshot_lock = threading.Lock()
+
+
+def _pointer_version(pointer: str):
+    try:
+        stat = os.stat(pointer)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def current(root: Optional[str] = None) -> Optional[CohortSnapshot]:
+    """The process-wide view of root's current snapshot, reopened when a newer one is published
+
+    None when no snapshot directory is configured or nothing has been
+    published there yet.
+    """
+    global _snapshot, _snapshot_key
+
+    root = root or SNAPSHOT_DIR
+    if not root:
+        return None
+    pointer = os.path.join(root, POINTER)
+    key = (root, _pointer_version(pointer))
+    snapshot = _snapshot
+    if key == _snapshot_key:
+        return snapshot
+
+    with _snapshot_lock:
+        if key != _snapshot_key:
+            snapshot = None
+            if key[1] is not None:
+                with open(pointer, encoding='utf-8') as f:
+                    snapshot = CohortSnapshot(os.path.join(root, f.read().strip()))
+            _snapshot, _snapshot_key = snapshot, key
+        return _snapshot
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Publish a cohort snapshot from the database")
+    parser.add_argument("--db", default=database.DB_NAME)
+    parser.add_argument("--root", default=SNAPSHOT_DIR, required=SNAPSHOT_DIR is None)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    path = publish(args.db, args.root)
+    snapshot = CohortSnapshot(path)
+    size = sum(os.path.getsize(os.path.join(path, entry)) for entry in os.listdir(path))
+    print(f"{path}: {len(snapshot)} students, {len(snapshot.cohorts)} cohorts, "
+          f"{size / 2**20:.1f} MB in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+COURSE_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'course_catalog.json')
+
+LEVELS = ('beginner', 'intermediate', 'advanced')
+# A proficiency below LEVEL_BOUNDS[i] is level i; at or above the last bound, the top level
+LEVEL_BOUNDS = (40, 70)
+# Score multiplier by distance between a course's level and the student's
+LEVEL_FIT = (1.0, 0.5, 0.25)
+
+
+def proficiency_levels(proficiency):
+    """Level index (0 = beginner) for each proficiency value"""
+    return np.digitize(proficiency, LEVEL_BOUNDS)
+
+
+class CourseCatalog:
+    """Courses to recommend for skill gaps, indexed by (skill, level)
+
+    Loaded from a JSON file ({"version", "levels", "courses": [{"name",
+    "url", "level", "skills": {skill: weight}}]}). A course's weights say
+    how much it teaches each skill; its primary skill is the heaviest one.
+    For every (skill, student level) the index holds the courses for that
+    skill ordered by level distance, with their LEVEL_FIT multipliers, so
+    ranking is one matrix product per group of students.
+    """
+
+    def __init__(self, skills, names, urls, levels, weights, level_names=LEVELS, version=1):
+        self.skills = list(skills)
+        self.skill_rows = {skill: i for i, skill in enumerate(self.skills)}
+        self.names = list(names)
+        self.urls = list(urls)
+        self.level_names = list(level_names)
+        self.levels = np.asarray(levels, dtype=int)
+        self.weights = np.asarray(weights, dtype=float).reshape(len(self.names), len(self.skills))
+        self.primary = self.weights.argmax(axis=1)
+        self.version = version
+
+        digest = hashlib.sha256(json.dumps(
+            [self.version, self.skills, self.names, self.urls, self.levels.tolist(), self.weights.tolist()]
+        ).encode('utf-8'))
+        self.fingerprint = digest.hexdigest()
+
+        fits = np.asarray(LEVEL_FIT)
+        self.index = {}
+        for skill in range(len(self.skills)):
+            rows = np.flatnonzero(self.primary == skill)
+            for level in range(len(self.level_names)):
+                distance = np.abs(self.levels[rows] - level)
+                order = np.argsort(distance, kind='stable')
+                self.index[skill, level] = (rows[order], fits[np.minimum(distance[order], len(fits) - 1)])
+
+    @classmethod
+    def load(cls, path=COURSE_CATALOG_PATH, skills=None):
+        """Read a catalog file; weights are laid out in `skills` order when given"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        level_names = data.get('levels', LEVELS)
+        courses = data['courses']
+        if skills is None:
+            skills = sorted({skill for course in courses for skill in course['skills']})
+        columns = {skill: i for i, skill in enumerate(skills)}
+
+        weights = np.zeros((len(courses), len(skills)))
+        for row, course in enumerate(courses):
+            unknown = [skill for skill in course['skills'] if skill not in columns]
+            if unknown:
+                raise ValueError(f"Course catalog {path}: '{course['name']}' teaches unknown skills: {', '.join(unknown)}")
+            if course['level'] not in level_names:
+                raise ValueError(f"Course catalog {path}: '{course['name']}' has unknown level {course['level']!r}")
+            for skill, weight in course['skills'].items():
+                weights[row, columns[skill]] = weight
+
+        return cls(
+            skills,
+            [course['name'] for course in courses],
+            [course['url'] for course in courses],
+            [level_names.index(course['level']) for course in courses],
+            weights,
+            level_names,
+            data.get('version', 1),
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def level_index(self, level_name):
+        """Index of a level name such as 'beginner'; ValueError naming the allowed ones otherwise"""
+        if level_name not in self.level_names:
+            raise ValueError(f"Unknown level {level_name!r}; expected one of: {', '.join(self.level_names)}")
+        return self.level_names.index(level_name)
+
+    def rank(self, gaps, levels, slot_skills):
+        """Best course row for every (student, slot), or -1 when there is none
+
+        gaps and levels are (students x skills): gap to the standard and
+        level index per skill. slot_skills is (students x slots): the skill
+        each slot recommends for, -1 for an empty slot. Candidates come
+        from the (skill, level) index and are scored against the student's
+        whole gap vector times their level fit, so a course that also
+        covers the student's other gaps wins. A course is recommended at
+        most once per student.
+        """
+        students, slots = slot_skills.shape
+        chosen = np.full((students, slots), -1)
+        if students == 1:
+            # One student per request from the API: skip the grouping
+            for slot, skill in enumerate(slot_skills[0].tolist()):
+                if skill < 0:
+                    continue
+                candidates, fit = self.index[skill, int(levels[0, skill])]
+                if not len(candidates):
+                    continue
+                scores = self._scores(gaps[:1], candidates, fit)[0]
+                taken = chosen[0, :slot].tolist()
+                for i, course in enumerate(candidates.tolist()):
+                    if course in taken:
+                        scores[i] = -np.inf
+                best = scores.argmax()
+                if np.isfinite(scores[best]):
+                    chosen[0, slot] = candidates[best]
+            return chosen
+
+        everyone = np.arange(students)
+        num_levels = len(self.level_names)
+        for slot in range(slots):
+            skill = slot_skills[:, slot]
+            level = levels[everyone, np.maximum(skill, 0)]
+            groups = np.where(skill >= 0, skill * num_levels + level, -1)
+            order = np.argsort(groups, kind='stable')
+            keys, starts = np.unique(groups[order], return_index=True)
+            for key, members in zip(keys.tolist(), np.split(order, starts[1:])):
+                if key < 0:
+                    continue
+                candidates, fit = self.index[divmod(key, num_levels)]
+                if not len(candidates):
+                    continue
+                scores = self._scores(gaps[members], candidates, fit)
+                if slot:
+                    taken = (chosen[members, :slot, None] == candidates).any(axis=1)
+                    scores[taken] = -np.inf
+                best = scores.argmax(axis=1)
+                found = np.isfinite(scores[np.arange(len(members)), best])
+                chosen[members[found], slot] = candidates[best[found]]
+        return chosen
+
+    def _scores(self, gaps, candidates, fit):
+        # Rounded so that batch and single-student products rank ties the same way
+        return np.round((gaps @ self.weights[candidates].T) * fit, 6)
@@ -1,74 +1,431 @@
+import csv
+import json
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+from instrumentation import connection_factory, timed
+from migrations import migrate
+
 DB_NAME = "app.db"
 
-def get_connection():
-    return sqlite3.connect(DB_NAME)
+# Connection tuning shared by every pooled connection
+POOL_SIZE = 8
+POOL_TIMEOUT = 10.0
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
 
-def create_tables():
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        created_at TEXT
-    )
-    """)
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS records (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        title TEXT,
-        description TEXT,
-        created_at TEXT,
-        FOREIGN KEY (user_id) REFERENCES users(id)
+# Rows per transaction for bulk imports; also bounds the IN (...) lookups
+IMPORT_CHUNK_SIZE = 500
+
+# Default page size for keyset-paginated reads
+PAGE_SIZE = 50
+
+def get_connection(db_name=None):
+    """Open a new connection configured for concurrent access"""
+    conn = sqlite3.connect(
+        db_name or DB_NAME,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,  # transactions are managed explicitly
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        factory=connection_factory(),
     )
-    """)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared across threads
+
+    Connections checked out when the pool is closed stay counted against
+    max_size until they are released, and are closed then.
+    """
+
+    def __init__(self, db_name, max_size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.db_name = db_name
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._checked_out = set()
+        self._closed = False
+        self._lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def acquire(self):
+        conn = self._acquire()
+        with self._lock:
+            if not self._closed:
+                self._checked_out.add(conn)
+                return conn
+        self._discard(conn)
+        raise sqlite3.ProgrammingError(f"connection pool for {self.db_name} is closed")
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError(f"connection pool for {self.db_name} is closed")
+            if self._created < self.max_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            try:
+                return get_connection(self.db_name)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"no connection available after {self.timeout}s (pool size {self.max_size})"
+            )
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._checked_out.discard(conn)
+            if not self._closed:
+                self._idle.put(conn)
+                return
+        self._discard(conn)
+
+    def _discard(self, conn):
+        conn.close()
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
 
-    conn.commit()
-    conn.close()
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            # IMMEDIATE takes the write lock up front so WAL readers never
+            # have to upgrade mid-transaction and hit SQLITE_BUSY
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
 
+    def close(self):
+        """Close the idle connections now and checked-out ones as they are released"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide pool for DB_NAME, rebuilt after a fork"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.db_name != DB_NAME or _pool.pid != os.getpid():
+            # Connections inherited across a fork belong to the parent
+            if _pool is not None and _pool.pid == os.getpid():
+                _pool.close()
+            _pool = ConnectionPool(DB_NAME)
+        return _pool
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def connection():
+    """Borrow a pooled connection for reads: `with connection() as conn:`"""
+    return get_pool().connection()
+
+def transaction():
+    """Run statements atomically: `with transaction() as conn:`"""
+    return get_pool().transaction()
+
+def create_tables():
+    """Create or upgrade the schema to the latest migration (see migrations.py)"""
+    with connection() as conn:
+        upgrade_schema(conn)
+
+def upgrade_schema(conn):
+    """migrate(), then the clean-ups that need live application code; returns the versions applied
+
+    Migration steps are frozen, so when step 4 copies legacy JSON skills
+    the names it could not match exactly are canonicalized here with the
+    current skill normalizer.
+    """
+    applied = migrate(conn)
+    if 4 in applied:
+        from student_skills import canonicalize_skills
+        canonicalize_skills(conn)
+    return applied
+
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+def ensure_schema():
+    """create_tables() once per process and database, for code that runs on every rerun"""
+    key = (DB_NAME, os.getpid())
+    if key in _schema_ready:
+        return
+    with _schema_lock:
+        if key not in _schema_ready:
+            create_tables()
+            _schema_ready.add(key)
+
+def normalize_email(email):
+    """The form every users.email is stored and looked up in: stripped and lowercased"""
+    return (email or '').strip().lower()
+
+@timed('database.add_user')
 def add_user(name, email):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO users (name, email, created_at) VALUES (?, ?, ?)",
-        (name, email, datetime.now().isoformat())
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO users (full_name, email, created_at) VALUES (?, ?, ?)",
+            (name, normalize_email(email), datetime.now().isoformat())
+        )
 
+@timed('database.get_users')
 def get_users():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM users")
-    data = cur.fetchall()
-    conn.close()
-    return data
+    with connection() as conn:
+        return conn.execute("SELECT id, full_name, email, created_at FROM users").fetchall()
 
+@timed('database.add_record')
 def add_record(user_id, title, description):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO records (user_id, title, description, created_at) VALUES (?, ?, ?, ?)",
-        (user_id, title, description, datetime.now().isoformat())
-    )
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute(
+            "INSERT INTO records (user_id, title, description, created_at) VALUES (?, ?, ?, ?)",
+            (user_id, title, description, datetime.now().isoformat())
+        )
 
+@timed('database.get_records')
 def get_records():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT records.id, users.name, records.title, records.description
-        FROM records
-        JOIN users ON records.user_id = users.id
-    """)
-    data = cur.fetchall()
-    conn.close()
-    return data
\ No newline at end of file
+    with connection() as conn:
+        return conn.execute("""
+            SELECT records.id, users.full_name, records.title, records.description
+            FROM records
+            JOIN users ON records.user_id = users.id
+        """).fetchall()
+
+@timed('database.get_users_page')
+def get_users_page(after_id=0, limit=PAGE_SIZE):
+    """Return (rows, next_cursor) for users with id > after_id
+
+    next_cursor is the id to pass as after_id for the following page, or
+    None when this is the last page. Raises ValueError for limit < 1.
+    """
+    _check_limit(limit)
+    with connection() as conn:
+        rows = conn.execute(
+            "SELECT id, full_name, email, created_at FROM users WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit + 1)
+        ).fetchall()
+    return _page(rows, limit)
+
+@timed('database.get_records_page')
+def get_records_page(after_id=0, limit=PAGE_SIZE, user_id=None):
+    """Return (rows, next_cursor) for records with id > after_id, optionally for one user"""
+    _check_limit(limit)
+    with connection() as conn:
+        if user_id is None:
+            rows = conn.execute("""
+                SELECT records.id, users.full_name, records.title, records.description
+                FROM records
+                JOIN users ON records.user_id = users.id
+                WHERE records.id > ?
+                ORDER BY records.id
+                LIMIT ?
+            """, (after_id, limit + 1)).fetchall()
+        else:
+            rows = conn.execute("""
+                SELECT records.id, users.full_name, records.title, records.description
+                FROM records
+                JOIN users ON records.user_id = users.id
+                WHERE records.user_id = ? AND records.id > ?
+                ORDER BY records.id
+                LIMIT ?
+            """, (user_id, after_id, limit + 1)).fetchall()
+    return _page(rows, limit)
+
+def _check_limit(limit):
+    # LIMIT 0 would end iteration with no cursor; a negative LIMIT means no limit in SQLite
+    if limit < 1:
+        raise ValueError(f"page limit must be at least 1, got {limit}")
+
+def _page(rows, limit):
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1][0]
+    return rows, None
+
+def iter_users(batch_size=1000):
+    """Yield every user a page at a time without loading the whole table"""
+    cursor = 0
+    while cursor is not None:
+        rows, cursor = get_users_page(cursor, batch_size)
+        yield from rows
+
+def iter_records(batch_size=1000, user_id=None):
+    """Yield every record a page at a time without loading the whole table"""
+    cursor = 0
+    while cursor is not None:
+        rows, cursor = get_records_page(cursor, batch_size, user_id)
+        yield from rows
+
+def read_rows(path):
+    """Stream rows as dicts from a .csv or .jsonl file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+def _chunks(rows, size):
+    chunk = []
+    for row_no, row in enumerate(rows, start=1):
+        chunk.append((row_no, row))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _existing(conn, sql, values):
+    if not values:
+        return set()
+    placeholders = ",".join("?" * len(values))
+    return {row[0] for row in conn.execute(sql.format(placeholders), values)}
+
+@timed('database.bulk_add_users')
+def bulk_add_users(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Insert users from an iterable of {'name' or 'full_name', 'email'} dicts
+
+    Each chunk is one transaction. Rows that would break the UNIQUE email
+    or NOT NULL constraints are skipped and reported instead of aborting
+    the import.
+    """
+    report = {'inserted': 0, 'errors': []}
+
+    for chunk in _chunks(rows, chunk_size):
+        now = datetime.now().isoformat()
+        batch, seen = [], set()
+
+        with transaction() as conn:
+            emails = list({normalize_email(row.get('email')) for _, row in chunk} - {''})
+            taken = _existing(conn, "SELECT email FROM users WHERE email IN ({})", emails)
+
+            for row_no, row in chunk:
+                name = (row.get('name') or row.get('full_name') or '').strip()
+                email = normalize_email(row.get('email'))
+                if not name or not email:
+                    report['errors'].append({'row': row_no, 'email': email, 'error': 'missing name or email'})
+                elif email in taken or email in seen:
+                    report['errors'].append({'row': row_no, 'email': email, 'error': 'duplicate email'})
+                else:
+                    seen.add(email)
+                    batch.append((name, email, row.get('created_at') or now))
+
+            conn.executemany(
+                "INSERT INTO users (full_name, email, created_at) VALUES (?, ?, ?)",
+                batch
+            )
+        report['inserted'] += len(batch)
+
+    return report
+
+@timed('database.bulk_add_records')
+def bulk_add_records(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Insert records from an iterable of {'user_id', 'title', 'description'} dicts
+
+    Rows pointing at a user that does not exist are skipped and reported.
+    """
+    report = {'inserted': 0, 'errors': []}
+
+    for chunk in _chunks(rows, chunk_size):
+        now = datetime.now().isoformat()
+        batch = []
+
+        with transaction() as conn:
+            user_ids = set()
+            for _, row in chunk:
+                try:
+                    user_ids.add(int(row.get('user_id')))
+                except (TypeError, ValueError):
+                    pass
+            known = _existing(conn, "SELECT id FROM users WHERE id IN ({})", list(user_ids))
+
+            for row_no, row in chunk:
+                try:
+                    user_id = int(row.get('user_id'))
+                except (TypeError, ValueError):
+                    user_id = None
+                if user_id not in known:
+                    report['errors'].append({'row': row_no, 'user_id': row.get('user_id'), 'error': 'unknown user'})
+                    continue
+                batch.append((user_id, row.get('title'), row.get('description'), row.get('created_at') or now))
+
+            conn.executemany(
+                "INSERT INTO records (user_id, title, description, created_at) VALUES (?, ?, ?, ?)",
+                batch
+            )
+        report['inserted'] += len(batch)
+
+    return report
+
+def main(argv=None):
+    import argparse
+    global DB_NAME
+
+    parser = argparse.ArgumentParser(description="Bulk import users or records from CSV/JSONL")
+    parser.add_argument("table", choices=["users", "records"])
+    parser.add_argument("path", help="a .csv file with a header row, or a .jsonl file")
+    parser.add_argument("--db", default=DB_NAME)
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    DB_NAME = args.db
+    create_tables()
+
+    bulk_add = bulk_add_users if args.table == "users" else bulk_add_records
+    report = bulk_add(read_rows(args.path), chunk_size=args.chunk_size)
+
+    print(f"Inserted {report['inserted']} {args.table}, skipped {len(report['errors'])} rows")
+    for error in report['errors'][:20]:
+        print(f"  row {error['row']}: {error['error']}")
+    if len(report['errors']) > 20:
+        print(f"  ... and {len(report['errors']) - 20} more")
+
+if __name__ == "__main__":
+    main()
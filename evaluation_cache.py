@@ -0,0 +1,141 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Defaults for EvaluationCache
+CACHE_MAX_ENTRIES = 10000
+CACHE_TTL = 7 * 24 * 3600.0
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different answers share a key"""
+    return _WHITESPACE_RE.sub(" ", text.casefold()).strip()
+
+
+def evaluation_key(question: str, answer: str) -> str:
+    """Content address of a (question, answer) pair"""
+    payload = f"{normalize_text(question)}\x00{normalize_text(answer)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """LRU cache of answer evaluations, optionally persisted to SQLite
+
+    Entries expire after `ttl` seconds. The in-memory LRU holds at most
+    `max_entries`; the SQLite table, when `db_path` is given, is trimmed to
+    `max_db_entries` least-recently-stored rows. Counters are available
+    from stats().
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL,
+        db_path: Optional[str] = None,
+        max_db_entries: Optional[int] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_db_entries = max_db_entries or max_entries * 10
+        self.entries = OrderedDict()  # key -> (stored_at, evaluation)
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.stores = self.evictions = self.expirations = 0
+
+        self.conn = None
+        if db_path:
+            from database import get_connection
+
+            self.conn = get_connection(db_path)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS evaluation_cache (
+                    key TEXT PRIMARY KEY,
+                    evaluation TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_evaluation_cache_stored_at ON evaluation_cache(stored_at)"
+            )
+
+    def get(self, question: str, answer: str) -> Optional[Dict]:
+        key = evaluation_key(question, answer)
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self.entries[key]
+                self.expirations += 1
+
+            if self.conn is not None:
+                row = self.conn.execute(
+                    "SELECT evaluation, stored_at FROM evaluation_cache WHERE key = ? AND stored_at >= ?",
+                    (key, now - self.ttl)
+                ).fetchone()
+                if row is not None:
+                    self.hits += 1
+                    evaluation = json.loads(row[0])
+                    self._remember(key, row[1], evaluation)
+                    return evaluation
+
+            self.misses += 1
+            return None
+
+    def put(self, question: str, answer: str, evaluation: Dict) -> None:
+        key = evaluation_key(question, answer)
+        now = time.time()
+
+        with self.lock:
+            self.stores += 1
+            self._remember(key, now, evaluation)
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO evaluation_cache (key, evaluation, stored_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(evaluation), now)
+                )
+                if self.stores % 1000 == 0:
+                    self._trim_db(now)
+
+    def _remember(self, key: str, stored_at: float, evaluation: Dict) -> None:
+        self.entries[key] = (stored_at, evaluation)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _trim_db(self, now: float) -> None:
+        self.conn.execute("DELETE FROM evaluation_cache WHERE stored_at < ?", (now - self.ttl,))
+        self.conn.execute("""
+            DELETE FROM evaluation_cache WHERE key IN (
+                SELECT key FROM evaluation_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_db_entries,))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM evaluation_cache")
+
+    def stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self.entries),
+            }
@@ -0,0 +1,372 @@
+"""Latency histograms, counters and cache hit ratios for the hot paths
+
+Instrumentation is off unless PLACEMENTPRO_METRICS=1 or enable() is
+called. While it is off, a @timed function costs one global check on
+top of the call and timer() hands back a shared no-op context manager,
+so the decorators can stay on hot paths permanently.
+
+    @timed('analyzer.analyze_skill_gaps')
+    def analyze_skill_gaps(...): ...
+
+    with timer('nightly.write_back'):
+        ...
+
+    register_cache('evaluation_cache', engine.cache_stats)
+
+Connections opened by database.get_connection() while instrumentation is
+on count and time every statement (db.select, db.insert, ...). Caches
+that already keep hit/miss counters are registered once and read only
+when a snapshot is taken; others call cache_hit()/cache_miss().
+
+snapshot() returns everything as a dict and prometheus_text() in the
+Prometheus text exposition format (api.py serves both). For a closer
+look, profile() runs a block under cProfile and SamplingProfiler samples
+every thread's stack at a fixed interval with no per-call cost.
+"""
+import asyncio
+import bisect
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# Upper bounds in seconds, from 50us to 10s
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PERCENTILES = (50, 90, 99)
+METRIC_PREFIX = 'placementpro'
+SAMPLE_INTERVAL = 0.005
+
+_enabled = os.getenv('PLACEMENTPRO_METRICS', '') not in ('', '0')
+_lock = threading.Lock()
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class Histogram:
+    """Observation counts per BUCKETS bucket, plus their sum and maximum"""
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (the maximum for the overflow bucket)"""
+        rank = self.count * q / 100
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'max': self.max,
+            **{f'p{q}': self.percentile(q) for q in PERCENTILES},
+        }
+
+
+_histograms: Dict[str, Histogram] = {}
+_counters: Counter = Counter()
+_cache_sources: Dict[str, Callable[[], Dict]] = {}
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record one duration for `name`; normally called through timed() or timer()"""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def count(name: str, value: int = 1) -> None:
+    if _enabled:
+        with _lock:
+            _counters[name] += value
+
+
+def cache_hit(name: str) -> None:
+    count(f'cache.{name}.hits')
+
+
+def cache_miss(name: str) -> None:
+    count(f'cache.{name}.misses')
+
+
+def register_cache(name: str, stats: Callable[[], Dict]) -> None:
+    """Read hits/misses from stats() at snapshot time instead of counting each lookup"""
+    _cache_sources[name] = stats
+
+
+def timed(name: Optional[str] = None):
+    """Decorator recording each call's duration under `name` (default: the function's qualified name)"""
+    def decorate(fn):
+        label = name or f'{fn.__module__}.{fn.__qualname__}'
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    observe(label, time.perf_counter() - start)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not _enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    observe(label, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timer(name: str):
+    """Context manager recording the block's duration under `name`"""
+    return _Timer(name) if _enabled else _NO_TIMER
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection that counts and times statements run through execute()/executemany()
+
+    Statements are labelled by their first keyword: db.select, db.insert, ...
+    """
+
+    def execute(self, sql, parameters=(), /):
+        if not _enabled:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            observe(_statement_label(sql), time.perf_counter() - start)
+
+    def executemany(self, sql, parameters, /):
+        if not _enabled:
+            return super().executemany(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            observe(_statement_label(sql), time.perf_counter() - start)
+
+
+def _statement_label(sql: str) -> str:
+    keyword = sql.lstrip().split(None, 1)[0] if sql.strip() else 'empty'
+    return f'db.{keyword.lower()}'
+
+
+def connection_factory():
+    """sqlite3.connect(factory=...) for a new connection: instrumented only while enabled"""
+    return InstrumentedConnection if _enabled else sqlite3.Connection
+
+
+def snapshot() -> Dict:
+    """Current timers, counters and cache hit ratios as plain data"""
+    with _lock:
+        timers = {name: histogram.summary() for name, histogram in _histograms.items()}
+        counters = dict(_counters)
+
+    caches = {}
+    for name in {key.split('.')[1] for key in counters if key.startswith('cache.')}:
+        caches[name] = {'hits': counters.pop(f'cache.{name}.hits', 0),
+                        'misses': counters.pop(f'cache.{name}.misses', 0)}
+    for name, stats in _cache_sources.items():
+        stats = stats()
+        caches[name] = {'hits': stats['hits'], 'misses': stats['misses']}
+    for stats in caches.values():
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+
+    db = {name: timer for name, timer in timers.items() if name.startswith('db.')}
+    return {
+        'enabled': _enabled,
+        'timers': timers,
+        'counters': counters,
+        'caches': caches,
+        'db': {
+            'queries': sum(timer['count'] for timer in db.values()),
+            'seconds': sum(timer['sum'] for timer in db.values()),
+        },
+    }
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def prometheus_text() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    with _lock:
+        histograms = [(name, list(h.counts), h.count, h.sum) for name, h in sorted(_histograms.items())]
+        counters = sorted(_counters.items())
+    caches = snapshot()['caches']
+
+    lines = [
+        f'# HELP {METRIC_PREFIX}_duration_seconds Time spent per instrumented function, block or statement kind',
+        f'# TYPE {METRIC_PREFIX}_duration_seconds histogram',
+    ]
+    for name, counts, total, seconds in histograms:
+        label = f'name="{_escape(name)}"'
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS, counts):
+            cumulative += bucket
+            lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{{label},le="+Inf"}} {total}')
+        lines.append(f'{METRIC_PREFIX}_duration_seconds_sum{{{label}}} {seconds}')
+        lines.append(f'{METRIC_PREFIX}_duration_seconds_count{{{label}}} {total}')
+
+    lines += [f'# TYPE {METRIC_PREFIX}_events_total counter']
+    for name, value in counters:
+        if not name.startswith('cache.'):
+            lines.append(f'{METRIC_PREFIX}_events_total{{name="{_escape(name)}"}} {value}')
+
+    lines += [f'# TYPE {METRIC_PREFIX}_cache_lookups_total counter']
+    for name, stats in sorted(caches.items()):
+        for result, key in (('hit', 'hits'), ('miss', 'misses')):
+            lines.append(f'{METRIC_PREFIX}_cache_lookups_total{{cache="{_escape(name)}",result="{result}"}} {stats[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+@contextmanager
+def profile(output: Optional[str] = None, sort: str = 'cumulative', limit: int = 30):
+    """Run the block under cProfile; dump to `output` (.prof) or print the top `limit` entries"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if output:
+            profiler.dump_stats(output)
+        else:
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+            print(stream.getvalue(), file=sys.stderr)
+
+
+class SamplingProfiler:
+    """Samples every other thread's stack each `interval` seconds from a background thread
+
+    Costs nothing per call in the profiled code, so it can run against a
+    live server. Results are collapsed stacks ("outer;inner;leaf count"),
+    the input format of flamegraph tools.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> 'SamplingProfiler':
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = 20) -> Dict[str, int]:
+        """Sample counts per innermost frame, highest first"""
+        leaves = Counter()
+        for stack, samples in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += samples
+        return dict(leaves.most_common(limit))
@@ -0,0 +1,221 @@
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import database
+from cohort_analytics import record_interview_score
+
+_SESSION_COLUMNS = "id, user_id, status, question_count, answered_count, scored_count, score_sum, started_at, completed_at"
+
+
+class AlreadyAnswered(ValueError):
+    """The question already has a scored answer, which is final"""
+
+
+class InterviewStore:
+    """Interview sessions, answers and evaluations kept in SQLite (tables from migrations.py)
+
+    Every submitted answer updates its session's counters and the
+    student's per-skill totals in the same transaction, so scores are
+    read from one row instead of being recomputed from all answers. The
+    sessions outlive the process: an unfinished interview can be picked up
+    again with get_session() after a restart.
+
+    Uses the shared database pool, or its own pool when db_path is given.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.pool = database.ConnectionPool(db_path) if db_path else None
+        with self._connection() as conn:
+            database.upgrade_schema(conn)
+
+    def _pool(self) -> database.ConnectionPool:
+        return self.pool or database.get_pool()
+
+    def _transaction(self):
+        return self._pool().transaction()
+
+    def _connection(self):
+        return self._pool().connection()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+
+    def create_session(self, user_id: int, questions: Sequence[Tuple[str, Optional[str]]]) -> int:
+        """Store a new interview of (question, skill) pairs and return its id"""
+        with self._transaction() as conn:
+            session_id = conn.execute(
+                "INSERT INTO interview_sessions (user_id, question_count, started_at) VALUES (?, ?, ?)",
+                (user_id, len(questions), datetime.now().isoformat())
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO interview_questions (session_id, position, question, skill) VALUES (?, ?, ?, ?)",
+                [(session_id, position, question, skill) for position, (question, skill) in enumerate(questions)]
+            )
+        return session_id
+
+    def get_session(self, session_id: int) -> Optional[Dict]:
+        """Session summary plus its questions, answers and evaluations"""
+        with self._connection() as conn:
+            row = conn.execute(
+                f"SELECT {_SESSION_COLUMNS} FROM interview_sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            questions = conn.execute("""
+                SELECT position, question, skill, answer, evaluation, score
+                FROM interview_questions
+                WHERE session_id = ?
+                ORDER BY position
+            """, (session_id,)).fetchall()
+
+        session = self._session(row)
+        session['questions'] = [
+            {
+                'position': position,
+                'question': question,
+                'skill': skill,
+                'answer': answer,
+                'evaluation': json.loads(evaluation) if evaluation else None,
+                'score': score,
+            }
+            for position, question, skill, answer, evaluation, score in questions
+        ]
+        return session
+
+    def active_sessions(self, user_id: int) -> List[Dict]:
+        """Unfinished interviews of a student, oldest first"""
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT {_SESSION_COLUMNS} FROM interview_sessions WHERE user_id = ? AND status = 'active' ORDER BY id",
+                (user_id,)
+            ).fetchall()
+        return [self._session(row) for row in rows]
+
+    def asked_questions(self, user_id: int) -> List[str]:
+        """Every question a student has been given, in any session"""
+        with self._connection() as conn:
+            rows = conn.execute("""
+                SELECT DISTINCT q.question
+                FROM interview_sessions s
+                JOIN interview_questions q ON q.session_id = s.id
+                WHERE s.user_id = ?
+            """, (user_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def record_answer(self, session_id: int, position: int, answer: str, evaluation: Dict) -> Dict:
+        """Store one answer and its evaluation and return the updated session summary
+
+        Evaluations without a score (fallbacks) count as answered but are
+        left out of every average, and the question can be answered again
+        to replace them once the evaluator is back. Raises ValueError for
+        an unknown question and AlreadyAnswered for one that already has a
+        scored answer.
+        """
+        score = evaluation.get('score')
+        now = datetime.now().isoformat()
+
+        with self._transaction() as conn:
+            question = conn.execute("""
+                SELECT s.user_id, q.skill, q.answered_at, q.score
+                FROM interview_questions q
+                JOIN interview_sessions s ON s.id = q.session_id
+                WHERE q.session_id = ? AND q.position = ?
+            """, (session_id, position)).fetchone()
+            if question is None:
+                raise ValueError(f"Interview {session_id} has no question {position}")
+            user_id, skill, answered_at, previous_score = question
+            if previous_score is not None:
+                raise AlreadyAnswered(f"Question {position} of interview {session_id} is already answered")
+            # Re-scoring a fallback replaces it without counting the question twice
+            newly_answered = int(answered_at is None)
+
+            conn.execute("""
+                UPDATE interview_questions
+                SET answer = ?, evaluation = ?, score = ?, answered_at = ?
+                WHERE session_id = ? AND position = ?
+            """, (answer, json.dumps(evaluation), score, now, session_id, position))
+
+            scored = score is not None
+            conn.execute("""
+                UPDATE interview_sessions
+                SET answered_count = answered_count + ?,
+                    scored_count = scored_count + ?,
+                    score_sum = score_sum + ?,
+                    status = CASE WHEN answered_count + ? >= question_count THEN 'completed' ELSE status END,
+                    completed_at = CASE
+                        WHEN completed_at IS NULL AND answered_count + ? >= question_count THEN ? ELSE completed_at
+                    END
+                WHERE id = ?
+            """, (newly_answered, int(scored), score if scored else 0, newly_answered, newly_answered, now, session_id))
+
+            if scored:
+                record_interview_score(conn, user_id, score, now)
+            if scored and skill:
+                conn.execute(
+                    "INSERT INTO skill_score_history (user_id, skill, session_id, score, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                    (user_id, skill, session_id, score, now)
+                )
+                conn.execute("""
+                    INSERT INTO skill_scores (user_id, skill, attempts, score_sum, best_score, last_score, updated_at)
+                    VALUES (?, ?, 1, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, skill) DO UPDATE SET
+                        attempts = attempts + 1,
+                        score_sum = score_sum + excluded.score_sum,
+                        best_score = MAX(best_score, excluded.best_score),
+                        last_score = excluded.last_score,
+                        updated_at = excluded.updated_at
+                """, (user_id, skill, score, score, score, now))
+
+            row = conn.execute(
+                f"SELECT {_SESSION_COLUMNS} FROM interview_sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        return self._session(row)
+
+    def skill_scores(self, user_id: int) -> List[Dict]:
+        """A student's running per-skill averages"""
+        with self._connection() as conn:
+            rows = conn.execute("""
+                SELECT skill, attempts, score_sum / attempts, best_score, last_score, updated_at
+                FROM skill_scores
+                WHERE user_id = ?
+                ORDER BY skill
+            """, (user_id,)).fetchall()
+        return [
+            {'skill': skill, 'attempts': attempts, 'average_score': average,
+             'best_score': best, 'last_score': last, 'updated_at': updated_at}
+            for skill, attempts, average, best, last, updated_at in rows
+        ]
+
+    def skill_history(self, skill: str, user_id: Optional[int] = None, since: Optional[str] = None) -> List[Tuple]:
+        """(user_id, session_id, score, recorded_at) rows for a skill, oldest first
+
+        Served from skill_score_history by index; answer text is never read.
+        `since` is an ISO timestamp.
+        """
+        sql = "SELECT user_id, session_id, score, recorded_at FROM skill_score_history WHERE skill = ?"
+        params = [skill]
+        if user_id is not None:
+            sql = "SELECT user_id, session_id, score, recorded_at FROM skill_score_history WHERE user_id = ? AND skill = ?"
+            params = [user_id, skill]
+        if since is not None:
+            sql += " AND recorded_at >= ?"
+            params.append(since)
+        with self._connection() as conn:
+            return conn.execute(sql + " ORDER BY recorded_at", params).fetchall()
+
+    def _session(self, row: Tuple) -> Dict:
+        session_id, user_id, status, question_count, answered_count, scored_count, score_sum, started_at, completed_at = row
+        return {
+            'id': session_id,
+            'user_id': user_id,
+            'status': status,
+            'question_count': question_count,
+            'answered_count': answered_count,
+            'scored_count': scored_count,
+            # Same rounding as calculate_interview_score
+            'score': int(score_sum / scored_count) if scored_count else 0,
+            'started_at': started_at,
+            'completed_at': completed_at,
+        }
@@ -0,0 +1,515 @@
+"""Versioned schema migrations shared by every entry point
+
+The schema version lives in PRAGMA user_version. migrate() applies each
+migration newer than that version in its own BEGIN IMMEDIATE transaction,
+re-reading the version under the write lock so concurrent starts apply
+every step once. Migrations only create tables and indexes, rename and
+add columns, and copy data into new tables; existing rows are never
+rewritten, except that step 9 rebuilds a legacy users table row for row.
+
+Every step is frozen: its DDL and data copies are written out here, not
+imported from the modules that use the tables, so later changes to
+application code can't change what an old step does to a database that
+has not run it yet.
+
+Databases created by the old db_setup.py (placementpro.db), the old
+database.py (app.db, users.name) or the SQLAlchemy models in models.py
+all converge on the same schema.
+
+    python migrations.py app.db --check
+"""
+import json
+import re
+import sys
+from datetime import datetime
+
+# Columns every table must end up with, as (name, declaration for ADD COLUMN)
+USERS_COLUMNS = [
+    ('password_hash', 'TEXT'),
+    ('role', "TEXT NOT NULL DEFAULT 'student'"),
+    ('created_at', 'TEXT'),
+    ('last_login', 'TEXT'),
+]
+STUDENT_PROFILE_COLUMNS = [
+    ('university', 'TEXT'),
+    ('batch', 'TEXT'),
+    ('cgpa', 'REAL'),
+    ('department', 'TEXT'),
+    ('phone', 'TEXT'),
+    ('target_role', "TEXT DEFAULT 'Data Scientist'"),
+    ('skills', "TEXT DEFAULT '[]'"),
+]
+TPO_PROFILE_COLUMNS = [
+    ('college', 'TEXT'),
+    ('department', 'TEXT'),
+    ('phone', 'TEXT'),
+    ('position', 'TEXT'),
+]
+FACULTY_PROFILE_COLUMNS = [
+    ('college', 'TEXT'),
+    ('department', 'TEXT'),
+    ('phone', 'TEXT'),
+    ('designation', 'TEXT'),
+    ('expertise', 'TEXT'),
+]
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_missing_columns(conn, table, columns):
+    existing = _columns(conn, table)
+    for name, declaration in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+
+
+def _create_base_tables(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT,
+        full_name TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'student',  -- student, tpo, faculty
+        created_at TEXT,
+        last_login TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        title TEXT,
+        description TEXT,
+        created_at TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS student_profiles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER UNIQUE,
+        university TEXT,
+        batch TEXT,
+        cgpa REAL,
+        department TEXT,
+        phone TEXT,
+        target_role TEXT DEFAULT 'Data Scientist',
+        skills TEXT DEFAULT '[]',  -- JSON array of skills
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS tpo_profiles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER UNIQUE,
+        college TEXT,
+        department TEXT,
+        phone TEXT,
+        position TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS faculty_profiles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER UNIQUE,
+        college TEXT,
+        department TEXT,
+        phone TEXT,
+        designation TEXT,
+        expertise TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """)
+
+
+def _converge_columns(conn):
+    # The old database.py called the display name `name`
+    users = _columns(conn, 'users')
+    if 'name' in users and 'full_name' not in users:
+        conn.execute("ALTER TABLE users RENAME COLUMN name TO full_name")
+    _add_missing_columns(conn, 'users', USERS_COLUMNS)
+    _add_missing_columns(conn, 'student_profiles', STUDENT_PROFILE_COLUMNS)
+    _add_missing_columns(conn, 'tpo_profiles', TPO_PROFILE_COLUMNS)
+    _add_missing_columns(conn, 'faculty_profiles', FACULTY_PROFILE_COLUMNS)
+
+
+def _create_indexes(conn):
+    # email and every profile's user_id are UNIQUE, so already indexed
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_records_user_id ON records(user_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_records_created_at ON records(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_student_profiles_batch_department ON student_profiles(batch, department)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_student_profiles_department ON student_profiles(department)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_student_profiles_cgpa ON student_profiles(cgpa)")
+
+
+# Skill names the analyzer knew when step 4 was written, folded as skill_normalizer.fold()
+# did then. Names not listed (typos included) are copied as entered, and
+# database.upgrade_schema() canonicalizes them with the live normalizer
+# once step 4 has run.
+_V4_SKILL_ALIASES = {
+    'python': 'Python', 'python programming': 'Python', 'python 3': 'Python', 'py': 'Python',
+    'machine learning': 'Machine Learning', 'ml': 'Machine Learning', 'scikit learn': 'Machine Learning',
+    'sklearn': 'Machine Learning',
+    'sql': 'SQL', 'database': 'SQL', 'databases': 'SQL', 'mysql': 'SQL', 'postgresql': 'SQL', 'dbms': 'SQL',
+    'statistics': 'Statistics', 'probability': 'Statistics', 'stats': 'Statistics',
+    'statistical analysis': 'Statistics',
+    'deep learning': 'Deep Learning', 'neural networks': 'Deep Learning', 'dl': 'Deep Learning',
+    'tensorflow': 'Deep Learning', 'pytorch': 'Deep Learning',
+    'cloud computing': 'Cloud Computing', 'aws': 'Cloud Computing', 'azure': 'Cloud Computing',
+    'gcp': 'Cloud Computing', 'google cloud': 'Cloud Computing', 'cloud': 'Cloud Computing',
+    'communication': 'Communication', 'soft skills': 'Communication', 'communication skills': 'Communication',
+    'presentation': 'Communication',
+}
+
+
+def _v4_parse_skills(text):
+    """{skill: (proficiency, category)} from a student_profiles.skills JSON value"""
+    try:
+        entries = json.loads(text or '[]')
+    except ValueError:
+        return {}
+    skills = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, str):
+            entry = {'skill_name': entry}
+        if not isinstance(entry, dict):
+            continue
+        name = entry.get('skill_name') or entry.get('skill') or entry.get('name')
+        if not isinstance(name, str) or not name.strip():
+            continue
+        try:
+            proficiency = float(entry.get('proficiency') or 0)
+        except (TypeError, ValueError):
+            proficiency = 0.0
+        folded = re.sub(r"[^0-9a-z+#]+", ' ', name.casefold()).strip()
+        # Later entries win
+        skills[_V4_SKILL_ALIASES.get(folded, name.strip())] = (proficiency, entry.get('category'))
+    return skills
+
+
+def _create_student_skills(conn):
+    # WITHOUT ROWID keeps each student's skills together in primary-key order
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS student_skills (
+        user_id INTEGER NOT NULL,
+        skill TEXT NOT NULL,
+        proficiency REAL NOT NULL DEFAULT 0,
+        category TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (user_id, skill),
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_student_skills_skill_proficiency ON student_skills(skill, proficiency)")
+
+    # student_profiles.skills is kept for rollback but no longer written
+    now = datetime.now().isoformat()
+    rows = conn.execute(
+        "SELECT user_id, skills FROM student_profiles WHERE user_id IS NOT NULL AND skills NOT IN ('', '[]')"
+    )
+    while True:
+        profiles = rows.fetchmany(500)
+        if not profiles:
+            break
+        conn.executemany(
+            "INSERT OR IGNORE INTO student_skills (user_id, skill, proficiency, category, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(user_id, skill, proficiency, category, now)
+             for user_id, text in profiles
+             for skill, (proficiency, category) in _v4_parse_skills(text).items()]
+        )
+
+
+def _create_interview_tables(conn):
+    # Previously created by InterviewStore itself; IF NOT EXISTS keeps those
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS interview_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'active',  -- active, completed
+        question_count INTEGER NOT NULL,
+        answered_count INTEGER NOT NULL DEFAULT 0,
+        scored_count INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        started_at TEXT NOT NULL,
+        completed_at TEXT
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS interview_questions (
+        session_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        skill TEXT,
+        answer TEXT,
+        evaluation TEXT,  -- JSON
+        score REAL,
+        answered_at TEXT,
+        PRIMARY KEY (session_id, position),
+        FOREIGN KEY (session_id) REFERENCES interview_sessions(id)
+    )
+    """)
+    # One row per scored answer, so analytics read scores without the answer text
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS skill_score_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        skill TEXT NOT NULL,
+        session_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        recorded_at TEXT NOT NULL
+    )
+    """)
+    # Running per-student, per-skill totals
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS skill_scores (
+        user_id INTEGER NOT NULL,
+        skill TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        best_score REAL NOT NULL,
+        last_score REAL NOT NULL,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (user_id, skill)
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_interview_sessions_user_id ON interview_sessions(user_id, status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_skill_score_history_skill ON skill_score_history(skill, recorded_at)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_skill_score_history_user ON skill_score_history(user_id, skill, recorded_at)"
+    )
+
+
+def _create_cohort_analytics(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS cohort_members (
+        user_id INTEGER PRIMARY KEY,
+        batch TEXT NOT NULL,
+        department TEXT NOT NULL,
+        buckets TEXT NOT NULL  -- JSON {metric: bucket} this student is counted in
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS cohort_histograms (
+        batch TEXT NOT NULL,
+        department TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (metric, batch, department, bucket)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS cohort_interview_trends (
+        batch TEXT NOT NULL,
+        department TEXT NOT NULL,
+        period TEXT NOT NULL,  -- YYYY-MM
+        answers INTEGER NOT NULL,
+        score_sum REAL NOT NULL,
+        PRIMARY KEY (batch, department, period)
+    ) WITHOUT ROWID
+    """)
+    # Counted on first use by cohort_analytics.ensure_current() (see step 8)
+
+
+def _create_pipeline_tables(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS pipeline_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        status TEXT NOT NULL DEFAULT 'running',  -- running, failed, completed
+        checkpoint INTEGER NOT NULL DEFAULT 0,   -- every student_profiles.user_id <= checkpoint is done
+        students INTEGER NOT NULL DEFAULT 0,
+        started_at TEXT NOT NULL,
+        finished_at TEXT
+    )
+    """)
+    # Latest nightly results per student, as the dashboard would show them
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS student_insights (
+        user_id INTEGER PRIMARY KEY,
+        run_id INTEGER NOT NULL,
+        target_role TEXT NOT NULL,
+        readiness INTEGER NOT NULL,
+        skill_gaps TEXT NOT NULL,       -- JSON, as SkillAnalyzer.analyze_matrix
+        recommendations TEXT NOT NULL,  -- JSON, as SkillAnalyzer.recommend_cohort
+        questions TEXT NOT NULL,        -- JSON list of practice questions
+        computed_at TEXT NOT NULL
+    )
+    """)
+
+
+def _create_cohort_analytics_state(conn):
+    # Empty until the counts are built, which marks them stale
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS cohort_analytics_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        analyzer TEXT NOT NULL,  -- SkillAnalyzer.fingerprint the counts were made with
+        built_at TEXT NOT NULL
+    )
+    """)
+
+
+# users as step 1 creates it; step 9 rebuilds legacy tables into this shape
+_V9_USERS_COLUMNS = [
+    ('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+    ('email', 'TEXT UNIQUE NOT NULL'),
+    ('password_hash', 'TEXT'),
+    ('full_name', 'TEXT NOT NULL'),
+    ('role', "TEXT NOT NULL DEFAULT 'student'"),
+    ('created_at', 'TEXT'),
+    ('last_login', 'TEXT'),
+]
+
+
+def _rebuild_legacy_users(conn):
+    # The old db_setup.py declared password_hash and role NOT NULL with no
+    # default, and models.py role NOT NULL with a Python-side default only;
+    # step 2 can't drop a constraint, so add_user() (name and email only)
+    # still failed there. Rebuild the table as SQLite recommends: create,
+    # copy, drop, rename. Columns step 1 doesn't know are kept as declared.
+    columns = conn.execute("PRAGMA table_info(users)").fetchall()
+    if not any(name in ('password_hash', 'role') and notnull and default is None
+               for _, name, _, notnull, default, _ in columns):
+        return
+
+    known = dict(_V9_USERS_COLUMNS)
+    extra = [
+        f"{name} {declared}" + (" NOT NULL" if notnull else "") + (f" DEFAULT {default}" if default is not None else "")
+        for _, name, declared, notnull, default, _ in columns if name not in known
+    ]
+    kept = [name for name in known if name != 'role'] + [name for _, name, _, _, _, _ in columns if name not in known]
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'users'").fetchone()
+
+    conn.execute(f"CREATE TABLE users_rebuilt ({', '.join([f'{n} {d}' for n, d in _V9_USERS_COLUMNS] + extra)})")
+    conn.execute(f"""
+        INSERT INTO users_rebuilt ({', '.join(kept)}, role)
+        SELECT {', '.join(kept)}, COALESCE(role, 'student') FROM users
+    """)
+    conn.execute("DROP TABLE users")
+    conn.execute("ALTER TABLE users_rebuilt RENAME TO users")
+    if sequence is not None:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'users'", sequence)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at)")
+
+
+# (version, description, apply); append new steps, never edit applied ones
+MIGRATIONS = [
+    (1, 'create base tables', _create_base_tables),
+    (2, 'converge legacy users and profile columns', _converge_columns),
+    (3, 'indexes for role, user_id, batch/department and cgpa lookups', _create_indexes),
+    (4, 'normalized student_skills table filled from student_profiles.skills', _create_student_skills),
+    (5, 'interview session tables', _create_interview_tables),
+    (6, 'materialized cohort analytics', _create_cohort_analytics),
+    (7, 'nightly pipeline runs and per-student insights', _create_pipeline_tables),
+    (8, 'analyzer version the cohort analytics were counted with', _create_cohort_analytics_state),
+    (9, 'rebuild legacy users tables without NOT NULL password_hash / role', _rebuild_legacy_users),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Hot queries and the index (or PRIMARY KEY) each must use, checked by check_query_plans()
+HOT_QUERIES = [
+    ("SELECT id, full_name FROM users WHERE role = ?", ('student',), 'idx_users_role'),
+    ("SELECT id FROM users WHERE email = ?", ('a@b.c',), 'sqlite_autoindex_users_1'),
+    ("SELECT * FROM student_profiles WHERE user_id = ?", (1,), 'sqlite_autoindex_student_profiles_1'),
+    ("SELECT * FROM tpo_profiles WHERE user_id = ?", (1,), 'sqlite_autoindex_tpo_profiles_1'),
+    ("SELECT * FROM faculty_profiles WHERE user_id = ?", (1,), 'sqlite_autoindex_faculty_profiles_1'),
+    ("SELECT id, title FROM records WHERE user_id = ?", (1,), 'idx_records_user_id'),
+    ("SELECT user_id, cgpa FROM student_profiles WHERE batch = ?", ('2025',), 'idx_student_profiles_batch_department'),
+    ("SELECT user_id, cgpa FROM student_profiles WHERE batch = ? AND department = ?", ('2025', 'CSE'),
+     'idx_student_profiles_batch_department'),
+    ("SELECT user_id, cgpa FROM student_profiles WHERE department = ?", ('CSE',), 'idx_student_profiles_department'),
+    ("SELECT user_id FROM student_profiles WHERE cgpa >= ? ORDER BY cgpa DESC", (8.0,), 'idx_student_profiles_cgpa'),
+    ("SELECT user_id FROM student_skills WHERE skill = ? AND proficiency < ?", ('SQL', 60),
+     'idx_student_skills_skill_proficiency'),
+    ("SELECT skill, proficiency FROM student_skills WHERE user_id = ?", (1,), 'PRIMARY KEY'),
+    ("SELECT bucket, count FROM cohort_histograms WHERE metric = ? AND batch = ?", ('cgpa', '2025'), 'PRIMARY KEY'),
+    ("SELECT user_id FROM student_profiles WHERE user_id > ? ORDER BY user_id LIMIT 1 OFFSET ?", (0, 1999),
+     'sqlite_autoindex_student_profiles_1'),
+    ("SELECT skill_gaps, recommendations FROM student_insights WHERE user_id = ?", (1,), 'PRIMARY KEY'),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Bring the database up to LATEST_VERSION and return the versions applied"""
+    applied = []
+    if schema_version(conn) >= LATEST_VERSION:
+        return applied
+
+    # Table rebuilds (step 9) drop and recreate parent tables, which enforced
+    # foreign keys would count as violations; the pragma is a no-op inside a
+    # transaction, so it is switched off around the whole run
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    if foreign_keys:
+        conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version, _description, apply in MIGRATIONS:
+            if schema_version(conn) >= version:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have migrated while we waited for the lock
+                if schema_version(conn) < version:
+                    apply(conn)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                    applied.append(version)
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+    finally:
+        if foreign_keys:
+            conn.execute("PRAGMA foreign_keys = ON")
+    if applied:
+        conn.execute("PRAGMA optimize")
+    return applied
+
+
+def check_query_plans(conn, queries=HOT_QUERIES):
+    """Return (sql, plan) for every hot query that does not use its index"""
+    problems = []
+    for sql, params, index in queries:
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        if not any(index in detail for detail in plan):
+            problems.append((sql, plan))
+    return problems
+
+
+def main(argv=None):
+    import argparse
+    from database import get_connection, upgrade_schema
+
+    parser = argparse.ArgumentParser(description="Apply schema migrations to a database")
+    parser.add_argument("db")
+    parser.add_argument("--check", action="store_true", help="verify hot queries use their indexes")
+    args = parser.parse_args(argv)
+
+    conn = get_connection(args.db)
+    before = schema_version(conn)
+    applied = upgrade_schema(conn)
+    print(f"{args.db}: schema version {before} -> {schema_version(conn)}"
+          + (f" (applied {', '.join(map(str, applied))})" if applied else " (up to date)"))
+
+    if args.check:
+        problems = check_query_plans(conn)
+        for sql, plan in problems:
+            print(f"NOT INDEXED: {sql}\n    {' / '.join(plan)}")
+        print(f"{len(HOT_QUERIES) - len(problems)}/{len(HOT_QUERIES)} hot queries use their index")
+        if problems:
+            sys.exit(1)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
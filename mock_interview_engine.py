@@ -1,96 +1,389 @@
-import openai
+import asyncio
 import json
 import random
-from typing import List, Dict
+from functools import partial
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
 import os
 
-class MockInterviewEngine:
-    def __init__(self):
+from evaluation_cache import EvaluationCache, evaluation_key
+from instrumentation import timed
+from interview_store import InterviewStore
+from question_bank import QuestionBank
+
+# Defaults for evaluate_batch
+BATCH_CONCURRENCY = 16
+BATCH_TIMEOUT = 30.0
+BATCH_RETRIES = 3
+BATCH_BACKOFF = 0.5
+# Answers per score_batch call for local (synchronous) backends
+LOCAL_BATCH_CHUNK = 1024
+# Sampling weight of a skill with no gap; a skill's gap is added on top
+GAP_BASE_WEIGHT = 5.0
+
+class EvaluatorBackend:
+    """Scores a single answer; raise on failure so callers can retry"""
+    
+    async def evaluate(self, question: str, answer: str) -> Dict:
+        raise NotImplementedError
+
+class OpenAIEvaluator(EvaluatorBackend):
+    """Evaluate answers with an OpenAI chat model"""
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo"):
+        import openai
+        
         # Initialize OpenAI (you can use Hugging Face as alternative)
-        self.api_key = os.getenv('OPENAI_API_KEY', 'your-api-key')
-        openai.api_key = self.api_key
+        self.openai = openai
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY', 'your-api-key')
+        self.model = model
+        # openai>=1.0 replaced ChatCompletion.acreate with an async client
+        if hasattr(openai, 'AsyncOpenAI'):
+            self.client = openai.AsyncOpenAI(api_key=self.api_key)
+        else:
+            self.client = None
+            self.openai.api_key = self.api_key
+    
+    async def evaluate(self, question: str, answer: str) -> Dict:
+        request = dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are an expert interviewer evaluating a candidate's answer."},
+                {"role": "user", "content": f"Question: {question}\n\nCandidate Answer: {answer}\n\nEvaluate this answer on a scale of 0-100 for technical accuracy, completeness, and clarity. Also provide specific feedback on what was good and what could be improved. Return as JSON with keys: score, feedback, strengths, improvements."}
+            ],
+            temperature=0.3
+        )
+        if self.client is not None:
+            response = await self.client.chat.completions.create(**request)
+        else:
+            response = await self.openai.ChatCompletion.acreate(**request)
+        
+        # Parse response; an unparseable reply is a failure, not a score
+        evaluation_text = response.choices[0].message.content
+        evaluation = json.loads(evaluation_text)
+        if not isinstance(evaluation, dict) or 'score' not in evaluation:
+            raise ValueError("Evaluator reply has no score")
+        
+        return evaluation
+
+class HTTPEvaluator(EvaluatorBackend):
+    """POST {question, answer} as JSON to an evaluation service and return its JSON reply
+    
+    Uses plain asyncio streams, so many requests can be in flight without a
+    thread per request. Intended for self-hosted scoring services and for
+    local stub servers in tests and benchmarks.
+    """
+    
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported evaluator URL: {url}")
+        self.ssl = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.ssl else 80)
+        self.path = parts.path or '/'
+    
+    async def evaluate(self, question: str, answer: str) -> Dict:
+        body = json.dumps({'question': question, 'answer': answer}).encode('utf-8')
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        try:
+            writer.write(
+                f"POST {self.path} HTTP/1.1\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode('ascii') + body
+            )
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
         
+        head, _, payload = response.partition(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        if status != 200:
+            raise RuntimeError(f"Evaluator returned HTTP {status}")
+        return json.loads(payload)
+
+def default_backend(question_bank: QuestionBank) -> EvaluatorBackend:
+    """OpenAI when an API key and client are available, otherwise the offline scorer
+    
+    The offline scorer indexes every question in the bank up front, so
+    each one is scored against its own reference row.
+    """
+    if os.getenv('OPENAI_API_KEY'):
+        try:
+            return OpenAIEvaluator()
+        except ImportError:
+            pass
+    from offline_evaluator import OfflineEvaluator
+    return OfflineEvaluator(question_bank.as_dict())
+
+def interview_feedback(score: int) -> str:
+    """Overall feedback line for an interview score"""
+    if score >= 75:
+        return 'Great interview! You are well prepared in these areas.'
+    if score >= 50:
+        return 'Good effort. Review the feedback below to strengthen weaker answers.'
+    return 'Keep practicing. Focus on the concepts highlighted in the feedback below.'
+
+class MockInterviewEngine:
+    def __init__(
+        self,
+        backend: Optional[EvaluatorBackend] = None,
+        cache: Optional[EvaluationCache] = None,
+        question_bank: Optional[QuestionBank] = None,
+        store: Optional[InterviewStore] = None,
+    ):
         # Question bank categorized by skill
-        self.question_bank = {
-            'Python': [
-                "Explain the difference between list comprehension and generator expression.",
-                "How does Python's garbage collection work?",
-                "What are decorators and how do you use them?",
-                "Explain the Global Interpreter Lock (GIL) in Python."
-            ],
-            'Machine Learning': [
-                "Explain bias-variance tradeoff with examples.",
-                "What is overfitting and how do you prevent it?",
-                "Compare logistic regression and SVM.",
-                "What are regularization techniques in ML?"
-            ],
-            'SQL': [
-                "Explain different types of JOINs in SQL.",
-                "What is indexing and when should you use it?",
-                "How do you optimize a slow SQL query?",
-                "What is window function in SQL?"
-            ]
-        }
+        self.question_bank = question_bank if question_bank is not None else QuestionBank.load()
+        
+        self.backend = backend or default_backend(self.question_bank)
+        self.cache = cache if cache is not None else EvaluationCache()
+        # Evaluations currently running and their waiter counts, so identical answers share one call
+        self.inflight = {}
+        # Question ids each student has been asked, so interviews don't repeat
+        self.seen = {}
+        # Persistent sessions for start_interview / submit_answers
+        self.store = store
+    
+    @timed('engine.generate_questions')
+    def generate_questions(
+        self,
+        skill_gaps: List[Dict],
+        num_questions: int = 5,
+        student_id: Optional[int] = None,
+        rng: Optional[random.Random] = None,
+    ) -> List[str]:
+        """Generate interview questions based on skill gaps
+        
+        Questions are drawn without replacement, each skill weighted by
+        GAP_BASE_WEIGHT plus its gap, so the largest gaps get the most
+        questions while every skill stays possible. With a student_id,
+        questions that student has already been asked are skipped until the
+        whole bank has been seen, then a new round starts. Returns
+        min(num_questions, bank size) distinct questions.
+        """
+        weights = {gap['skill']: GAP_BASE_WEIGHT + max(gap.get('gap', 0), 0) for gap in skill_gaps}
+        seen = self._seen(student_id) if student_id is not None else set()
+        
+        ids = self.question_bank.sample(weights, num_questions, seen, GAP_BASE_WEIGHT, rng)
+        if len(ids) < num_questions and seen:
+            # Nothing unseen left: top up from seen questions and start over
+            ids += self.question_bank.sample(weights, num_questions - len(ids), ids, GAP_BASE_WEIGHT, rng)
+            seen.clear()
+        seen.update(ids)
+        
+        return [self.question_bank.texts[i] for i in ids]
+    
+    def _seen(self, student_id: int) -> set:
+        seen = self.seen.get(student_id)
+        if seen is None:
+            # After a restart, pick up what the store says this student was asked
+            asked = self.store.asked_questions(student_id) if self.store is not None else []
+            ids = (self.question_bank.ids.get(q) for q in asked)
+            seen = self.seen[student_id] = {i for i in ids if i is not None}
+        return seen
     
-    def generate_questions(self, skill_gaps: List[Dict], num_questions: int = 5) -> List[str]:
-        """Generate interview questions based on skill gaps"""
-        questions = []
+    def start_interview(self, student_id: int, skill_gaps: List[Dict], num_questions: int = 5) -> Dict:
+        """Generate questions for a student and open a stored session for them"""
+        questions = self.generate_questions(skill_gaps, num_questions, student_id)
+        skills = [self.question_bank.skills[self.question_bank.question_skill[self.question_bank.ids[q]]] for q in questions]
+        interview_id = self.store.create_session(student_id, list(zip(questions, skills)))
+        return {'interview_id': interview_id, 'questions': questions}
+    
+    @timed('engine.submit_answers')
+    async def submit_answers(self, interview_id: int, answers: Iterable[str]) -> Dict:
+        """Evaluate and store the answers to a stored interview
         
-        # Focus on skills with largest gaps
-        for gap in skill_gaps[:3]:  # Top 3 gaps
-            skill = gap['skill']
-            if skill in self.question_bank:
-                questions.extend(random.sample(self.question_bank[skill], 2))
+        Answers line up with the interview's questions; already scored
+        questions (say, from a submission interrupted by a restart) are
+        skipped, while ones that got a fallback evaluation are scored
+        again. Each evaluation is stored as it finishes, updating the
+        running score, so the result never re-reads earlier answers. Store
+        calls run on a worker thread so the event loop keeps serving other
+        requests while SQLite writes.
+        """
+        session = await asyncio.to_thread(self.store.get_session, interview_id)
+        if session is None:
+            raise ValueError(f"Unknown interview {interview_id}")
         
-        # If not enough questions, add random ones
-        while len(questions) < num_questions:
-            random_skill = random.choice(list(self.question_bank.keys()))
-            random_question = random.choice(self.question_bank[random_skill])
-            if random_question not in questions:
-                questions.append(random_question)
+        pending = [
+            (q['position'], q['question'], answer)
+            for q, answer in zip(session['questions'], answers)
+            if not self._final(q['evaluation'])
+        ]
+        evaluations = {q['position']: q['evaluation'] for q in session['questions'] if self._final(q['evaluation'])}
+        summary = session
+        async for i, evaluation in self.evaluate_batch([(question, answer) for _, question, answer in pending]):
+            position, _, answer = pending[i]
+            summary = await asyncio.to_thread(self.store.record_answer, interview_id, position, answer, evaluation)
+            evaluations[position] = evaluation
         
-        return questions[:num_questions]
+        return {
+            'score': summary['score'],
+            'feedback': interview_feedback(summary['score']),
+            'status': summary['status'],
+            'evaluations': [
+                {'question': q['question'], 'evaluation': evaluations[q['position']]}
+                for q in session['questions'] if q['position'] in evaluations
+            ],
+        }
+    
+    @staticmethod
+    def _final(evaluation: Optional[Dict]) -> bool:
+        return evaluation is not None and not evaluation.get('fallback')
     
+    @timed('engine.evaluate_answer')
     async def evaluate_answer(self, question: str, answer: str) -> Dict:
         """Evaluate student's answer using AI"""
         try:
-            # Using OpenAI for evaluation (can use Hugging Face locally)
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert interviewer evaluating a candidate's answer."},
-                    {"role": "user", "content": f"Question: {question}\n\nCandidate Answer: {answer}\n\nEvaluate this answer on a scale of 0-100 for technical accuracy, completeness, and clarity. Also provide specific feedback on what was good and what could be improved. Return as JSON with keys: score, feedback, strengths, improvements."}
-                ],
-                temperature=0.3
-            )
+            return await self._evaluate_cached(question, answer, lambda: self.backend.evaluate(question, answer))
+        except Exception as e:
+            return self.fallback_evaluation()
+    
+    def fallback_evaluation(self) -> Dict:
+        """Evaluation reported when the backend cannot score an answer
+        
+        Carries no score so it is never mistaken for (or averaged in with)
+        a real evaluation, and it is never cached.
+        """
+        return {
+            'score': None,
+            'fallback': True,
+            'feedback': 'AI evaluation unavailable. Please consult with your mentor.',
+            'strengths': [],
+            'improvements': []
+        }
+    
+    async def _evaluate_cached(self, question: str, answer: str, evaluate) -> Dict:
+        """Serve from the cache, join an identical in-flight call, or await evaluate() and cache the result
+        
+        The evaluation runs as a task of its own that no caller owns: every
+        caller, the first included, waits on it through asyncio.shield, so
+        cancelling (or timing out) one caller stops only that caller's wait.
+        When the last waiter leaves before it finishes, the evaluation is
+        cancelled too, so nobody pays for a result nobody reads. The task
+        caches its result and leaves self.inflight when it finishes.
+        """
+        cached = self.cache.get(question, answer)
+        if cached is not None:
+            return dict(cached)
+        
+        key = evaluation_key(question, answer)
+        entry = self.inflight.get(key)
+        if entry is None:
+            # [task, callers waiting on it]
+            entry = self.inflight[key] = [asyncio.ensure_future(evaluate()), 0]
+            entry[0].add_done_callback(partial(self._evaluation_done, key, entry, question, answer))
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return dict(await asyncio.shield(task))
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                # Later callers start a fresh evaluation rather than join a cancelled one
+                if self.inflight.get(key) is entry:
+                    del self.inflight[key]
+                task.cancel()
+    
+    def _evaluation_done(self, key: str, entry: List, question: str, answer: str, task: asyncio.Future) -> None:
+        if self.inflight.get(key) is entry:
+            del self.inflight[key]
+        # Retrieve the outcome even when every waiter has gone
+        if not task.cancelled() and task.exception() is None:
+            self.cache.put(question, answer, task.result())
+    
+    async def evaluate_batch(
+        self,
+        items: Iterable[Tuple[str, str]],
+        concurrency: int = BATCH_CONCURRENCY,
+        timeout: float = BATCH_TIMEOUT,
+        retries: int = BATCH_RETRIES,
+        backoff: float = BATCH_BACKOFF,
+    ) -> AsyncIterator[Tuple[int, Dict]]:
+        """Evaluate many (question, answer) pairs, yielding (position, evaluation) as each finishes
+        
+        At most `concurrency` backend calls run at once. Each call gets
+        `timeout` seconds and is retried up to `retries` times with jittered
+        exponential backoff before falling back to fallback_evaluation().
+        Cached and duplicate answers are served without a backend call.
+        Backends with a synchronous score_batch (the offline scorer) are
+        fed whole chunks instead.
+        """
+        if hasattr(self.backend, 'score_batch'):
+            async for result in self._score_batch_local(items):
+                yield result
+            return
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(position: int, question: str, answer: str) -> Tuple[int, Dict]:
+            async def evaluate() -> Dict:
+                async with semaphore:
+                    return await self._evaluate_with_retry(question, answer, timeout, retries, backoff)
             
-            # Parse response
-            evaluation_text = response.choices[0].message.content
+            # Cache hits and duplicate answers don't take a concurrency slot
             try:
-                evaluation = json.loads(evaluation_text)
-            except:
-                evaluation = {
-                    'score': 70,
-                    'feedback': 'Answer shows basic understanding but could be more detailed.',
-                    'strengths': ['Correct general direction'],
-                    'improvements': ['Add more specific examples', 'Explain underlying concepts']
-                }
-            
-            return evaluation
-            
-        except Exception as e:
-            # Fallback evaluation
-            return {
-                'score': random.randint(50, 90),
-                'feedback': 'AI evaluation unavailable. Please consult with your mentor.',
-                'strengths': ['Answer provided'],
-                'improvements': ['Could be more detailed']
-            }
+                evaluation = await self._evaluate_cached(question, answer, evaluate)
+            except Exception:
+                evaluation = self.fallback_evaluation()
+            return position, evaluation
+        
+        tasks = [asyncio.ensure_future(run(i, q, a)) for i, (q, a) in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The consumer may stop early; cancelling the last waiter of an
+            # evaluation cancels its backend call and frees its slot
+            for task in tasks:
+                task.cancel()
+    
+    async def _score_batch_local(self, items: Iterable[Tuple[str, str]]) -> AsyncIterator[Tuple[int, Dict]]:
+        chunk = []
+        for position, (question, answer) in enumerate(items):
+            cached = self.cache.get(question, answer)
+            if cached is not None:
+                yield position, dict(cached)
+                continue
+            chunk.append((position, question, answer))
+            if len(chunk) == LOCAL_BATCH_CHUNK:
+                for result in self._score_chunk(chunk):
+                    yield result
+                chunk = []
+                # Let other tasks run between chunks
+                await asyncio.sleep(0)
+        for result in self._score_chunk(chunk):
+            yield result
+    
+    @timed('engine.score_chunk')
+    def _score_chunk(self, chunk: List[Tuple[int, str, str]]) -> List[Tuple[int, Dict]]:
+        if not chunk:
+            return []
+        evaluations = self.backend.score_batch([(q, a) for _, q, a in chunk])
+        for (_, question, answer), evaluation in zip(chunk, evaluations):
+            self.cache.put(question, answer, evaluation)
+        return [(position, dict(evaluation)) for (position, _, _), evaluation in zip(chunk, evaluations)]
+    
+    async def _evaluate_with_retry(self, question: str, answer: str, timeout: float, retries: int, backoff: float) -> Dict:
+        for attempt in range(retries + 1):
+            try:
+                return await asyncio.wait_for(self.backend.evaluate(question, answer), timeout)
+            except Exception:
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+    
+    def cache_stats(self) -> Dict:
+        return self.cache.stats()
     
     def calculate_interview_score(self, evaluations: List[Dict]) -> int:
         """Calculate overall interview score"""
-        if not evaluations:
+        # Fallback evaluations have no score and are left out
+        scores = [e['score'] for e in evaluations if e.get('score') is not None]
+        if not scores:
             return 0
         
-        scores = [e['score'] for e in evaluations]
         return int(sum(scores) / len(scores))
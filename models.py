@@ -1,28 +1,34 @@
 from datetime import datetime
-from flask_bcrypt import Bcrypt
+from flask_sqlalchemy import SQLAlchemy
 
-# Initialize bcrypt
-bcrypt = Bcrypt()
+from auth import hash_password, verify_password
 
-# Import db from app
-from app import db
+# Bound to a Flask app with db.init_app(app); app.py is the Streamlit page
+# and api.py serves the JSON API, neither defines a db
+db = SQLAlchemy()
 
+# Tables and indexes are created by migrations.py; these mappings mirror them
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('idx_users_role', 'role'),
+        db.Index('idx_users_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(200), nullable=False)
+    password_hash = db.Column(db.String(200))
     full_name = db.Column(db.String(100), nullable=False)
-    role = db.Column(db.String(20), nullable=False)  # student, tpo, faculty
+    role = db.Column(db.String(20), nullable=False, default='student')  # student, tpo, faculty
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     
+    # Synchronous; async callers use auth.PasswordHasher to keep hashing off the event loop
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return verify_password(password, self.password_hash)
     
     def to_dict(self):
         return {
@@ -35,6 +41,11 @@ class User(db.Model):
 
 class StudentProfile(db.Model):
     __tablename__ = 'student_profiles'
+    __table_args__ = (
+        db.Index('idx_student_profiles_batch_department', 'batch', 'department'),
+        db.Index('idx_student_profiles_department', 'department'),
+        db.Index('idx_student_profiles_cgpa', 'cgpa'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), unique=True)
@@ -44,6 +55,7 @@ class StudentProfile(db.Model):
     department = db.Column(db.String(100))
     phone = db.Column(db.String(20))
     target_role = db.Column(db.String(100), default='Data Scientist')
+    skills = db.Column(db.Text, default='[]')  # JSON array of skills
     
     user = db.relationship('User', backref='student_profile')
     
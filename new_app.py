@@ -1,5 +1,6 @@
 import streamlit as st
 
+from streamlit_cache import read_text
 from utils.config import settings
 
 
@@ -12,9 +13,8 @@ def configure_page() -> None:
         initial_sidebar_state="expanded",
     )
 
-    # Global styling
-    with open("assets/styles.css", encoding="utf-8") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    # Global styling, read from disk only when the file changes
+    st.markdown(f"<style>{read_text('assets/styles.css')}</style>", unsafe_allow_html=True)
 
 
 def main() -> None:
@@ -0,0 +1,318 @@
+"""Nightly cohort pipeline: skill gaps, course recommendations and practice questions for every student
+
+The parent process walks student_profiles in user_id order and hands out
+chunks of CHUNK_SIZE students as (after_id, last_id] ranges. Worker
+processes, each with its own analyzer, question bank and connection set
+up once by the pool initializer, read their chunk's profiles and skills,
+run analyze_matrix, recommend_cohort and generate_questions on the whole
+chunk, and write the results to student_insights in one transaction.
+SQLite takes one writer at a time, but everything except the insert
+itself runs in parallel, so the parent stays nearly idle.
+
+At most max_in_flight chunks are submitted at once: the parent only
+looks up the next chunk when a worker finishes one, so memory stays
+flat however large the cohort. Chunks can finish out of order; the run's
+checkpoint in pipeline_runs only moves past a chunk once every chunk
+before it is written, so a crashed or interrupted run resumes from its
+checkpoint (results are upserts, so redoing a chunk is harmless).
+
+With a snapshot directory (--snapshot-dir or PLACEMENTPRO_SNAPSHOT_DIR),
+a completed run then publishes a fresh cohort_snapshot for the API and
+the TPO views to map.
+
+    python nightly_pipeline.py --db app.db --workers 4
+"""
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import cohort_snapshot
+import database
+from course_catalog import COURSE_CATALOG_PATH
+from role_catalog import ROLE_CATALOG_PATH
+from skill_analyzer import MODEL_PATH
+
+# Students per worker task and per write transaction
+CHUNK_SIZE = 2000
+WORKERS = os.cpu_count() or 1
+# Chunks submitted but not yet written, per worker
+IN_FLIGHT_PER_WORKER = 2
+QUESTIONS_PER_STUDENT = 5
+DEFAULT_TARGET_ROLE = 'Data Scientist'
+# Seconds between progress lines
+PROGRESS_INTERVAL = 5.0
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+
+def _init_worker(db_path: str, model_path: str, catalog_path: str, course_catalog_path: str) -> None:
+    """Pool initializer: load the model, catalogs and question bank once per worker process"""
+    from evaluation_cache import EvaluationCache
+    from mock_interview_engine import EvaluatorBackend, MockInterviewEngine
+    from question_bank import QuestionBank
+    from skill_analyzer import SkillAnalyzer
+
+    _worker['analyzer'] = SkillAnalyzer(model_path, catalog_path, course_catalog_path)
+    # Only generate_questions is used, so nothing is ever evaluated
+    _worker['engine'] = MockInterviewEngine(
+        backend=EvaluatorBackend(), cache=EvaluationCache(max_entries=1), question_bank=QuestionBank.load()
+    )
+    _worker['conn'] = database.get_connection(db_path)
+
+
+def process_chunk(run_id: int, after_id: int, last_id: int) -> Tuple[int, float, float, float]:
+    """Analyze and store students after_id < user_id <= last_id in a worker
+
+    Returns (students, read seconds, compute seconds, write seconds).
+    """
+    from student_skills import skill_matrix_for
+
+    conn, analyzer, engine = _worker['conn'], _worker['analyzer'], _worker['engine']
+    start = time.perf_counter()
+    profiles = conn.execute(
+        "SELECT user_id, target_role FROM student_profiles WHERE user_id > ? AND user_id <= ? ORDER BY user_id",
+        (after_id, last_id)
+    ).fetchall()
+    user_ids = [user_id for user_id, _ in profiles]
+    roles = [role or DEFAULT_TARGET_ROLE for _, role in profiles]
+    matrix = skill_matrix_for(conn, user_ids)
+    read = time.perf_counter()
+
+    standards = analyzer.nearest_standards(matrix, roles)
+    gaps = analyzer.analyze_matrix(matrix, roles, standards)
+    recommendations = analyzer.recommend_cohort(matrix, roles, standards)
+    readiness = analyzer.readiness(matrix, standards).astype(int).tolist()
+    now = datetime.now().isoformat()
+    rows = []
+    for i, user_id in enumerate(user_ids):
+        # Seeded per run and student, so a resumed chunk gets the same questions
+        rng = random.Random(f'{run_id}:{user_id}')
+        questions = engine.generate_questions(gaps[i], QUESTIONS_PER_STUDENT, rng=rng)
+        rows.append((user_id, run_id, roles[i], readiness[i], json.dumps(gaps[i]),
+                     json.dumps(recommendations[i]), json.dumps(questions), now))
+    computed = time.perf_counter()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany("""
+            INSERT OR REPLACE INTO student_insights
+                (user_id, run_id, target_role, readiness, skill_gaps, recommendations, questions, computed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return len(user_ids), read - start, computed - read, time.perf_counter() - computed
+
+
+def _next_chunk(conn, after_id: int, size: int) -> Optional[int]:
+    """Last user_id of the chunk of `size` students after after_id, or None when none are left"""
+    row = conn.execute(
+        "SELECT user_id FROM student_profiles WHERE user_id > ? ORDER BY user_id LIMIT 1 OFFSET ?",
+        (after_id, size - 1)
+    ).fetchone()
+    if row is None:
+        row = conn.execute("SELECT MAX(user_id) FROM student_profiles WHERE user_id > ?", (after_id,)).fetchone()
+    return row[0]
+
+
+def _start_run(conn, resume: bool) -> Tuple[int, int]:
+    """(run id, checkpoint): the unfinished latest run when resuming, otherwise a new one"""
+    if resume:
+        row = conn.execute("SELECT id, status, checkpoint FROM pipeline_runs ORDER BY id DESC LIMIT 1").fetchone()
+        if row is not None and row[1] != 'completed':
+            conn.execute("UPDATE pipeline_runs SET status = 'running' WHERE id = ?", (row[0],))
+            return row[0], row[2]
+    run_id = conn.execute(
+        "INSERT INTO pipeline_runs (started_at) VALUES (?)", (datetime.now().isoformat(),)
+    ).lastrowid
+    return run_id, 0
+
+
+class _InlineFuture:
+    """Result holder for workers=1, where chunks run in this process"""
+
+    def __init__(self, fn, *args):
+        self.value = fn(*args)
+
+    def result(self):
+        return self.value
+
+
+def run_pipeline(
+    db_path: Optional[str] = None,
+    workers: int = WORKERS,
+    chunk_size: int = CHUNK_SIZE,
+    max_in_flight: Optional[int] = None,
+    resume: bool = True,
+    model_path: str = MODEL_PATH,
+    catalog_path: str = ROLE_CATALOG_PATH,
+    course_catalog_path: str = COURSE_CATALOG_PATH,
+    progress: Optional[Callable[[Dict], None]] = None,
+    snapshot_dir: Optional[str] = None,
+) -> Dict:
+    """Run (or resume) the nightly pipeline over every student and return its report
+
+    workers=1 runs every chunk in this process, with no pool. progress,
+    when given, is called with a partial report every PROGRESS_INTERVAL
+    seconds. With snapshot_dir, a completed run publishes a cohort
+    snapshot there; the report's 'snapshot' is its path.
+    """
+    db_path = db_path or database.DB_NAME
+    max_in_flight = max_in_flight or workers * IN_FLIGHT_PER_WORKER
+    started = time.perf_counter()
+
+    conn = database.get_connection(db_path)
+    database.upgrade_schema(conn)
+    run_id, checkpoint = _start_run(conn, resume)
+    total = conn.execute("SELECT COUNT(*) FROM student_profiles WHERE user_id > ?", (checkpoint,)).fetchone()[0]
+    report = {
+        'run_id': run_id, 'resumed_from': checkpoint, 'workers': workers, 'chunk_size': chunk_size,
+        'total': total, 'students': 0, 'chunks': 0,
+        'read_seconds': 0.0, 'compute_seconds': 0.0, 'write_seconds': 0.0, 'wait_seconds': 0.0,
+    }
+
+    in_flight = {}    # future -> (sequence number, last_id)
+    finished = {}     # sequence number -> (last_id, students), for chunks done out of order
+    next_sequence = checkpointed = 0
+    after_id = checkpoint
+    last_progress = time.perf_counter()
+    executor = None
+    try:
+        init_args = (db_path, model_path, catalog_path, course_catalog_path)
+        if workers > 1:
+            executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args)
+            submit = executor.submit
+        else:
+            _init_worker(*init_args)
+            submit = _InlineFuture
+
+        while True:
+            # Backpressure: look up the next chunk only when there is room for it
+            while after_id is not None and len(in_flight) < max_in_flight:
+                last_id = _next_chunk(conn, after_id, chunk_size)
+                if last_id is None:
+                    after_id = None
+                    break
+                in_flight[submit(process_chunk, run_id, after_id, last_id)] = (next_sequence, last_id)
+                next_sequence += 1
+                after_id = last_id
+            if not in_flight:
+                break
+
+            waited = time.perf_counter()
+            done = wait(in_flight, return_when=FIRST_COMPLETED).done if executor else list(in_flight)
+            report['wait_seconds'] += time.perf_counter() - waited
+            for future in done:
+                sequence, last_id = in_flight.pop(future)
+                students, read, compute, write = future.result()
+                report['students'] += students
+                report['chunks'] += 1
+                report['read_seconds'] += read
+                report['compute_seconds'] += compute
+                report['write_seconds'] += write
+                finished[sequence] = (last_id, students)
+
+            # Move the checkpoint past every chunk written without a gap before it
+            students = 0
+            while checkpointed in finished:
+                checkpoint, chunk_students = finished.pop(checkpointed)
+                students += chunk_students
+                checkpointed += 1
+            if students:
+                conn.execute(
+                    "UPDATE pipeline_runs SET checkpoint = ?, students = students + ? WHERE id = ?",
+                    (checkpoint, students, run_id)
+                )
+
+            if progress and time.perf_counter() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.perf_counter()
+                progress(_summary(report, started))
+
+        conn.execute(
+            "UPDATE pipeline_runs SET status = 'completed', finished_at = ? WHERE id = ?",
+            (datetime.now().isoformat(), run_id)
+        )
+    except BaseException:
+        # Drop anything half done, then make sure the failure itself is stored
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute("UPDATE pipeline_runs SET status = 'failed' WHERE id = ?", (run_id,))
+        conn.commit()
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        # Missing when the inline worker failed to initialize
+        worker_conn = _worker.pop('conn', None)
+        if worker_conn is not None:
+            worker_conn.close()
+        conn.close()
+
+    if snapshot_dir:
+        from skill_analyzer import SkillAnalyzer
+
+        published = time.perf_counter()
+        analyzer = SkillAnalyzer(model_path, catalog_path, course_catalog_path)
+        report['snapshot'] = cohort_snapshot.publish(db_path, snapshot_dir, run_id, analyzer)
+        report['snapshot_seconds'] = time.perf_counter() - published
+    return _summary(report, started)
+
+
+def _summary(report: Dict, started: float) -> Dict:
+    """The report so far plus elapsed time, throughput and ETA"""
+    elapsed = time.perf_counter() - started
+    rate = report['students'] / elapsed if elapsed else 0.0
+    return dict(
+        report,
+        seconds=elapsed,
+        students_per_second=rate,
+        eta_seconds=(report['total'] - report['students']) / rate if rate else None,
+    )
+
+
+def format_progress(report: Dict) -> str:
+    eta = f", ETA {report['eta_seconds']:.0f}s" if report.get('eta_seconds') else ''
+    return (f"run {report['run_id']}: {report['students']}/{report['total']} students in {report['seconds']:.1f}s "
+            f"({report['students_per_second']:,.0f}/s{eta})")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compute skill gaps, recommendations and questions for every student")
+    parser.add_argument("--db", default=database.DB_NAME)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--max-in-flight", type=int, help=f"default: {IN_FLIGHT_PER_WORKER} chunks per worker")
+    parser.add_argument("--fresh", action="store_true", help="start a new run even if the last one did not finish")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--snapshot-dir", default=cohort_snapshot.SNAPSHOT_DIR,
+                        help="publish a cohort snapshot here after the run")
+    args = parser.parse_args(argv)
+
+    report = run_pipeline(
+        args.db, args.workers, args.chunk_size, args.max_in_flight, resume=not args.fresh, model_path=args.model,
+        snapshot_dir=args.snapshot_dir, progress=lambda partial: print(format_progress(partial), file=sys.stderr),
+    )
+    print(format_progress(report))
+    if report['resumed_from']:
+        print(f"  resumed after user_id {report['resumed_from']}")
+    busy = report['read_seconds'] + report['compute_seconds'] + report['write_seconds']
+    if busy:
+        print(f"  worker time: read {report['read_seconds'] / busy:.0%}, compute {report['compute_seconds'] / busy:.0%}, "
+              f"write {report['write_seconds'] / busy:.0%} of {busy:.1f}s across {report['workers']} worker(s)")
+    print(f"  {report['chunks']} chunks of up to {report['chunk_size']} students")
+    if report.get('snapshot'):
+        print(f"  snapshot {report['snapshot']} published in {report['snapshot_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from mock_interview_engine import EvaluatorBackend
+
+REFERENCE_ANSWERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'reference_answers.json')
+
+# Answers shorter than this many tokens have their score scaled down
+MIN_ANSWER_TOKENS = 20
+
+# Cosine similarity to the reference that counts as a full-marks match
+TARGET_SIMILARITY = 0.6
+
+# Share of the score from similarity; the rest comes from keyword coverage
+SIMILARITY_WEIGHT = 0.5
+
+# Rows vectorized at once in score_batch
+SCORE_CHUNK = 4096
+
+# Questions outside the bank whose reference rows are kept (see OfflineEvaluator._unseen)
+SIDE_INDEX_SIZE = 1024
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+# English function words only: "explain" and "describe" read like filler in
+# questions but are SQL statements that answers are expected to name
+_STOPWORDS = frozenset("""
+a about an and are as at be but by can do does for from has have how
+i if in into is it its me of on or so such tell that the their then there these they
+this to was we what when where which while why will with would you your
+""".split())
+
+
+def _stem(token: str) -> str:
+    """Crude suffix stripping so 'generalize' and 'generalizes' meet"""
+    for suffix, replacement in (('ing', ''), ('ies', 'i'), ('es', ''), ('ed', ''), ('ly', ''), ('s', '')):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            token = token[:-len(suffix)] + replacement
+            break
+    if len(token) > 4 and token.endswith('e'):
+        token = token[:-1]
+    if len(token) > 3 and token.endswith('y'):
+        token = token[:-1] + 'i'
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _words(text)]
+
+
+def _words(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.casefold()) if t not in _STOPWORDS]
+
+
+class OfflineEvaluator(EvaluatorBackend):
+    """Deterministic, CPU-only answer scorer for air-gapped deployments
+
+    Every question in the bank gets a reference document (question text plus
+    the reference answer from data/reference_answers.json, when there is
+    one) and a keyword set. An answer is scored on its TF-IDF cosine
+    similarity to the reference and on how many keywords it covers, scaled
+    down for very short answers. score_batch scores many answers with one
+    matrix operation per chunk.
+    """
+
+    def __init__(self, question_bank: Optional[Dict[str, List[str]]] = None, references_path: str = REFERENCE_ANSWERS_PATH):
+        references = {}
+        if references_path and os.path.exists(references_path):
+            with open(references_path, encoding='utf-8') as f:
+                references = json.load(f)
+
+        questions = list(references)
+        for bank_questions in (question_bank or {}).values():
+            questions.extend(q for q in bank_questions if q not in references)
+        questions = list(dict.fromkeys(questions))
+
+        docs = [
+            tokenize(' '.join([q, references.get(q, {}).get('answer', '')] + references.get(q, {}).get('keywords', [])))
+            for q in questions
+        ]
+        self.vocab = {}
+        for doc in docs:
+            for token in doc:
+                self.vocab.setdefault(token, len(self.vocab))
+
+        # Smoothed IDF over the reference documents
+        df = np.zeros(len(self.vocab))
+        for doc in docs:
+            df[[self.vocab[t] for t in set(doc)]] += 1
+        self.idf = np.log((1 + len(docs)) / (1 + df)) + 1
+        # Terms first seen in a question outside the bank count as the rarest
+        self.unseen_idf = self.idf.max(initial=1.0)
+        self.side_index = {}
+
+        self.question_rows = {q: row for row, q in enumerate(questions)}
+        self.reference_matrix = self._tfidf([self._term_ids(doc) for doc in docs])
+        self.keywords = []
+        self.keyword_matrix = np.zeros((len(questions), len(self.vocab)), dtype=bool)
+        for row, (question, doc) in enumerate(zip(questions, docs)):
+            keywords = references.get(question, {}).get('keywords') or self._top_terms(doc)
+            # (stemmed term, keyword as written for feedback)
+            terms = [(_stem(k.casefold()), k) for k in keywords]
+            terms = [(term, k) for term, k in terms if term in self.vocab]
+            self.keywords.append(terms)
+            self.keyword_matrix[row, [self.vocab[term] for term, _ in terms]] = True
+
+    def _term_ids(self, tokens: Iterable[str], extra: Optional[Dict[str, int]] = None) -> List[int]:
+        vocab = self.vocab
+        if not extra:
+            return [vocab[t] for t in tokens if t in vocab]
+        return [vocab[t] if t in vocab else extra[t] for t in tokens if t in vocab or t in extra]
+
+    def _top_terms(self, tokens: List[str], count: int = 6, extra: Optional[Dict[str, int]] = None,
+                   idf: Optional[np.ndarray] = None) -> List[str]:
+        """Highest-IDF terms of a document, used when no keywords are given"""
+        idf = self.idf if idf is None else idf
+        unique = list(dict.fromkeys(tokens))
+        unique.sort(key=lambda t: -idf[self._term_ids([t], extra)[0]])
+        return unique[:count]
+
+    def _counts(self, term_ids: List[List[int]], width: Optional[int] = None) -> np.ndarray:
+        counts = np.zeros((len(term_ids), width or len(self.vocab)))
+        rows = np.repeat(np.arange(len(term_ids)), [len(ids) for ids in term_ids])
+        cols = np.fromiter((i for ids in term_ids for i in ids), dtype=np.intp, count=len(rows))
+        np.add.at(counts, (rows, cols), 1)
+        return counts
+
+    def _tfidf(self, term_ids: List[List[int]], counts: Optional[np.ndarray] = None,
+               idf: Optional[np.ndarray] = None) -> np.ndarray:
+        idf = self.idf if idf is None else idf
+        if counts is None:
+            counts = self._counts(term_ids, len(idf))
+        # Sublinear term frequency, then L2-normalized rows
+        weights = np.log1p(counts, out=np.zeros_like(counts), where=counts > 0) * idf
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        return np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+
+    def _unseen(self, question: str) -> Tuple[Dict[str, int], np.ndarray, np.ndarray, np.ndarray, List]:
+        """(extra terms, IDF, reference row, keyword row, keywords) for a question outside the bank
+
+        Its own text is the only reference we have. Terms missing from the
+        vocabulary get columns of their own after it, with self.unseen_idf
+        standing in for their IDF, for this question alone: the shared
+        vocabulary, IDF and matrices never change after __init__, so an
+        answer scores the same whatever was scored before it. Entries are
+        kept in a side index of up to SIDE_INDEX_SIZE questions.
+        """
+        entry = self.side_index.get(question)
+        if entry is not None:
+            return entry
+
+        tokens = tokenize(question)
+        new_terms = [t for t in dict.fromkeys(tokens) if t not in self.vocab]
+        extra = {term: len(self.vocab) + i for i, term in enumerate(new_terms)}
+        idf = np.concatenate([self.idf, np.full(len(new_terms), self.unseen_idf)])
+        reference = self._tfidf([self._term_ids(tokens, extra)], idf=idf)
+        surface = {}
+        for word in _words(question):
+            surface.setdefault(_stem(word), word)
+        terms = [(t, surface[t]) for t in self._top_terms(tokens, extra=extra, idf=idf)]
+        keyword_row = np.zeros((1, len(idf)), dtype=bool)
+        keyword_row[0, self._term_ids([t for t, _ in terms], extra)] = True
+
+        entry = (extra, idf, reference, keyword_row, terms)
+        if len(self.side_index) >= SIDE_INDEX_SIZE:
+            self.side_index.pop(next(iter(self.side_index)), None)
+        self.side_index[question] = entry
+        return entry
+
+    async def evaluate(self, question: str, answer: str) -> Dict:
+        return self.score_batch([(question, answer)])[0]
+
+    def score_batch(self, pairs: List[Tuple[str, str]]) -> List[Dict]:
+        """Score many (question, answer) pairs at once"""
+        evaluations = []
+        for start in range(0, len(pairs), SCORE_CHUNK):
+            evaluations.extend(self._score_chunk(pairs[start:start + SCORE_CHUNK]))
+        return evaluations
+
+    def _score_chunk(self, pairs: List[Tuple[str, str]]) -> List[Dict]:
+        tokens = [tokenize(a) for _, a in pairs]
+        # None collects the bank's questions; each unseen question is scored in its own space
+        groups = {}
+        for i, (question, _) in enumerate(pairs):
+            groups.setdefault(None if question in self.question_rows else question, []).append(i)
+
+        evaluations = [None] * len(pairs)
+        for question, members in groups.items():
+            if question is None:
+                rows = [self.question_rows[pairs[i][0]] for i in members]
+                scored = self._score([tokens[i] for i in members], self.reference_matrix[rows],
+                                     self.keyword_matrix[rows], [self.keywords[row] for row in rows])
+            else:
+                extra, idf, reference, keyword_row, terms = self._unseen(question)
+                count = len(members)
+                scored = self._score([tokens[i] for i in members], np.repeat(reference, count, axis=0),
+                                     np.repeat(keyword_row, count, axis=0), [terms] * count, extra, idf)
+            for i, evaluation in zip(members, scored):
+                evaluations[i] = evaluation
+        return evaluations
+
+    def _score(self, tokens: List[List[str]], references: np.ndarray, expected: np.ndarray, keywords: List[List],
+               extra: Optional[Dict[str, int]] = None, idf: Optional[np.ndarray] = None) -> List[Dict]:
+        """Evaluations for answers (as tokens) against their questions' reference and keyword rows"""
+        idf = self.idf if idf is None else idf
+        counts = self._counts([self._term_ids(t, extra) for t in tokens], len(idf))
+        answers = self._tfidf(None, counts, idf)
+
+        similarity = np.einsum('ij,ij->i', answers, references)
+        covered = expected & (counts > 0)
+        n_expected = expected.sum(axis=1)
+        similarity_score = np.minimum(1.0, similarity / TARGET_SIMILARITY)
+        # Questions without keywords are judged on similarity alone
+        coverage = np.divide(covered.sum(axis=1), n_expected,
+                             out=similarity_score.copy(), where=n_expected > 0)
+        length = np.minimum(1.0, np.array([len(t) for t in tokens]) / MIN_ANSWER_TOKENS)
+
+        scores = np.rint(100 * length * (SIMILARITY_WEIGHT * similarity_score
+                                         + (1 - SIMILARITY_WEIGHT) * coverage)).astype(int)
+
+        evaluations = []
+        for i, terms in enumerate(keywords):
+            columns = self._term_ids([t for t, _ in terms], extra)
+            hit = [k for (_, k), column in zip(terms, columns) if covered[i, column]]
+            missed = [k for (_, k), column in zip(terms, columns) if not covered[i, column]]
+            evaluations.append(self._evaluation(int(scores[i]), hit, missed, length[i] < 1))
+        return evaluations
+
+    def _evaluation(self, score: int, hit: List[str], missed: List[str], short: bool) -> Dict:
+        if score >= 75:
+            feedback = 'Strong answer that covers the key concepts.'
+        elif score >= 50:
+            feedback = 'Answer shows basic understanding but could be more detailed.'
+        else:
+            feedback = 'Answer misses several key concepts for this question.'
+
+        improvements = []
+        if missed:
+            improvements.append(f"Cover these concepts: {', '.join(missed[:3])}")
+        if short:
+            improvements.append('Expand your answer with explanation and examples')
+
+        return {
+            'score': score,
+            'feedback': feedback,
+            'strengths': [f"Mentions {', '.join(hit)}"] if hit else [],
+            'improvements': improvements,
+            'evaluator': 'offline',
+        }
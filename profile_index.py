@@ -0,0 +1,101 @@
+import numpy as np
+
+# Catalogs up to this many profiles are searched by brute force; larger
+# ones go to a KD-tree
+BRUTE_FORCE_MAX = 1024
+
+# Upper bound on query x profile distance cells held in memory at once
+CHUNK_CELLS = 1 << 20
+
+# Neighbour counts up to this are selected with repeated argmin
+SMALL_K = 4
+
+
+class ProfileIndex:
+    """Standardize skill vectors and find the nearest reference profiles
+
+    Drop-in replacement for sklearn's StandardScaler + NearestNeighbors
+    (euclidean) pair. Small reference sets are searched with NumPy
+    broadcasting; large ones use a KD-tree behind the same API.
+    """
+
+    def __init__(self, n_neighbors=2, backend='auto'):
+        if backend not in ('auto', 'brute', 'kd_tree'):
+            raise ValueError(f"Unknown backend: {backend}")
+        self.n_neighbors = n_neighbors
+        self.backend = backend
+        self.tree = None
+
+    def fit(self, profiles):
+        """Learn scaling parameters from the profiles and index them"""
+        profiles = np.asarray(profiles, dtype=float)
+        mean = profiles.mean(axis=0)
+        scale = profiles.std(axis=0)
+        # Constant columns are left unscaled, as StandardScaler does
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+        return self.load(profiles, mean, scale)
+
+    def load(self, profiles, mean, scale):
+        """Index profiles using previously learned scaling parameters"""
+        self.profiles = np.asarray(profiles, dtype=float)
+        self.mean_ = np.asarray(mean, dtype=float)
+        self.scale_ = np.asarray(scale, dtype=float)
+        self.scaled_profiles = self.transform(self.profiles)
+        self.profile_norms = np.einsum('ij,ij->i', self.scaled_profiles, self.scaled_profiles)
+
+        self.tree = None
+        if self.backend == 'kd_tree' or (self.backend == 'auto' and len(self.profiles) > BRUTE_FORCE_MAX):
+            from sklearn.neighbors import KDTree
+            self.tree = KDTree(self.scaled_profiles)
+        return self
+
+    def subset(self, rows):
+        """Index only the given profile rows, keeping this index's scaling"""
+        return ProfileIndex(self.n_neighbors, self.backend).load(self.profiles[rows], self.mean_, self.scale_)
+
+    def transform(self, X):
+        """Standardize vectors with the fitted mean and scale"""
+        scaled = np.subtract(X, self.mean_, dtype=float)
+        scaled /= self.scale_
+        return scaled
+
+    def kneighbors(self, X, n_neighbors=None):
+        """Return (distances, indices) of the nearest profiles to each scaled row of X"""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        k = min(n_neighbors or self.n_neighbors, len(self.scaled_profiles))
+
+        if self.tree is not None:
+            return self.tree.query(X, k=k)
+
+        distances = np.empty((len(X), k))
+        indices = np.empty((len(X), k), dtype=np.intp)
+        step = max(1, CHUNK_CELLS // len(self.scaled_profiles))
+        rows = np.arange(min(step, len(X)))[:, None]
+
+        for start in range(0, len(X), step):
+            chunk = X[start:start + step]
+            # ||x - p||^2 = ||x||^2 - 2 x.p + ||p||^2, one matrix product per chunk
+            sq = chunk @ self.scaled_profiles.T
+            sq *= -2
+            sq += np.einsum('ij,ij->i', chunk, chunk)[:, None]
+            sq += self.profile_norms
+            np.maximum(sq, 0, out=sq)
+
+            r = rows[:len(chunk)]
+            if k <= SMALL_K:
+                # A few argmin passes beat a partition for the usual k=1..2;
+                # argmin also resolves ties to the lowest profile index
+                order = np.empty((len(chunk), k), dtype=np.intp)
+                masked = sq.copy() if k > 1 else sq
+                for j in range(k):
+                    order[:, j] = masked.argmin(axis=1)
+                    if j < k - 1:
+                        masked[r[:, 0], order[:, j]] = np.inf
+            else:
+                part = np.argpartition(sq, k - 1, axis=1)[:, :k]
+                order = part[r, np.argsort(sq[r, part], axis=1, kind='stable')]
+
+            indices[start:start + len(chunk)] = order
+            distances[start:start + len(chunk)] = np.sqrt(sq[r, order])
+
+        return distances, indices
@@ -0,0 +1,30 @@
+import database
+from cohort_analytics import refresh_students
+
+# Columns a caller may set through save_student_profile
+STUDENT_PROFILE_FIELDS = ('university', 'batch', 'cgpa', 'department', 'phone', 'target_role')
+
+
+def save_student_profile(user_id, **fields):
+    """Create or update a student's profile and recount their cohort aggregates"""
+    unknown = set(fields) - set(STUDENT_PROFILE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+
+    columns = list(fields)
+    with database.transaction() as conn:
+        conn.execute("INSERT OR IGNORE INTO student_profiles (user_id) VALUES (?)", (user_id,))
+        if columns:
+            conn.execute(
+                f"UPDATE student_profiles SET {', '.join(f'{c} = ?' for c in columns)} WHERE user_id = ?",
+                [fields[c] for c in columns] + [user_id]
+            )
+        refresh_students(conn, [user_id])
+
+
+def get_student_profile(user_id):
+    with database.connection() as conn:
+        row = conn.execute(
+            f"SELECT {', '.join(STUDENT_PROFILE_FIELDS)} FROM student_profiles WHERE user_id = ?", (user_id,)
+        ).fetchone()
+    return dict(zip(STUDENT_PROFILE_FIELDS, row)) if row else None
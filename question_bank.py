@@ -0,0 +1,131 @@
+import csv
+import json
+import os
+import random
+from itertools import accumulate
+from typing import Collection, Dict, Iterable, List, Optional
+
+QUESTION_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'question_bank.json')
+
+# Random probes for an unused question before listing the skill's unused questions
+PROBE_ATTEMPTS = 8
+
+
+class QuestionBank:
+    """Interview questions indexed by skill, with weighted sampling without replacement
+
+    Questions get integer ids in load order; by_skill holds the ids of each
+    skill's questions and question_skill the skill of each id, so a draw
+    never scans the whole bank. Duplicate question texts are kept once.
+    """
+
+    def __init__(self, questions: Dict[str, Iterable[str]]):
+        self.skills = []
+        self.texts = []
+        self.ids = {}  # question text -> id
+        self.skill_rows = {}  # case-folded skill name -> skill index
+        self.by_skill = []
+        self.question_skill = []
+
+        for skill, texts in questions.items():
+            self.add(skill, texts)
+
+    def add(self, skill: str, texts: Iterable[str]) -> None:
+        key = skill.strip().casefold()
+        row = self.skill_rows.get(key)
+        if row is None:
+            row = self.skill_rows[key] = len(self.skills)
+            self.skills.append(skill.strip())
+            self.by_skill.append([])
+        for text in texts:
+            text = text.strip()
+            if not text or text in self.ids:
+                continue
+            self.ids[text] = len(self.texts)
+            self.texts.append(text)
+            self.by_skill[row].append(self.ids[text])
+            self.question_skill.append(row)
+
+    @classmethod
+    def load(cls, path: str = QUESTION_BANK_PATH) -> 'QuestionBank':
+        """Read a JSON ({skill: [question, ...]}), JSON Lines or CSV (skill, question) file"""
+        bank = cls({})
+        if path.endswith('.csv'):
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    bank.add(row['skill'], [row['question']])
+        elif path.endswith('.jsonl'):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        bank.add(entry['skill'], [entry['question']])
+        else:
+            with open(path, encoding='utf-8') as f:
+                for skill, texts in json.load(f).items():
+                    bank.add(skill, texts)
+        return bank
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        return {skill: [self.texts[i] for i in ids] for skill, ids in zip(self.skills, self.by_skill)}
+
+    def skill_weights(self, weights: Dict[str, float], default: float) -> List[float]:
+        """Per-skill weight list, `default` for skills not named in `weights`"""
+        row_weights = [default] * len(self.skills)
+        for skill, weight in weights.items():
+            row = self.skill_rows.get(skill.strip().casefold())
+            if row is not None:
+                row_weights[row] = max(weight, 0.0)
+        return row_weights
+
+    def sample(
+        self,
+        weights: Dict[str, float],
+        k: int,
+        exclude: Collection[int] = (),
+        default_weight: float = 1.0,
+        rng: Optional[random.Random] = None,
+    ) -> List[int]:
+        """Draw up to k distinct question ids, skipping ids in `exclude`
+
+        Each draw picks a skill with probability proportional to its weight
+        times its number of unused questions, then a uniform unused question
+        of that skill, which is the same as drawing questions weighted by
+        their skill's weight. Every draw uses up one question, so this
+        returns after at most k draws, with fewer than k ids only when the
+        bank has run out.
+        """
+        rng = rng or random
+        exclude = exclude if isinstance(exclude, (set, frozenset)) else set(exclude)
+        row_weights = self.skill_weights(weights, default_weight)
+        remaining = [len(ids) for ids in self.by_skill]
+        for qid in exclude:
+            remaining[self.question_skill[qid]] -= 1
+
+        picked = []
+        taken = set()
+        while len(picked) < k:
+            mass = [w * n for w, n in zip(row_weights, remaining)]
+            if not any(mass):
+                # Only zero-weight skills are left: fall back to uniform
+                mass = remaining
+                if not any(mass):
+                    break
+            row = rng.choices(range(len(mass)), cum_weights=list(accumulate(mass)))[0]
+            qid = self._draw(row, exclude, taken, rng)
+            picked.append(qid)
+            taken.add(qid)
+            remaining[row] -= 1
+        return picked
+
+    def _draw(self, row: int, exclude: Collection[int], taken: Collection[int], rng) -> int:
+        ids = self.by_skill[row]
+        for _ in range(PROBE_ATTEMPTS):
+            qid = ids[rng.randrange(len(ids))]
+            if qid not in taken and qid not in exclude:
+                return qid
+        # Most of this skill is used up; list what is left
+        return rng.choice([qid for qid in ids if qid not in taken and qid not in exclude])
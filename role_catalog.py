@@ -0,0 +1,81 @@
+import csv
+import hashlib
+import json
+import os
+
+import numpy as np
+
+ROLE_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'role_catalog.json')
+
+
+class RoleCatalog:
+    """Industry skill profiles for every (company, role) pair we benchmark against
+
+    Loaded from a JSON file ({"version", "skills", "roles": [{"company",
+    "role", "levels"}]}) or a CSV file with company, role and one column per
+    skill. Profile vectors are reordered to match the analyzer's skill
+    dimensions.
+    """
+
+    def __init__(self, skills, companies, roles, vectors, version=1):
+        self.skills = list(skills)
+        self.companies = list(companies)
+        self.roles = list(roles)
+        self.vectors = np.asarray(vectors, dtype=float).reshape(len(self.roles), len(self.skills))
+        self.version = version
+
+        # Row numbers per lower-cased role title, for target_role filtering
+        self.role_rows = {}
+        for row, role in enumerate(self.roles):
+            self.role_rows.setdefault(role.strip().lower(), []).append(row)
+        self.role_rows = {role: np.array(rows) for role, rows in self.role_rows.items()}
+
+        digest = hashlib.sha256(json.dumps(
+            [self.version, self.skills, self.companies, self.roles, self.vectors.tolist()]
+        ).encode('utf-8'))
+        self.fingerprint = digest.hexdigest()
+
+    @classmethod
+    def load(cls, path=ROLE_CATALOG_PATH, skills=None):
+        """Read a catalog file, aligning its columns to `skills` when given"""
+        if path.endswith('.csv'):
+            with open(path, newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                file_skills = [name for name in reader.fieldnames if name not in ('company', 'role')]
+                entries = [
+                    {'company': row['company'], 'role': row['role'],
+                     'levels': [float(row[name]) for name in file_skills]}
+                    for row in reader
+                ]
+            version = 1
+        else:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            file_skills = data['skills']
+            entries = data['roles']
+            version = data.get('version', 1)
+
+        vectors = np.array([entry['levels'] for entry in entries], dtype=float).reshape(len(entries), len(file_skills))
+        if skills is not None:
+            missing = [name for name in skills if name not in file_skills]
+            if missing:
+                raise ValueError(f"Role catalog {path} has no levels for: {', '.join(missing)}")
+            vectors = vectors[:, [file_skills.index(name) for name in skills]]
+            file_skills = skills
+
+        return cls(
+            file_skills,
+            [entry.get('company', '') for entry in entries],
+            [entry['role'] for entry in entries],
+            vectors,
+            version,
+        )
+
+    def __len__(self):
+        return len(self.roles)
+
+    def rows_for_role(self, target_role):
+        """Catalog rows whose role matches target_role, or None for every row"""
+        if not target_role:
+            return None
+        return self.role_rows.get(target_role.strip().lower())
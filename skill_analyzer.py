@@ -1,93 +1,120 @@
 import numpy as np
+import hashlib
 import json
-from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import NearestNeighbors
-import pickle
 import os
+import threading
+
+from course_catalog import COURSE_CATALOG_PATH, CourseCatalog, proficiency_levels
+from instrumentation import timed
+from profile_index import ProfileIndex
+from role_catalog import ROLE_CATALOG_PATH, RoleCatalog
+from skill_normalizer import SkillNormalizer
+
+MODEL_PATH = 'skill_model.npz'
+
+# Map skill names to standardized indices; matching is case/whitespace
+# insensitive and tolerates typos (see skill_normalizer.py)
+SKILL_MAPPING = {
+    'Python': 0, 'Python Programming': 0, 'Python 3': 0, 'Py': 0,
+    'Machine Learning': 1, 'ML': 1, 'Scikit-Learn': 1, 'sklearn': 1,
+    'SQL': 2, 'Database': 2, 'Databases': 2, 'MySQL': 2, 'PostgreSQL': 2, 'DBMS': 2,
+    'Statistics': 3, 'Probability': 3, 'Stats': 3, 'Statistical Analysis': 3,
+    'Deep Learning': 4, 'Neural Networks': 4, 'DL': 4, 'TensorFlow': 4, 'PyTorch': 4,
+    'Cloud Computing': 5, 'AWS': 5, 'Azure': 5, 'GCP': 5, 'Google Cloud': 5, 'Cloud': 5,
+    'Communication': 6, 'Soft Skills': 6, 'Communication Skills': 6, 'Presentation': 6
+}
+# Canonical name reported for each skill dimension
+SKILL_LABELS = ['Python', 'Machine Learning', 'SQL', 'Statistics',
+                'Deep Learning', 'Cloud Computing', 'Communication']
+NUM_SKILLS = len(SKILL_LABELS)
+# Course recommendations per student, one for each of the largest gaps
+RECOMMENDED_GAPS = 3
+
+# Compiled once per process and shared by every analyzer
+SKILL_NORMALIZER = SkillNormalizer(SKILL_MAPPING, SKILL_LABELS)
 
 class SkillAnalyzer:
-    def __init__(self):
-        self.model_path = 'skill_model.pkl'
-        self.scaler_path = 'skill_scaler.pkl'
+    def __init__(self, model_path=MODEL_PATH, catalog_path=ROLE_CATALOG_PATH, course_catalog_path=COURSE_CATALOG_PATH):
+        self.model_path = model_path
+        self.catalog_path = catalog_path
+        self.catalog = RoleCatalog.load(catalog_path, SKILL_LABELS)
+        self.courses = CourseCatalog.load(course_catalog_path, SKILL_LABELS)
+        self.role_indexes = {}
         self.load_or_train_model()
+        
+        # Changes with the role catalog or the fitted model; cohort_analytics keys its counts on it
+        digest = hashlib.sha256(self.catalog.fingerprint.encode('utf-8'))
+        for array in (self.model.profiles, self.model.mean_, self.model.scale_):
+            digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+        self.fingerprint = digest.hexdigest()
     
     def load_or_train_model(self):
-        """Load or train ML model for skill gap analysis"""
-        if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
-            with open(self.scaler_path, 'rb') as f:
-                self.scaler = pickle.load(f)
-        else:
-            self.train_default_model()
+        """Load the precomputed index, rebuilding it if the role catalog changed"""
+        if os.path.exists(self.model_path):
+            with np.load(self.model_path) as data:
+                if str(data['catalog_fingerprint']) == self.catalog.fingerprint:
+                    self.model = ProfileIndex(n_neighbors=2).load(data['profiles'], data['mean'], data['scale'])
+                    return
+        self.train_default_model()
     
     def train_default_model(self):
         """Train default model with industry data"""
-        # Sample industry data for Data Science roles
-        industry_data = [
-            # [Python, ML, SQL, Statistics, DeepLearning, Cloud, Communication]
-            [90, 85, 85, 90, 80, 70, 85],  # Google Data Scientist
-            [85, 90, 80, 85, 85, 75, 80],  # Amazon ML Engineer
-            [80, 75, 90, 80, 70, 65, 90],  # Microsoft Data Analyst
-            [95, 80, 75, 85, 90, 85, 75],  # Netflix Research Scientist
-        ]
+        self.model = ProfileIndex(n_neighbors=2).fit(self.catalog.vectors)
         
-        X = np.array(industry_data)
-        self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
+        # Save profiles and scaler parameters; write-then-rename so readers
+        # in other processes never see a half-written file
+        tmp_path = f"{self.model_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                profiles=self.model.profiles,
+                mean=self.model.mean_,
+                scale=self.model.scale_,
+                catalog_fingerprint=self.catalog.fingerprint,
+            )
+        os.replace(tmp_path, self.model_path)
+    
+    def role_index(self, target_role):
+        """Return (index, catalog rows) for the profiles matching target_role
         
-        self.model = NearestNeighbors(n_neighbors=2, metric='euclidean')
-        self.model.fit(X_scaled)
+        Falls back to the whole catalog when no profile has that role.
+        Per-role indexes share the global scaling and are built once.
+        """
+        rows = self.catalog.rows_for_role(target_role)
+        if rows is None:
+            return self.model, np.arange(len(self.catalog))
         
-        # Save model
-        with open(self.model_path, 'wb') as f:
-            pickle.dump(self.model, f)
-        with open(self.scaler_path, 'wb') as f:
-            pickle.dump(self.scaler, f)
+        key = target_role.strip().lower()
+        if key not in self.role_indexes:
+            self.role_indexes[key] = self.model.subset(rows)
+        return self.role_indexes[key], rows
     
+    @timed('analyzer.analyze_skill_gaps')
     def analyze_skill_gaps(self, student_skills, target_role='Data Scientist'):
         """Analyze skill gaps using ML"""
-        # Map skill names to standardized indices
-        skill_mapping = {
-            'Python': 0, 'Python Programming': 0,
-            'Machine Learning': 1, 'ML': 1,
-            'SQL': 2, 'Database': 2,
-            'Statistics': 3, 'Probability': 3,
-            'Deep Learning': 4, 'Neural Networks': 4,
-            'Cloud Computing': 5, 'AWS': 5, 'Azure': 5,
-            'Communication': 6, 'Soft Skills': 6
-        }
-        
         # Prepare student vector (initialize with zeros)
-        student_vector = np.zeros(len(skill_mapping))
+        student_vector = np.zeros(NUM_SKILLS)
         
         for skill in student_skills:
-            skill_name = skill['skill_name']
-            if skill_name in skill_mapping:
-                idx = skill_mapping[skill_name]
+            idx = SKILL_NORMALIZER.index(skill['skill_name'])
+            if idx is not None:
                 student_vector[idx] = skill['proficiency']
         
         # Scale student vector
-        student_scaled = self.scaler.transform([student_vector])
-        
-        # Find nearest industry standard
-        distances, indices = self.model.kneighbors(student_scaled)
+        index, rows = self.role_index(target_role)
+        student_scaled = index.transform([student_vector])
         
-        # Get industry standard vector
-        industry_vectors = [
-            [90, 85, 85, 90, 80, 70, 85],  # Data Scientist
-            [85, 90, 80, 85, 85, 75, 80],  # ML Engineer
-            [80, 75, 90, 80, 70, 65, 90],  # Data Analyst
-        ]
+        # Find nearest industry standard for the target role
+        distances, indices = index.kneighbors(student_scaled)
         
-        closest_standard = industry_vectors[indices[0][0]]
+        closest_standard = self.catalog.vectors[rows[indices[0][0]]]
         
         # Calculate gaps
         skill_gaps = []
         for i, (student_val, industry_val) in enumerate(zip(student_vector, closest_standard)):
             if student_val < industry_val:
                 skill_gaps.append({
-                    'skill': list(skill_mapping.keys())[i],
+                    'skill': SKILL_LABELS[i],
                     'student_level': int(student_val),
                     'industry_standard': int(industry_val),
                     'gap': int(industry_val - student_val),
@@ -96,43 +123,200 @@ class SkillAnalyzer:
         
         return sorted(skill_gaps, key=lambda x: x['gap'], reverse=True)
     
-    def generate_recommendations(self, skill_gaps, student_level='intermediate'):
-        """Generate personalized recommendations based on skill gaps"""
-        recommendations = []
-        
-        course_resources = {
-            'Python': [
-                {'name': 'Python for Data Science', 'url': 'https://coursera.org/python-data-science', 'level': 'beginner'},
-                {'name': 'Advanced Python Programming', 'url': 'https://udemy.com/advanced-python', 'level': 'advanced'}
-            ],
-            'Machine Learning': [
-                {'name': 'Machine Learning Specialization', 'url': 'https://coursera.org/ml-specialization', 'level': 'intermediate'},
-                {'name': 'Hands-On ML with Scikit-Learn', 'url': 'https://amazon.com/hands-on-ml', 'level': 'intermediate'}
-            ],
-            'SQL': [
-                {'name': 'SQL for Data Analysis', 'url': 'https://datacamp.com/sql-data-analysis', 'level': 'beginner'},
-                {'name': 'Advanced SQL Queries', 'url': 'https://udemy.com/advanced-sql', 'level': 'advanced'}
-            ]
-        }
-        
-        for gap in skill_gaps[:3]:  # Top 3 gaps
-            skill = gap['skill']
-            if skill in course_resources:
-                # Find appropriate course based on student level
-                for course in course_resources[skill]:
-                    if course['level'] == student_level:
-                        recommendations.append({
-                            'type': 'course_recommendation',
-                            'skill': skill,
-                            'gap': gap['gap'],
-                            'recommendation': f"Take '{course['name']}' to improve {skill}",
-                            'resource_url': course['url'],
-                            'priority': gap['priority']
-                        })
-                        break
+    def build_skill_matrix(self, students):
+        """Stack every student's skills into one (students x skills) matrix"""
+        matrix = np.zeros((len(students), NUM_SKILLS))
+        
+        for row, student_skills in enumerate(students):
+            for skill in student_skills:
+                idx = SKILL_NORMALIZER.index(skill['skill_name'])
+                if idx is not None:
+                    matrix[row, idx] = skill['proficiency']
+        
+        return matrix
+    
+    def analyze_cohort(self, students, target_role='Data Scientist'):
+        """Analyze skill gaps for a whole cohort in one vectorized pass
+        
+        target_role is either one role for the whole cohort or a list with
+        one role per student. Returns one gap list per student, identical
+        to calling analyze_skill_gaps on each student in turn.
+        """
+        if not students:
+            return []
+        
+        return self.analyze_matrix(self.build_skill_matrix(students), target_role)
+    
+    def nearest_standards(self, matrix, target_role='Data Scientist'):
+        """Industry standard vector closest to each student's row, per target role"""
+        # Scale each role group and find its nearest standards in one query
+        if isinstance(target_role, str) or target_role is None:
+            roles = np.full(len(matrix), target_role, dtype=object)
+        else:
+            roles = np.array(target_role, dtype=object)
+        
+        standards = np.empty((len(matrix), NUM_SKILLS))
+        for role in set(roles.tolist()):
+            members = roles == role
+            index, rows = self.role_index(role)
+            distances, indices = index.kneighbors(index.transform(matrix[members]))
+            standards[members] = self.catalog.vectors[rows[indices[:, 0]]]
+        
+        return standards
+    
+    def readiness(self, matrix, standards):
+        """Placement readiness 0-100: mean share of each standard the student meets"""
+        met = np.minimum(matrix, standards) / np.where(standards > 0, standards, 1)
+        return 100 * met.mean(axis=1)
+    
+    @timed('analyzer.analyze_matrix')
+    def analyze_matrix(self, matrix, target_role='Data Scientist', standards=None):
+        """analyze_cohort for a prebuilt (students x SKILL_LABELS) proficiency matrix
+        
+        Pass standards when nearest_standards() was already called for the
+        matrix (say, to compute readiness as well) to skip the second lookup.
+        """
+        if len(matrix) == 0:
+            return []
+        
+        if standards is None:
+            standards = self.nearest_standards(matrix, target_role)
+        
+        # Calculate gaps, truncating like int() does in the per-student path
+        diff = standards - matrix
+        has_gap = matrix < standards
+        gaps = diff.astype(int)
+        levels = matrix.astype(int)
+        high = diff > 20
+        
+        # Stable descending sort on gap, with non-gaps pushed to the end
+        sort_key = np.where(has_gap, -gaps, np.iinfo(gaps.dtype).max)
+        order = np.argsort(sort_key, axis=1, kind='stable')
+        counts = has_gap.sum(axis=1)
+        
+        rows = np.arange(len(matrix))[:, None]
+        gaps = gaps[rows, order].tolist()
+        levels = levels[rows, order].tolist()
+        standards = standards[rows, order].astype(int).tolist()
+        high = high[rows, order].tolist()
+        order = order.tolist()
+        
+        cohort_gaps = []
+        for row, count in enumerate(counts.tolist()):
+            cohort_gaps.append([
+                {
+                    'skill': SKILL_LABELS[order[row][k]],
+                    'student_level': levels[row][k],
+                    'industry_standard': standards[row][k],
+                    'gap': gaps[row][k],
+                    'priority': 'High' if high[row][k] else 'Medium'
+                }
+                for k in range(count)
+            ])
+        
+        return cohort_gaps
+    
+    @timed('analyzer.generate_recommendations')
+    def generate_recommendations(self, skill_gaps, student_level=None):
+        """Generate personalized recommendations based on skill gaps
+        
+        One course for each of the top RECOMMENDED_GAPS gaps, ranked by
+        CourseCatalog against all of the student's gaps. Course levels
+        follow each skill's proficiency unless student_level names one
+        level for every skill; an unknown level raises ValueError.
+        """
+        gaps = np.zeros((1, NUM_SKILLS))
+        proficiency = np.zeros((1, NUM_SKILLS))
+        slot_skills = np.full((1, RECOMMENDED_GAPS), -1)
+        for gap in skill_gaps:
+            idx = self.courses.skill_rows.get(gap['skill'])
+            if idx is not None:
+                gaps[0, idx] = gap['gap']
+                proficiency[0, idx] = gap.get('student_level', 0)
+        for slot, gap in enumerate(skill_gaps[:RECOMMENDED_GAPS]):
+            slot_skills[0, slot] = self.courses.skill_rows.get(gap['skill'], -1)
+        if student_level is None:
+            levels = proficiency_levels(proficiency)
+        else:
+            levels = np.full((1, NUM_SKILLS), self.courses.level_index(student_level))
+        
+        chosen = self.courses.rank(gaps, levels, slot_skills)[0].tolist()
+        return self._recommendations([
+            (gap['skill'], gap['gap'], gap['priority'], course)
+            for gap, course in zip(skill_gaps[:RECOMMENDED_GAPS], chosen)
+        ])
+    
+    @timed('analyzer.recommend_cohort')
+    def recommend_cohort(self, matrix, target_role='Data Scientist', standards=None, student_level=None):
+        """generate_recommendations for every row of a (students x SKILL_LABELS) matrix in one pass
+        
+        Same result, student for student, as generate_recommendations on
+        analyze_matrix's gaps; pass standards if nearest_standards() was
+        already computed for the matrix.
+        """
+        if len(matrix) == 0:
+            return []
+        if standards is None:
+            standards = self.nearest_standards(matrix, target_role)
+        slot_skills, courses = self.rank_courses(matrix, standards, student_level)
+        return self.recommend_ranked(matrix, standards, slot_skills, courses)
+    
+    def rank_courses(self, matrix, standards, student_level=None):
+        """(slot_skills, courses), both (students x RECOMMENDED_GAPS): each slot's skill and course row, -1 if empty
+        
+        The ranking half of recommend_cohort; recommend_ranked() turns the
+        result into recommendations. Kept apart so precomputed rankings
+        (see cohort_snapshot.py) can be served without ranking again.
+        """
+        diff = standards - matrix
+        has_gap = matrix < standards
+        gaps = np.where(has_gap, diff.astype(int), 0)
+        if student_level is None:
+            levels = proficiency_levels(matrix)
+        else:
+            levels = np.full(matrix.shape, self.courses.level_index(student_level))
+        
+        # Top gaps in analyze_matrix order; slots past a student's last gap stay empty
+        sort_key = np.where(has_gap, -gaps, np.iinfo(gaps.dtype).max)
+        slot_skills = np.argsort(sort_key, axis=1, kind='stable')[:, :RECOMMENDED_GAPS]
+        slot_skills[np.arange(RECOMMENDED_GAPS) >= has_gap.sum(axis=1)[:, None]] = -1
+        return slot_skills, self.courses.rank(gaps, levels, slot_skills)
+    
+    def recommend_ranked(self, matrix, standards, slot_skills, courses):
+        """recommend_cohort's recommendations from rank_courses() output for the same rows"""
+        diff = standards - matrix
+        gaps = np.where(matrix < standards, diff.astype(int), 0)
+        rows = np.arange(len(matrix))[:, None]
+        slot_gaps = gaps[rows, slot_skills].tolist()
+        high = (diff > 20)[rows, slot_skills].tolist()
+        chosen = np.asarray(courses).tolist()
+        
+        return [
+            self._recommendations([
+                (SKILL_LABELS[skill], slot_gaps[row][slot], 'High' if high[row][slot] else 'Medium', chosen[row][slot])
+                for slot, skill in enumerate(skills) if skill >= 0
+            ])
+            for row, skills in enumerate(np.asarray(slot_skills).tolist())
+        ]
+    
+    def _recommendations(self, slots):
+        """Recommendation dicts from (skill, gap, priority, course row or -1) slots"""
+        courses = self.courses
+        recommendations = [
+            {
+                'type': 'course_recommendation',
+                'skill': skill,
+                'gap': gap,
+                'recommendation': f"Take '{courses.names[course]}' to improve {skill}",
+                'resource_url': courses.urls[course],
+                'level': courses.level_names[courses.levels[course]],
+                'priority': priority
+            }
+            for skill, gap, priority, course in slots if course >= 0
+        ]
         
         # Add generic recommendations if needed
-        if len(recommendations) < 3:
+        if len(recommendations) < RECOMMENDED_GAPS:
             recommendations.append({
                 'type': 'general_recommendation',
                 'recommendation': 'Practice mock interviews focusing on your weak areas',
@@ -140,3 +324,33 @@ class SkillAnalyzer:
             })
         
         return recommendations
+
+
+_analyzer = None
+_analyzer_key = None
+_analyzer_lock = threading.Lock()
+
+def _file_versions(*paths):
+    versions = []
+    for path in paths:
+        try:
+            versions.append((path, os.stat(path).st_mtime_ns))
+        except FileNotFoundError:
+            versions.append((path, None))
+    return tuple(versions)
+
+def get_analyzer(model_path=MODEL_PATH, catalog_path=ROLE_CATALOG_PATH, course_catalog_path=COURSE_CATALOG_PATH):
+    """Return the process-wide SkillAnalyzer, reloading it if the model or a catalog file changed"""
+    global _analyzer, _analyzer_key
+    
+    key = _file_versions(model_path, catalog_path, course_catalog_path)
+    analyzer = _analyzer
+    if analyzer is not None and key == _analyzer_key:
+        return analyzer
+    
+    with _analyzer_lock:
+        if _analyzer is None or key != _analyzer_key:
+            _analyzer = SkillAnalyzer(model_path, catalog_path, course_catalog_path)
+            # Training may have just written the model file
+            _analyzer_key = _file_versions(model_path, catalog_path, course_catalog_path)
+        return _analyzer
\ No newline at end of file
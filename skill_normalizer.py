@@ -0,0 +1,110 @@
+import functools
+import re
+from collections import Counter, defaultdict
+
+# Characters kept when folding; '+' and '#' keep C++ / C# distinct from C
+_FOLD_RE = re.compile(r"[^0-9a-z+#]+")
+
+# Strings shorter than this are matched exactly only ('R' must not become 'AI')
+MIN_FUZZY_LENGTH = 4
+
+# Trigram-overlap candidates checked with edit distance per fuzzy lookup
+FUZZY_CANDIDATES = 8
+
+
+def fold(text):
+    """Case-fold and collapse punctuation/whitespace runs to single spaces"""
+    return _FOLD_RE.sub(' ', text.casefold()).strip()
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    """Edit distance counting adjacent swaps as one edit, capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class SkillNormalizer:
+    """Map free-text skill names onto the analyzer's skill dimensions
+
+    The alias table is compiled once: folded aliases go into an exact-match
+    dict and a trigram inverted index. Lookups try the exact dict first and
+    fall back to the closest alias by trigram similarity, confirmed by edit
+    distance so that only near-typos match. Results are memoized in an LRU
+    cache because student profiles repeat the same few spellings.
+    """
+
+    def __init__(self, aliases, labels, cache_size=65536, min_similarity=0.3):
+        self.labels = list(labels)
+        self.min_similarity = min_similarity
+
+        self.exact = {}
+        for label_idx, label in enumerate(self.labels):
+            self.exact[fold(label)] = label_idx
+        for alias, label_idx in aliases.items():
+            self.exact.setdefault(fold(alias), label_idx)
+
+        self.keys = list(self.exact)
+        self.key_grams = [_trigrams(key) for key in self.keys]
+        self.gram_index = defaultdict(list)
+        for key_idx, grams in enumerate(self.key_grams):
+            for gram in grams:
+                self.gram_index[gram].append(key_idx)
+
+        self._lookup = functools.lru_cache(maxsize=cache_size)(self._resolve)
+
+    def index(self, name):
+        """Skill dimension for a free-text name, or None if nothing is close"""
+        if not isinstance(name, str):
+            return None
+        return self._lookup(name)
+
+    def canonical(self, name):
+        """Canonical skill label for a free-text name, or None"""
+        label_idx = self.index(name)
+        return None if label_idx is None else self.labels[label_idx]
+
+    def cache_info(self):
+        return self._lookup.cache_info()
+
+    def cache_clear(self):
+        self._lookup.cache_clear()
+
+    def _resolve(self, name):
+        key = fold(name)
+        label_idx = self.exact.get(key)
+        if label_idx is not None or len(key) < MIN_FUZZY_LENGTH:
+            return label_idx
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key):
+        grams = _trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            for key_idx in self.gram_index.get(gram, ()):
+                shared[key_idx] += 1
+
+        max_edits = 1 if len(key) <= 6 else 2
+        best, best_score = None, self.min_similarity
+        for key_idx, count in shared.most_common(FUZZY_CANDIDATES):
+            # Dice coefficient over trigram sets
+            score = 2 * count / (len(grams) + len(self.key_grams[key_idx]))
+            if score >= best_score and _edit_distance(key, self.keys[key_idx], max_edits) <= max_edits:
+                best, best_score = key_idx, score
+        return None if best is None else self.exact[self.keys[best]]
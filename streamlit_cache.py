@@ -0,0 +1,48 @@
+"""Cached resources for the Streamlit pages
+
+Streamlit re-executes the whole page script on every interaction, so
+anything expensive the script does directly is paid per keystroke.
+Long-lived objects (the connection pool, the skill analyzer, the
+interview engine) come from st.cache_resource and are built once per
+process. Query results are not cached: a keyset page read from the
+pool (~0.06ms) costs less than an st.cache_data lookup (~0.2ms).
+"""
+import os
+
+import streamlit as st
+
+import database
+
+
+@st.cache_resource(show_spinner=False)
+def _pool(db_name):
+    database.ensure_schema()
+    return database.get_pool()
+
+
+def init_database():
+    """Schema setup and connection pool, once per process and database"""
+    return _pool(database.DB_NAME)
+
+
+@st.cache_resource(show_spinner=False)
+def skill_analyzer():
+    from skill_analyzer import get_analyzer
+    return get_analyzer()
+
+
+@st.cache_resource(show_spinner=False)
+def interview_engine():
+    from mock_interview_engine import MockInterviewEngine
+    return MockInterviewEngine()
+
+
+@st.cache_data(show_spinner=False)
+def _read_text(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def read_text(path):
+    """File contents, re-read only when the file's mtime changes"""
+    return _read_text(path, os.path.getmtime(path))
@@ -0,0 +1,197 @@
+import json
+from datetime import datetime
+
+import numpy as np
+
+import database
+from cohort_analytics import refresh_students
+from skill_analyzer import SKILL_LABELS, SKILL_NORMALIZER
+
+
+def canonical_skill(name):
+    """Analyzer label for a known skill, otherwise the name as entered"""
+    return SKILL_NORMALIZER.canonical(name) or name.strip()
+
+
+def parse_skills(text):
+    """(skill, proficiency, category) tuples from a legacy skills JSON column
+
+    Accepts [{"skill_name", "proficiency", "category"}, ...] as sent by the
+    dashboard as well as a bare list of names (proficiency 0).
+    """
+    try:
+        entries = json.loads(text or '[]')
+    except ValueError:
+        return []
+    return normalize_skills(entries) if isinstance(entries, list) else []
+
+
+def normalize_skills(entries):
+    """Deduplicated (canonical skill, proficiency, category) tuples from skill entries"""
+    skills = {}
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'skill_name': entry}
+        if not isinstance(entry, dict):
+            continue
+        name = entry.get('skill_name') or entry.get('skill') or entry.get('name')
+        if not isinstance(name, str) or not name.strip():
+            continue
+        try:
+            proficiency = float(entry.get('proficiency') or 0)
+        except (TypeError, ValueError):
+            proficiency = 0.0
+        # Later entries win, like repeated set_student_skills calls
+        skills[canonical_skill(name)] = (proficiency, entry.get('category'))
+    return [(skill, proficiency, category) for skill, (proficiency, category) in skills.items()]
+
+
+def copy_json_skills(conn, batch_size=database.IMPORT_CHUNK_SIZE):
+    """Fill student_skills from student_profiles.skills with the current normalizer
+
+    Migration step 4 does the same with its own frozen alias table.
+    """
+    now = datetime.now().isoformat()
+    rows = conn.execute(
+        "SELECT user_id, skills FROM student_profiles WHERE user_id IS NOT NULL AND skills NOT IN ('', '[]')"
+    )
+    while True:
+        profiles = rows.fetchmany(batch_size)
+        if not profiles:
+            break
+        conn.executemany(
+            "INSERT OR IGNORE INTO student_skills (user_id, skill, proficiency, category, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(user_id, skill, proficiency, category, now)
+             for user_id, text in profiles
+             for skill, proficiency, category in parse_skills(text)]
+        )
+
+
+def canonicalize_skills(conn):
+    """Rename stored skills to their canonical label and return how many names changed
+
+    Migration step 4 copies the legacy JSON skills with a frozen alias
+    table that only knows exact spellings, so typos like "Pyhton" arrive
+    verbatim; database.upgrade_schema() runs this after it. Where a
+    student has both a misspelling and the canonical skill, the canonical
+    row is kept. The cohort aggregates are built after step 4 by then and
+    count these students on first use, so they are not refreshed here.
+    """
+    renames = [(canonical_skill(skill), skill) for (skill,) in conn.execute("SELECT DISTINCT skill FROM student_skills")]
+    renames = [(new, old) for new, old in renames if new != old]
+    if not renames:
+        return 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany("UPDATE OR IGNORE student_skills SET skill = ? WHERE skill = ?", renames)
+        conn.executemany("DELETE FROM student_skills WHERE skill = ?", [(old,) for _, old in renames])
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return len(renames)
+
+
+def set_student_skills(user_id, skills, replace=True):
+    """Store a student's [{'skill_name', 'proficiency', 'category'}] list
+
+    With replace, skills missing from the list are removed, matching the
+    dashboard's "save my skills" semantics.
+    """
+    parsed = normalize_skills(skills)
+    now = datetime.now().isoformat()
+    with database.transaction() as conn:
+        if replace:
+            conn.execute("DELETE FROM student_skills WHERE user_id = ?", (user_id,))
+        conn.executemany("""
+            INSERT INTO student_skills (user_id, skill, proficiency, category, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, skill) DO UPDATE SET
+                proficiency = excluded.proficiency,
+                category = COALESCE(excluded.category, category),
+                updated_at = excluded.updated_at
+        """, [(user_id, skill, proficiency, category, now) for skill, proficiency, category in parsed])
+        refresh_students(conn, [user_id])
+
+
+def get_student_skills(user_id):
+    with database.connection() as conn:
+        rows = conn.execute(
+            "SELECT skill, proficiency, category, updated_at FROM student_skills WHERE user_id = ? ORDER BY skill",
+            (user_id,)
+        ).fetchall()
+    return [
+        {'skill_name': skill, 'proficiency': proficiency, 'category': category, 'updated_at': updated_at}
+        for skill, proficiency, category, updated_at in rows
+    ]
+
+
+def _cohort_filter(batch, department):
+    """JOIN and WHERE fragments restricting student_skills to a batch/department"""
+    clauses, params = [], []
+    if batch is not None:
+        clauses.append("p.batch = ?")
+        params.append(batch)
+    if department is not None:
+        clauses.append("p.department = ?")
+        params.append(department)
+    if not clauses:
+        return "", "", params
+    return " JOIN student_profiles p ON p.user_id = s.user_id", " AND ".join(clauses), params
+
+
+def students_below(skill, threshold, batch=None, department=None):
+    """Ids of students whose recorded proficiency in `skill` is below threshold
+
+    Answered from the (skill, proficiency) index. Students who never
+    recorded the skill are not included.
+    """
+    join, where, params = _cohort_filter(batch, department)
+    sql = f"SELECT s.user_id FROM student_skills s{join} WHERE s.skill = ? AND s.proficiency < ?"
+    if where:
+        sql += f" AND {where}"
+    with database.connection() as conn:
+        return [row[0] for row in conn.execute(sql + " ORDER BY s.user_id", [canonical_skill(skill), threshold] + params)]
+
+
+def skill_matrix(batch=None, department=None, skills=SKILL_LABELS):
+    """(user_ids, matrix) for a cohort, one row per student and one column per skill
+
+    The pivot runs in SQLite, so the result arrives one row per student and
+    is copied straight into float arrays; skills a student never recorded
+    are 0, as in SkillAnalyzer.build_skill_matrix. The matrix can be passed
+    to SkillAnalyzer.analyze_matrix.
+    """
+    columns = ", ".join("MAX(CASE WHEN s.skill = ? THEN s.proficiency END)" for _ in skills)
+    join, where, params = _cohort_filter(batch, department)
+    sql = f"SELECT s.user_id, {columns} FROM student_skills s{join}"
+    if where:
+        sql += f" WHERE {where}"
+    sql += " GROUP BY s.user_id ORDER BY s.user_id"
+
+    with database.connection() as conn:
+        rows = conn.execute(sql, list(skills) + params).fetchall()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.zeros((0, len(skills)))
+
+    data = np.array(rows, dtype=float)
+    user_ids = data[:, 0].astype(np.int64)
+    matrix = np.nan_to_num(data[:, 1:], nan=0.0)
+    return user_ids, matrix
+
+
+def skill_matrix_for(conn, user_ids, skills=SKILL_LABELS):
+    """Proficiency matrix with one row per id in user_ids, in that order"""
+    matrix = np.zeros((len(user_ids), len(skills)))
+    if not user_ids:
+        return matrix
+    columns = ", ".join("MAX(CASE WHEN skill = ? THEN proficiency END)" for _ in skills)
+    placeholders = ",".join("?" * len(user_ids))
+    rows = conn.execute(
+        f"SELECT user_id, {columns} FROM student_skills WHERE user_id IN ({placeholders}) GROUP BY user_id",
+        list(skills) + list(user_ids)
+    ).fetchall()
+    position = {user_id: row for row, user_id in enumerate(user_ids)}
+    for user_id, *levels in rows:
+        matrix[position[user_id]] = [level or 0 for level in levels]
+    return matrix
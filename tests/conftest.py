@@ -0,0 +1,84 @@
+"""Shared fixtures: every test runs in a scratch directory with its own database
+
+The repository root goes on sys.path so the flat modules import as they
+do for `python api.py`. Tests run from a temporary working directory, so
+the relative defaults (app.db, skill_model.npz) never touch the tree.
+Seeded data is generated here rather than borrowed from benchmarks/, so
+the suite runs without the benchmark scripts.
+"""
+import os
+import random
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from skill_analyzer import SKILL_LABELS, SKILL_MAPPING, SkillAnalyzer  # noqa: E402
+
+BATCHES = ['2024', '2025', '2026', '2027']
+DEPARTMENTS = ['CSE', 'IT', 'ECE', 'Mechanical']
+ROLES = ['Data Scientist', 'ML Engineer', 'Data Analyst', 'Research Scientist']
+COHORT_STUDENTS = 400
+
+
+@pytest.fixture(scope='session', autouse=True)
+def scratch_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp('workdir')
+    previous = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(previous)
+
+
+@pytest.fixture(scope='session')
+def analyzer(scratch_dir):
+    return SkillAnalyzer(model_path=str(scratch_dir / 'skill_model.npz'))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """An empty, migrated database behind database.DB_NAME"""
+    monkeypatch.setattr(database, 'DB_NAME', str(tmp_path / 'test.db'))
+    database.create_tables()
+    yield database.DB_NAME
+    database.close_pool()
+
+
+@pytest.fixture
+def skill_lists():
+    """make(count, seed) -> seeded students' skill lists, spelled with every known alias"""
+    def make(count, seed=42):
+        rng = random.Random(seed)
+        aliases = list(SKILL_MAPPING)
+        return [
+            [{'skill_name': name, 'proficiency': rng.randint(0, 100)}
+             for name in rng.sample(aliases, rng.randint(0, len(aliases)))]
+            for _ in range(count)
+        ]
+    return make
+
+
+@pytest.fixture
+def cohort(db):
+    """COHORT_STUDENTS seeded students (users, profiles, skills); returns their user ids"""
+    rng = random.Random(5)
+    now = datetime.now().isoformat()
+    user_ids = list(range(1, COHORT_STUDENTS + 1))
+    with database.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (full_name, email, role, created_at) VALUES (?, ?, 'student', ?)",
+            ((f"Student {i}", f"student{i}@college.edu", now) for i in user_ids),
+        )
+        conn.executemany(
+            "INSERT INTO student_profiles (user_id, batch, department, cgpa, target_role) VALUES (?, ?, ?, ?, ?)",
+            ((i, rng.choice(BATCHES), rng.choice(DEPARTMENTS), round(rng.uniform(5, 10), 2), rng.choice(ROLES))
+             for i in user_ids),
+        )
+        conn.executemany(
+            "INSERT INTO student_skills (user_id, skill, proficiency, updated_at) VALUES (?, ?, ?, ?)",
+            ((i, skill, rng.randrange(101), now) for i in user_ids for skill in SKILL_LABELS if rng.random() < 0.9),
+        )
+    return user_ids
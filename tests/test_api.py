@@ -0,0 +1,163 @@
+"""The api.py routes, driven through the ASGI interface with the app's own lifespan"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+import api
+from auth import PasswordHasher
+
+LOCAL = ('127.0.0.1', 50000)
+REMOTE = ('10.0.0.7', 50000)
+
+
+@asynccontextmanager
+async def serve():
+    async with api.app.router.lifespan_context(api.app):
+        # The lowest bcrypt cost keeps sign-ups fast; the hashing path is the same
+        api.app.state.hasher.close()
+        api.app.state.hasher = PasswordHasher(rounds=4)
+        yield api.app
+
+
+async def call(method, path, body=None, token=None, headers=None, client=LOCAL):
+    """(status, headers, decoded JSON body or None) for one request"""
+    headers = dict(headers or {})
+    if token:
+        headers['authorization'] = f'Bearer {token}'
+    payload = json.dumps(body).encode() if body is not None else b''
+    if body is not None:
+        headers['content-type'] = 'application/json'
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+        'method': method, 'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': b'',
+        'headers': [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        'client': client, 'server': ('testserver', 80),
+    }
+    received = []
+
+    async def receive():
+        if received:
+            await asyncio.sleep(3600)
+        received.append(True)
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    response = {'body': b''}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = {k.decode(): v.decode() for k, v in message['headers']}
+        elif message['type'] == 'http.response.body':
+            response['body'] += message.get('body', b'')
+
+    await api.app(scope, receive, send)
+    is_json = response['headers'].get('content-type') == 'application/json'
+    data = json.loads(response['body']) if is_json and response['body'] else None
+    return response['status'], response['headers'], data
+
+
+async def sign_up(email='ana@college.edu', password='correct horse'):
+    status, _, data = await call('POST', '/api/student/register',
+                                 {'email': email, 'full_name': 'Ana', 'password': password, 'target_role': 'Data Scientist'})
+    assert status == 201
+    return data['token']
+
+
+def test_register_login_and_dashboard(db):
+    async def scenario():
+        async with serve():
+            status, _, data = await call('POST', '/api/student/register',
+                                         {'email': ' Ana@College.EDU ', 'full_name': 'Ana', 'password': 'pw'})
+            assert status == 201 and data['user']['email'] == 'ana@college.edu'
+            token = data['token']
+
+            status, _, data = await call('POST', '/api/student/register',
+                                         {'email': 'ana@college.edu', 'full_name': 'Ana', 'password': 'pw'})
+            assert status == 409
+            assert (await call('POST', '/api/student/register', {'email': 'x@college.edu'}))[0] == 400
+            assert (await call('POST', '/api/student/login', {'email': 'ANA@college.edu', 'password': 'pw'}))[0] == 200
+            assert (await call('POST', '/api/student/login', {'email': 'ana@college.edu', 'password': 'no'}))[0] == 401
+            assert (await call('POST', '/api/student/login', {'email': 'nobody@college.edu', 'password': 'pw'}))[0] == 401
+
+            assert (await call('GET', '/api/student/dashboard'))[0] == 401
+            assert (await call('GET', '/api/student/dashboard', token=token + 'x'))[0] == 401
+            status, headers, data = await call('GET', '/api/student/dashboard', token=token)
+            assert status == 200 and data['user']['email'] == 'ana@college.edu'
+            status, _, _ = await call('GET', '/api/student/dashboard', token=token,
+                                      headers={'if-none-match': headers['etag']})
+            assert status == 304
+
+            status, _, _ = await call('POST', '/api/student/skills', {'skills': [{'skill_name': 'python', 'proficiency': 80}]},
+                                      token=token)
+            assert status == 200
+            status, _, data = await call('GET', '/api/student/skills', token=token)
+            assert [(s['skill_name'], s['proficiency']) for s in data['skills']] == [('Python', 80)]
+            assert (await call('POST', '/api/student/skills', {'skills': 'Python'}, token=token))[0] == 400
+
+    asyncio.run(scenario())
+
+
+def test_interview_submit_and_conflicts(db, monkeypatch):
+    async def scenario():
+        async with serve() as app:
+            token, other = await sign_up(), await sign_up('bo@college.edu')
+            status, _, interview = await call('POST', '/api/student/interview/start', token=token)
+            assert status == 200 and interview['questions']
+            path = f"/api/student/interview/{interview['interview_id']}/submit"
+            answers = ['It depends on the data and the model.'] * len(interview['questions'])
+
+            assert (await call('POST', path, {'answers': answers}, token=other))[0] == 404
+            assert (await call('POST', path, {'answers': 'yes'}, token=token))[0] == 400
+
+            store = app.state.engine.store
+            stale = store.get_session(interview['interview_id'])
+            status, _, result = await call('POST', path, {'answers': answers}, token=token)
+            assert status == 200 and result['status'] == 'completed'
+
+            # A submit that read the session before the first one stored its answers
+            monkeypatch.setattr(store, 'get_session', lambda session_id: stale)
+            status, _, data = await call('POST', path, {'answers': answers}, token=token)
+            assert status == 409 and data['error'] == 'Interview answers were already submitted'
+
+    asyncio.run(scenario())
+
+
+def test_other_submit_errors_are_not_conflicts(db, monkeypatch):
+    async def broken(interview_id, answers):
+        raise ValueError('evaluator misconfigured')
+
+    async def scenario():
+        async with serve() as app:
+            token = await sign_up()
+            _, _, interview = await call('POST', '/api/student/interview/start', token=token)
+            monkeypatch.setattr(app.state.engine, 'submit_answers', broken)
+            with pytest.raises(ValueError):
+                await call('POST', f"/api/student/interview/{interview['interview_id']}/submit",
+                           {'answers': ['x']}, token=token)
+
+    asyncio.run(scenario())
+
+
+def test_metrics_are_local_only_without_a_token(db):
+    async def scenario():
+        async with serve():
+            assert (await call('GET', '/api/metrics'))[0] == 200
+            assert (await call('GET', '/metrics'))[0] == 200
+            assert (await call('GET', '/api/metrics', client=REMOTE))[0] == 403
+            assert (await call('GET', '/api/metrics', headers={'origin': 'http://localhost:8000'}))[0] == 403
+
+    asyncio.run(scenario())
+
+
+def test_metrics_token_is_required_when_set(db, monkeypatch):
+    monkeypatch.setattr(api, 'METRICS_TOKEN', 's3cret')
+
+    async def scenario():
+        async with serve():
+            assert (await call('GET', '/api/metrics'))[0] == 401
+            assert (await call('GET', '/api/metrics', token='wrong'))[0] == 401
+            assert (await call('GET', '/api/metrics', token='s3cret', client=REMOTE))[0] == 200
+
+    asyncio.run(scenario())
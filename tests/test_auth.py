@@ -0,0 +1,94 @@
+"""auth.py: bcrypt hashing with cost upgrades, and signed session tokens"""
+import asyncio
+
+import auth
+from auth import HasherBusy, PasswordHasher, TokenSigner, hash_password, needs_rehash, verify_password
+
+# The lowest bcrypt cost, so the suite doesn't spend seconds hashing
+ROUNDS = 4
+
+
+def test_tokens_carry_the_user_until_they_expire():
+    signer = TokenSigner(secret='k', ttl=60)
+    token = signer.issue(7, now=1000)
+    assert signer.user_id(token, now=1000) == 7
+    assert signer.user_id(token, now=1060) == 7
+    assert signer.user_id(token, now=1061) is None
+
+
+def test_forged_and_tampered_tokens_are_rejected():
+    signer = TokenSigner(secret='k', ttl=60)
+    token = signer.issue(7, now=1000)
+    user_id, expires_at, signature = token.split('.')
+
+    assert signer.user_id(f"8.{expires_at}.{signature}", now=1000) is None
+    assert signer.user_id(f"{user_id}.{int(expires_at) + 3600}.{signature}", now=1000) is None
+    assert TokenSigner(secret='other').user_id(token, now=1000) is None
+    assert TokenSigner(secret='k').user_id(token, now=1000) == 7
+    for garbage in ('', '.', 'x.y.z', token + 'x', 'not a token'):
+        assert signer.user_id(garbage, now=1000) is None
+
+
+def test_without_a_secret_every_signer_has_its_own_key():
+    token = TokenSigner(secret=None).issue(7)
+    assert TokenSigner(secret=None).user_id(token) is None
+
+
+def test_hash_and_verify():
+    password_hash = hash_password('correct horse', ROUNDS)
+    assert verify_password('correct horse', password_hash, ROUNDS)
+    assert not verify_password('wrong horse', password_hash, ROUNDS)
+    assert not verify_password('correct horse', None, ROUNDS)
+    assert not verify_password('correct horse', '', ROUNDS)
+    assert not verify_password('correct horse', 'not a bcrypt hash', ROUNDS)
+
+
+def test_passwords_past_72_bytes_are_truncated_not_rejected():
+    password = 'é' * 40
+    assert verify_password(password + 'ignored', hash_password(password, ROUNDS), ROUNDS)
+
+
+def test_needs_rehash_wants_exactly_the_configured_cost():
+    password_hash = hash_password('pw', ROUNDS)
+    assert not needs_rehash(password_hash, ROUNDS)
+    assert needs_rehash(password_hash, ROUNDS + 1)
+    assert needs_rehash(hash_password('pw', ROUNDS + 1), ROUNDS)
+    assert needs_rehash('pbkdf2:sha256:260000$salt$hash', ROUNDS)
+
+
+def test_verify_and_upgrade_rehashes_at_the_new_cost():
+    hasher = PasswordHasher(rounds=ROUNDS + 1, workers=1)
+    old_hash = hash_password('pw', ROUNDS)
+
+    async def scenario():
+        assert await hasher.verify_and_upgrade('wrong', old_hash) == (False, None)
+        assert await hasher.verify_and_upgrade('pw', None) == (False, None)
+        matches, new_hash = await hasher.verify_and_upgrade('pw', old_hash)
+        assert matches and not needs_rehash(new_hash, ROUNDS + 1)
+        assert verify_password('pw', new_hash, ROUNDS + 1)
+        # Already at the configured cost: nothing to replace
+        assert await hasher.verify_and_upgrade('pw', new_hash) == (True, None)
+
+    asyncio.run(scenario())
+    hasher.close()
+
+
+def test_full_hasher_fails_fast(monkeypatch):
+    hasher = PasswordHasher(rounds=ROUNDS, workers=1, max_pending=1)
+    started = []
+
+    def counted_hash(password, rounds):
+        started.append(password)
+        return hash_password(password, rounds)
+
+    monkeypatch.setattr(auth, 'hash_password', counted_hash)
+
+    async def scenario():
+        results = await asyncio.gather(*(hasher.hash(f'pw{i}') for i in range(4)), return_exceptions=True)
+        busy = [r for r in results if isinstance(r, HasherBusy)]
+        assert len(busy) == 2 and hasher.rejected == 2
+        assert len(started) == 2
+
+    asyncio.run(scenario())
+    hasher.close()
+
@@ -0,0 +1,118 @@
+"""Materialized cohort aggregates against the same numbers computed from the raw tables"""
+import random
+
+import numpy as np
+
+import cohort_analytics
+import database
+from conftest import BATCHES, COHORT_STUDENTS, DEPARTMENTS
+from interview_store import InterviewStore
+from profiles import save_student_profile
+from skill_analyzer import SKILL_LABELS, get_analyzer
+from student_skills import set_student_skills, skill_matrix_for
+
+
+def live(batch, department):
+    """CGPA histogram, gap distribution and readiness percentiles computed from scratch"""
+    with database.connection() as conn:
+        profiles = conn.execute(
+            "SELECT user_id, cgpa, target_role FROM student_profiles WHERE batch = ? AND department = ? ORDER BY user_id",
+            (batch, department)).fetchall()
+        matrix = skill_matrix_for(conn, [user_id for user_id, _, _ in profiles])
+    analyzer = get_analyzer()
+    standards = analyzer.nearest_standards(matrix, [role for _, _, role in profiles])
+    readiness = analyzer.readiness(matrix, standards).astype(int)
+    gaps = (np.clip(standards - matrix, 0, None) // cohort_analytics.GAP_BUCKET).astype(int)
+    size = 100 // cohort_analytics.GAP_BUCKET + 1
+    cgpa = np.array([cgpa for _, cgpa, _ in profiles])
+    return (
+        np.bincount((cgpa // cohort_analytics.CGPA_BUCKET).astype(int), minlength=41),
+        np.stack([np.bincount(gaps[:, k], minlength=size) for k in range(len(SKILL_LABELS))]),
+        np.percentile(readiness, cohort_analytics.READINESS_PERCENTILES, method='inverted_cdf').astype(int),
+    )
+
+
+def materialized(batch, department):
+    _, cgpa = cohort_analytics.cgpa_histogram(batch, department)
+    _, _, gaps = cohort_analytics.gap_distribution(batch, department)
+    percentiles = cohort_analytics.readiness_percentiles(batch, department)
+    return cgpa, gaps, np.array(list(percentiles.values()))
+
+
+def assert_matches_live(batch, department):
+    for want, got in zip(live(batch, department), materialized(batch, department)):
+        assert np.array_equal(want, got)
+
+
+def aggregates():
+    """Every materialized row with a nonzero count, for comparing against a rebuild"""
+    with database.connection() as conn:
+        histograms = conn.execute(
+            "SELECT metric, batch, department, bucket, count FROM cohort_histograms WHERE count != 0 ORDER BY 1, 2, 3, 4"
+        ).fetchall()
+        trends = conn.execute(
+            "SELECT batch, department, period, answers, round(score_sum, 6) FROM cohort_interview_trends"
+            " WHERE answers != 0 ORDER BY 1, 2, 3"
+        ).fetchall()
+    return histograms, trends
+
+
+def rebuilt():
+    with database.transaction() as conn:
+        cohort_analytics.rebuild(conn)
+    return aggregates()
+
+
+def test_materialized_matches_live(cohort):
+    for batch, department in [('2025', 'CSE'), ('2027', 'Mechanical')]:
+        assert_matches_live(batch, department)
+    assert sum(students for _, _, students in cohort_analytics.cohorts()) == len(cohort)
+
+
+def test_incremental_updates_match_rebuild(cohort):
+    rng = random.Random(6)
+    cohort_analytics.cohorts()
+    for _ in range(100):
+        user_id = rng.choice(cohort)
+        if rng.random() < 0.5:
+            set_student_skills(user_id, [{'skill_name': s, 'proficiency': rng.randrange(101)} for s in SKILL_LABELS])
+        else:
+            save_student_profile(user_id, cgpa=round(rng.uniform(5, 10), 2),
+                                 batch=rng.choice(BATCHES), department=rng.choice(DEPARTMENTS))
+
+    assert_matches_live('2025', 'CSE')
+    assert aggregates() == rebuilt()
+
+
+def test_interview_trends_follow_the_student(cohort):
+    store = InterviewStore()
+    user_id = cohort[0]
+    session = store.create_session(user_id, [('What is SQL?', 'SQL'), ('What is Python?', 'Python')])
+    store.record_answer(session, 0, 'a', {'score': 6})
+    store.record_answer(session, 1, 'b', {'score': 9})
+
+    with database.connection() as conn:
+        batch, department = conn.execute(
+            "SELECT batch, department FROM student_profiles WHERE user_id = ?", (user_id,)).fetchone()
+    other = next(b for b in BATCHES if b != batch)
+    save_student_profile(user_id, batch=other)
+
+    assert cohort_analytics.interview_trend(batch, department)[1].sum() == 0
+    assert cohort_analytics.interview_trend(other, department)[1].sum() == 2
+    assert aggregates() == rebuilt()
+
+
+def test_out_of_range_buckets_are_clamped(cohort):
+    save_student_profile(1, cgpa=-3.0)
+    save_student_profile(2, cgpa=99.0)
+    edges, counts = cohort_analytics.cgpa_histogram()
+    assert counts.sum() == COHORT_STUDENTS
+    assert counts[0] >= 1 and counts[-1] >= 1
+
+
+def test_stale_counts_are_rebuilt(cohort):
+    cohort_analytics.cohorts()
+    with database.transaction() as conn:
+        conn.execute("UPDATE cohort_analytics_state SET analyzer = 'other'")
+        conn.execute("DELETE FROM cohort_histograms")
+    assert sum(students for _, _, students in cohort_analytics.cohorts()) == COHORT_STUDENTS
@@ -0,0 +1,136 @@
+"""cohort_snapshot.py: published rows match the database, and CURRENT only ever names a whole snapshot"""
+import os
+
+import numpy as np
+import pytest
+
+import cohort_snapshot
+import database
+from cohort_snapshot import CohortSnapshot
+from conftest import BATCHES, DEPARTMENTS
+from student_skills import set_student_skills, skill_matrix_for
+
+
+def live(analyzer, user_ids):
+    """(skills, roles, standards, readiness, slot_skills, courses) computed from the database now"""
+    with database.connection() as conn:
+        placeholders = ",".join("?" * len(user_ids))
+        roles = dict(conn.execute(
+            f"SELECT user_id, target_role FROM student_profiles WHERE user_id IN ({placeholders})", user_ids
+        ).fetchall())
+        matrix = skill_matrix_for(conn, user_ids)
+    roles = [roles[user_id] for user_id in user_ids]
+    standards = analyzer.nearest_standards(matrix, roles)
+    slot_skills, courses = analyzer.rank_courses(matrix, standards)
+    return matrix, roles, standards, analyzer.readiness(matrix, standards), slot_skills, courses
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path / 'snapshots')
+
+
+def test_snapshot_matches_the_database(cohort, analyzer, root):
+    snapshot = CohortSnapshot(cohort_snapshot.publish(database.DB_NAME, root, 1, analyzer))
+    assert len(snapshot) == len(cohort)
+
+    rows = [snapshot.row(user_id) for user_id in cohort]
+    matrix, roles, standards, readiness, slot_skills, courses = live(analyzer, cohort)
+    assert np.array_equal(snapshot.skills[rows], matrix)
+    assert np.array_equal(snapshot.standards[rows], standards)
+    assert np.array_equal(snapshot.gaps[rows], np.clip(standards - matrix, 0, None))
+    assert np.allclose(snapshot.readiness[rows], readiness)
+    assert np.array_equal(snapshot.slot_skills[rows], slot_skills)
+    assert np.array_equal(snapshot.courses[rows], courses)
+    assert [snapshot.role_names[code] for code in snapshot.roles[rows]] == roles
+    assert snapshot.row(len(cohort) + 1) is None
+
+
+def test_cohorts_are_the_profiles_in_them(cohort, analyzer, root):
+    snapshot = CohortSnapshot(cohort_snapshot.publish(database.DB_NAME, root, 1, analyzer))
+    with database.connection() as conn:
+        for batch in BATCHES:
+            for department in DEPARTMENTS:
+                expected = [row[0] for row in conn.execute(
+                    "SELECT user_id FROM student_profiles WHERE batch = ? AND department = ? ORDER BY user_id",
+                    (batch, department)
+                )]
+                assert snapshot.cohort(batch, department)['user_ids'].tolist() == expected
+    assert sorted(snapshot.cohort(department=DEPARTMENTS[0])['user_ids'].tolist()) == sorted(
+        user_id for batch in BATCHES for user_id in snapshot.cohort(batch, DEPARTMENTS[0])['user_ids'].tolist()
+    )
+    assert len(snapshot.cohort('1999')['user_ids']) == 0
+
+
+def test_precomputed_is_served_only_while_the_row_is_current(cohort, analyzer, root):
+    snapshot = CohortSnapshot(cohort_snapshot.publish(database.DB_NAME, root, 1, analyzer))
+    edited, untouched = cohort[0], cohort[1]
+    set_student_skills(edited, [{'skill_name': 'Python', 'proficiency': 3}])
+
+    matrix, roles, standards, readiness, slot_skills, courses = live(analyzer, [edited, untouched])
+    assert snapshot.precomputed(edited, matrix[0], roles[0], analyzer) is None
+
+    stored = snapshot.precomputed(untouched, matrix[1], roles[1], analyzer)
+    assert np.array_equal(stored['standards'], standards[1:])
+    assert stored['readiness'] == pytest.approx(readiness[1])
+    assert np.array_equal(stored['slot_skills'], slot_skills[1:])
+    assert np.array_equal(stored['courses'], courses[1:])
+
+    other_role = next(role for role in snapshot.role_names if role != roles[1])
+    assert snapshot.precomputed(untouched, matrix[1], other_role, analyzer) is None
+    assert snapshot.precomputed(len(cohort) + 1, matrix[1], roles[1], analyzer) is None
+
+
+def test_precomputed_needs_the_same_catalogs(cohort, analyzer, root, monkeypatch):
+    snapshot = CohortSnapshot(cohort_snapshot.publish(database.DB_NAME, root, 1, analyzer))
+    matrix, roles = live(analyzer, cohort[:1])[:2]
+    monkeypatch.setattr(analyzer.courses, 'fingerprint', 'edited catalog')
+    assert snapshot.precomputed(cohort[0], matrix[0], roles[0], analyzer) is None
+
+
+def test_publishing_swaps_current_whole(cohort, analyzer, root):
+    first = cohort_snapshot.publish(database.DB_NAME, root, 1, analyzer)
+    old = cohort_snapshot.current(root)
+    assert old.path == first
+    row = old.row(cohort[0])
+    old_skills = np.array(old.skills[row])
+
+    set_student_skills(cohort[0], [{'skill_name': 'Python', 'proficiency': 3}])
+    second = cohort_snapshot.publish(database.DB_NAME, root, 2, analyzer)
+    new = cohort_snapshot.current(root)
+    assert new.path == second and new is not old
+    assert not np.array_equal(new.skills[new.row(cohort[0])], old_skills)
+    # Readers holding the previous snapshot keep a complete, unchanged view
+    assert np.array_equal(old.skills[row], old_skills)
+    assert sorted(os.listdir(root)) == sorted([cohort_snapshot.POINTER, os.path.basename(first), os.path.basename(second)])
+
+
+def test_failed_publish_leaves_the_current_snapshot(cohort, analyzer, root, monkeypatch):
+    first = cohort_snapshot.publish(database.DB_NAME, root, 1, analyzer)
+
+    def crash(*args, **kwargs):
+        raise OSError('disk full')
+
+    # Before the rename: the staging directory is removed
+    with monkeypatch.context() as patched:
+        patched.setattr(cohort_snapshot, '_write_arrays', crash)
+        with pytest.raises(OSError):
+            cohort_snapshot.publish(database.DB_NAME, root, 2, analyzer)
+    assert sorted(os.listdir(root)) == sorted([cohort_snapshot.POINTER, os.path.basename(first)])
+
+    # Before the pointer swap: the new snapshot exists but nobody is sent to it
+    with monkeypatch.context() as patched:
+        patched.setattr(cohort_snapshot.os, 'replace', crash)
+        with pytest.raises(OSError):
+            cohort_snapshot.publish(database.DB_NAME, root, 3, analyzer)
+    assert cohort_snapshot.current(root).path == first
+
+
+def test_old_snapshots_are_pruned(cohort, analyzer, root, monkeypatch):
+    monkeypatch.setattr(cohort_snapshot, 'KEEP_SNAPSHOTS', 1)
+    paths = [cohort_snapshot.publish(database.DB_NAME, root, run_id, analyzer) for run_id in (1, 2, 3)]
+    assert sorted(os.listdir(root)) == sorted([cohort_snapshot.POINTER] + [os.path.basename(p) for p in paths[1:]])
+
+
+def test_nothing_published_yet(tmp_path):
+    assert cohort_snapshot.current(str(tmp_path)) is None
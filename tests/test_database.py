@@ -0,0 +1,175 @@
+"""The database.py data layer: connection pool, bulk import and keyset pages"""
+import sqlite3
+import threading
+
+import pytest
+
+import database
+
+
+def test_pool_never_exceeds_max_size(tmp_path):
+    pool = database.ConnectionPool(str(tmp_path / 'pool.db'), max_size=2, timeout=0.05)
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(sqlite3.OperationalError):
+        pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+    pool.release(second)
+    pool.close()
+
+
+def test_released_connections_are_rolled_back(tmp_path):
+    pool = database.ConnectionPool(str(tmp_path / 'pool.db'), max_size=1)
+    with pool.transaction() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    with pool.connection() as conn:
+        conn.execute("BEGIN")
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.close()
+
+
+def test_threads_share_the_pool(tmp_path):
+    pool = database.ConnectionPool(str(tmp_path / 'pool.db'), max_size=3)
+    with pool.transaction() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    def write(n):
+        for i in range(20):
+            with pool.transaction() as conn:
+                conn.execute("INSERT INTO t VALUES (?)", (n * 100 + i,))
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 120
+    assert pool._created <= 3
+    pool.close()
+
+
+def test_closed_pool_counts_connections_until_released(tmp_path):
+    pool = database.ConnectionPool(str(tmp_path / 'pool.db'), max_size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(second)
+    pool.close()
+
+    assert pool._created == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
+    pool.release(first)
+    assert pool._created == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute("SELECT 1")
+
+
+def test_switching_databases_closes_the_old_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, 'DB_NAME', str(tmp_path / 'a.db'))
+    old = database.get_pool()
+    with database.connection() as conn:
+        monkeypatch.setattr(database, 'DB_NAME', str(tmp_path / 'b.db'))
+        new = database.get_pool()
+        assert new is not old and old._closed
+        conn.execute("SELECT 1")
+    assert old._created == 0
+    database.close_pool()
+
+
+def test_bulk_add_users_reports_duplicates_and_missing_fields(db):
+    database.add_user('Existing', 'taken@college.edu')
+    rows = [
+        {'name': 'A', 'email': 'a@college.edu'},
+        {'full_name': 'B', 'email': ' b@college.edu '},
+        {'name': 'Again', 'email': 'a@college.edu'},
+        {'name': 'Taken', 'email': 'taken@college.edu'},
+        {'name': '', 'email': 'c@college.edu'},
+        {'name': 'No email'},
+    ]
+    report = database.bulk_add_users(rows, chunk_size=4)
+
+    assert report['inserted'] == 2
+    assert [(e['row'], e['error']) for e in report['errors']] == [
+        (3, 'duplicate email'), (4, 'duplicate email'), (5, 'missing name or email'), (6, 'missing name or email'),
+    ]
+    assert [row[2] for row in database.get_users()] == ['taken@college.edu', 'a@college.edu', 'b@college.edu']
+
+
+def test_bulk_add_users_catches_duplicates_across_chunks(db):
+    rows = [{'name': f'User {i}', 'email': f'user{i % 5}@college.edu'} for i in range(12)]
+    report = database.bulk_add_users(rows, chunk_size=3)
+    assert report['inserted'] == 5
+    assert [e['row'] for e in report['errors']] == list(range(6, 13))
+
+
+def test_every_write_path_stores_normalized_emails(db):
+    database.add_user('A', ' Ana@College.EDU ')
+    report = database.bulk_add_users([
+        {'name': 'Again', 'email': 'ana@college.edu'},
+        {'name': 'B', 'email': 'Bo@College.edu'},
+        {'name': 'B again', 'email': ' bo@college.EDU'},
+    ])
+
+    assert report['inserted'] == 1
+    assert [(e['row'], e['email']) for e in report['errors']] == [(1, 'ana@college.edu'), (3, 'bo@college.edu')]
+    assert [row[2] for row in database.get_users()] == ['ana@college.edu', 'bo@college.edu']
+    with pytest.raises(sqlite3.IntegrityError):
+        database.add_user('Shouting', 'ANA@COLLEGE.EDU')
+
+
+def test_bulk_add_records_reports_unknown_users(db):
+    database.add_user('A', 'a@college.edu')
+    rows = [
+        {'user_id': '1', 'title': 'ok', 'description': 'from csv'},
+        {'user_id': 99, 'title': 'unknown'},
+        {'user_id': 'x', 'title': 'not a number'},
+        {'title': 'no user'},
+        {'user_id': 1, 'title': 'ok again'},
+    ]
+    report = database.bulk_add_records(rows, chunk_size=2)
+
+    assert report['inserted'] == 2
+    assert [(e['row'], e['error']) for e in report['errors']] == [(2, 'unknown user'), (3, 'unknown user'), (4, 'unknown user')]
+    assert [row[2] for row in database.get_records()] == ['ok', 'ok again']
+
+
+def test_import_reads_csv_and_jsonl(db, tmp_path):
+    csv_path = tmp_path / 'users.csv'
+    csv_path.write_text('name,email\nA,a@college.edu\nB,a@college.edu\n', encoding='utf-8')
+    jsonl_path = tmp_path / 'users.jsonl'
+    jsonl_path.write_text('{"name": "C", "email": "c@college.edu"}\n\n', encoding='utf-8')
+
+    assert database.bulk_add_users(database.read_rows(str(csv_path)))['inserted'] == 1
+    assert database.bulk_add_users(database.read_rows(str(jsonl_path)))['inserted'] == 1
+    assert len(database.get_users()) == 2
+
+
+def test_pages_cover_every_row_once(db):
+    for i in range(25):
+        database.add_user(f"User {i}", f"user{i}@example.com")
+    for limit in (1, 7, 25, 100):
+        assert [row[0] for row in database.iter_users(limit)] == list(range(1, 26))
+    rows, cursor = database.get_users_page(0, 25)
+    assert len(rows) == 25 and cursor is None
+    rows, cursor = database.get_users_page(0, 10)
+    assert cursor == 10 and database.get_users_page(cursor, 10)[0][0][0] == 11
+
+
+def test_record_pages_filter_by_user(db):
+    database.add_user('A', 'a@college.edu')
+    database.add_user('B', 'b@college.edu')
+    for i in range(9):
+        database.add_record(1 + i % 2, f'title {i}', '')
+    assert [row[2] for row in database.iter_records(2, user_id=2)] == ['title 1', 'title 3', 'title 5', 'title 7']
+    assert len(list(database.iter_records(4))) == 9
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_limits_below_one_are_rejected(db, limit):
+    with pytest.raises(ValueError):
+        database.get_users_page(0, limit)
+    with pytest.raises(ValueError):
+        database.get_records_page(0, limit)
@@ -0,0 +1,101 @@
+"""InterviewStore: running scores, restarts, and re-scoring answers that only got a fallback"""
+import asyncio
+
+import pytest
+
+import mock_interview_engine
+from evaluation_cache import EvaluationCache
+from interview_store import InterviewStore
+from mock_interview_engine import MockInterviewEngine
+
+QUESTIONS = [('What is Python?', 'Python'), ('What is SQL?', 'SQL')]
+
+
+class Unavailable:
+    async def evaluate(self, question, answer):
+        raise RuntimeError('evaluator down')
+
+
+class Fixed:
+    def __init__(self, score=8):
+        self.score = score
+        self.calls = 0
+
+    async def evaluate(self, question, answer):
+        self.calls += 1
+        return {'score': self.score, 'feedback': 'ok', 'strengths': [], 'improvements': []}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'interviews.db')
+
+
+@pytest.fixture
+def store(db_path):
+    store = InterviewStore(db_path)
+    yield store
+    store.close()
+
+
+def engine(store, backend):
+    return MockInterviewEngine(backend=backend, cache=EvaluationCache(), store=store)
+
+
+def test_running_averages_match_the_stored_answers(store):
+    scores = {'Python': [], 'SQL': []}
+    for session_no in range(5):
+        session = store.create_session(1, QUESTIONS)
+        for position, (_, skill) in enumerate(QUESTIONS):
+            score = 10 * session_no + position
+            summary = store.record_answer(session, position, 'answer', {'score': score})
+            scores[skill].append(score)
+        assert summary['status'] == 'completed'
+
+    averages = {row['skill']: row for row in store.skill_scores(1)}
+    for skill, values in scores.items():
+        assert averages[skill]['attempts'] == len(values)
+        assert averages[skill]['average_score'] == pytest.approx(sum(values) / len(values))
+        assert averages[skill]['best_score'] == max(values)
+        assert [row[2] for row in store.skill_history(skill, user_id=1)] == values
+
+
+def test_unfinished_sessions_survive_a_restart(db_path):
+    store = InterviewStore(db_path)
+    session = store.create_session(7, QUESTIONS)
+    store.record_answer(session, 0, 'answer', {'score': 6})
+    store.close()
+
+    reopened = InterviewStore(db_path)
+    assert [s['id'] for s in reopened.active_sessions(7)] == [session]
+    questions = reopened.get_session(session)['questions']
+    assert [q['score'] for q in questions] == [6, None]
+    assert set(reopened.asked_questions(7)) == {q for q, _ in QUESTIONS}
+    reopened.close()
+
+
+def test_fallback_answers_are_scored_again(store, monkeypatch):
+    # No backoff between the retries that end in a fallback
+    monkeypatch.setattr(mock_interview_engine.random, 'uniform', lambda a, b: 0.0)
+    session = store.create_session(1, QUESTIONS)
+    result = asyncio.run(engine(store, Unavailable()).submit_answers(session, ['a', 'b']))
+    assert [e['evaluation'].get('fallback') for e in result['evaluations']] == [True, True]
+    assert store.get_session(session)['scored_count'] == 0
+
+    result = asyncio.run(engine(store, Fixed(8)).submit_answers(session, ['a', 'b']))
+    assert result['score'] == 8
+    summary = store.get_session(session)
+    assert (summary['answered_count'], summary['scored_count']) == (2, 2)
+    assert [s['attempts'] for s in store.skill_scores(1)] == [1, 1]
+
+
+def test_scored_answers_are_final(store):
+    session = store.create_session(1, QUESTIONS)
+    store.record_answer(session, 0, 'a', {'score': 5})
+    with pytest.raises(ValueError):
+        store.record_answer(session, 0, 'a', {'score': 9})
+
+    backend = Fixed(9)
+    result = asyncio.run(engine(store, backend).submit_answers(session, ['a', 'b']))
+    assert backend.calls == 1
+    assert [e['evaluation']['score'] for e in result['evaluations']] == [5, 9]
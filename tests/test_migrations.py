@@ -0,0 +1,93 @@
+"""Upgrading databases written by earlier versions of the app"""
+import json
+import sqlite3
+
+import database
+from migrations import LATEST_VERSION, check_query_plans, migrate, schema_version
+
+
+def test_fresh_database_reaches_the_latest_version(db):
+    with database.connection() as conn:
+        assert schema_version(conn) == LATEST_VERSION
+        assert migrate(conn) == []
+        assert check_query_plans(conn) == []
+
+
+def test_legacy_flask_users_table_is_rebuilt(tmp_path, monkeypatch):
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email VARCHAR(120) NOT NULL UNIQUE,
+            password_hash VARCHAR(200) NOT NULL,
+            full_name VARCHAR(100) NOT NULL,
+            role VARCHAR(20) NOT NULL,
+            created_at DATETIME,
+            last_login DATETIME
+        );
+        INSERT INTO users (email, password_hash, full_name, role, created_at)
+        VALUES ('tpo@college.edu', 'x', 'TPO', 'tpo', '2024-01-01'),
+               ('student@college.edu', 'y', 'Student', 'student', '2024-01-02');
+        DELETE FROM users WHERE id = 1;
+    """)
+    conn.commit()
+    migrate(conn)
+    migrate(conn)
+
+    columns = {row[1]: row for row in conn.execute("PRAGMA table_info(users)")}
+    assert not columns['password_hash'][3]
+    assert conn.execute("SELECT id, email, role, last_login FROM users").fetchall() == \
+        [(2, 'student@college.edu', 'student', None)]
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    conn.close()
+
+    monkeypatch.setattr(database, 'DB_NAME', path)
+    database.add_user('New', 'new@college.edu')
+    # AUTOINCREMENT keeps counting past deleted ids
+    assert [row[0] for row in database.iter_users()] == [2, 3]
+    database.close_pool()
+
+
+def test_old_app_db_users_name_column_is_renamed(tmp_path, monkeypatch):
+    path = str(tmp_path / 'app.db')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                            email TEXT UNIQUE NOT NULL, created_at TEXT);
+        INSERT INTO users (name, email) VALUES ('Asha', 'asha@college.edu');
+    """)
+    conn.close()
+    monkeypatch.setattr(database, 'DB_NAME', path)
+    database.create_tables()
+    assert [row[1] for row in database.get_users()] == ['Asha']
+    database.close_pool()
+
+
+def test_legacy_json_skills_are_copied_and_canonicalized(tmp_path, monkeypatch):
+    path = str(tmp_path / 'placementpro.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT UNIQUE NOT NULL,"
+                 " full_name TEXT NOT NULL)")
+    conn.execute("CREATE TABLE student_profiles (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER UNIQUE,"
+                 " skills TEXT DEFAULT '[]')")
+    conn.execute("INSERT INTO users (email, full_name) VALUES ('a@college.edu', 'A'), ('b@college.edu', 'B')")
+    conn.executemany("INSERT INTO student_profiles (user_id, skills) VALUES (?, ?)", [
+        (1, json.dumps([{'skill_name': 'Pyhton', 'proficiency': 70}, {'skill_name': 'ML', 'proficiency': 40},
+                        {'skill_name': 'Rust', 'proficiency': 55}])),
+        (2, json.dumps(['Statistcs', {'skill_name': 'python', 'proficiency': 90},
+                        {'skill_name': 'Pyhton', 'proficiency': 10}])),
+    ])
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(database, 'DB_NAME', path)
+    database.create_tables()
+    with database.connection() as conn:
+        rows = conn.execute("SELECT user_id, skill, proficiency FROM student_skills ORDER BY 1, 2").fetchall()
+    database.close_pool()
+    # Unknown skills keep their name; a student's canonical entry wins over a typo
+    assert rows == [
+        (1, 'Machine Learning', 40), (1, 'Python', 70), (1, 'Rust', 55),
+        (2, 'Python', 90), (2, 'Statistics', 0),
+    ]
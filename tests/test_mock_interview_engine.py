@@ -0,0 +1,171 @@
+"""MockInterviewEngine: batched evaluation with retries, timeouts and fallbacks"""
+import asyncio
+
+import pytest
+
+from evaluation_cache import EvaluationCache
+from mock_interview_engine import MockInterviewEngine
+
+
+class Backend:
+    """Scores len(answer); fails the first `failures` calls per answer, or sleeps `delay` seconds"""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = {}
+        self.running = self.peak = 0
+
+    async def evaluate(self, question, answer):
+        self.calls[answer] = self.calls.get(answer, 0) + 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.calls[answer] <= self.failures:
+                raise ConnectionError('evaluator unavailable')
+            return {'score': len(answer), 'feedback': 'ok', 'strengths': [], 'improvements': []}
+        finally:
+            self.running -= 1
+
+
+def make_engine(backend):
+    return MockInterviewEngine(backend=backend, cache=EvaluationCache())
+
+
+def batch(engine, items, **options):
+    async def collect():
+        return [result async for result in engine.evaluate_batch(items, backoff=0, **options)]
+    return dict(asyncio.run(collect()))
+
+
+def test_every_position_is_yielded_once():
+    items = [('What is SQL?', 'x' * n) for n in range(1, 40)]
+    results = batch(make_engine(Backend()), items)
+    assert sorted(results) == list(range(len(items)))
+    assert all(results[i]['score'] == len(answer) for i, (_, answer) in enumerate(items))
+
+
+def test_failed_calls_are_retried():
+    backend = Backend(failures=2)
+    results = batch(make_engine(backend), [('What is SQL?', 'joins')], retries=2)
+    assert results[0]['score'] == 5
+    assert backend.calls['joins'] == 3
+
+
+def test_exhausted_retries_fall_back():
+    backend = Backend(failures=10)
+    engine = make_engine(backend)
+    results = batch(engine, [('What is SQL?', 'joins')], retries=1)
+    assert results[0]['fallback'] and results[0]['score'] is None
+    assert backend.calls['joins'] == 2
+    # Fallbacks are never cached
+    assert engine.cache.get('What is SQL?', 'joins') is None
+
+
+def test_slow_calls_time_out_into_a_fallback():
+    results = batch(make_engine(Backend(delay=1.0)), [('What is SQL?', 'joins')], timeout=0.02, retries=1)
+    assert results[0]['fallback']
+
+
+def test_concurrency_is_bounded():
+    backend = Backend(delay=0.01)
+    batch(make_engine(backend), [('What is SQL?', f'answer {i}') for i in range(30)], concurrency=4)
+    assert backend.peak == 4
+
+
+def test_duplicate_answers_share_one_call():
+    backend = Backend(delay=0.01)
+    engine = make_engine(backend)
+    results = batch(engine, [('What is SQL?', 'joins'), ('what is  SQL?', 'Joins'), ('What is SQL?', 'joins')])
+    assert backend.calls == {'joins': 1}
+    assert len({r['score'] for r in results.values()}) == 1
+    batch(engine, [('What is SQL?', 'joins')])
+    assert backend.calls == {'joins': 1}
+
+
+def test_local_backends_are_scored_in_chunks():
+    class Local:
+        def __init__(self):
+            self.chunks = []
+
+        def score_batch(self, pairs):
+            self.chunks.append(len(pairs))
+            return [{'score': len(answer)} for _, answer in pairs]
+
+    backend = Local()
+    results = batch(make_engine(backend), [('What is SQL?', 'x' * n) for n in range(1, 6)])
+    assert backend.chunks == [5]
+    assert [results[i]['score'] for i in range(5)] == [1, 2, 3, 4, 5]
+
+
+class Cancellable(Backend):
+    """Answers starting with 'slow' take `delay` seconds, others none; counts cancelled calls"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.slow_delay = delay
+        self.cancelled = 0
+
+    async def evaluate(self, question, answer):
+        self.delay = self.slow_delay if answer.startswith('slow') else 0.0
+        try:
+            return await super().evaluate(question, answer)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def test_cancelled_caller_does_not_cancel_shared_evaluation():
+    backend = Cancellable(delay=0.05)
+    engine = make_engine(backend)
+
+    async def run():
+        first = asyncio.ensure_future(engine.evaluate_answer('What is SQL?', 'slow joins'))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(engine.evaluate_answer('What is SQL?', 'slow joins'))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run())['score'] == 10
+    assert backend.calls == {'slow joins': 1} and backend.cancelled == 0
+    assert engine.inflight == {}
+    assert engine.cache.get('What is SQL?', 'slow joins')['score'] == 10
+
+
+def test_last_waiter_leaving_cancels_the_evaluation():
+    backend = Cancellable(delay=0.05)
+    engine = make_engine(backend)
+
+    async def run():
+        waiter = asyncio.ensure_future(engine.evaluate_answer('What is SQL?', 'slow joins'))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+        # A new caller starts over instead of joining the cancelled call
+        return await engine.evaluate_answer('What is SQL?', 'slow joins')
+
+    assert asyncio.run(run())['score'] == 10
+    assert backend.cancelled == 1 and backend.calls == {'slow joins': 2}
+    assert engine.inflight == {}
+
+
+def test_stopping_a_batch_early_cancels_its_backend_calls():
+    backend = Cancellable(delay=10.0)
+    engine = make_engine(backend)
+    items = [('What is SQL?', 'quick')] + [('What is SQL?', f'slow answer {i}') for i in range(8)]
+
+    async def run():
+        results = engine.evaluate_batch(items, concurrency=4, backoff=0)
+        async for position, _ in results:
+            assert position == 0
+            break
+        await results.aclose()
+        await asyncio.sleep(0.01)
+        # Checked before asyncio.run cancels whatever is left over
+        assert backend.running == 0 and engine.inflight == {}
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    # The quick answer freed its slot for a fourth slow call; all four were cancelled
+    assert backend.calls['quick'] == 1 and backend.cancelled == 4
@@ -0,0 +1,101 @@
+"""nightly_pipeline.py: checkpoints, resuming and failed runs (chunks run inline with workers=1)"""
+import sqlite3
+
+import pytest
+
+import nightly_pipeline
+
+CHUNK = 150
+PROCESS_CHUNK = nightly_pipeline.process_chunk
+
+
+def insights(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT user_id, run_id, target_role, readiness, skill_gaps, recommendations, questions
+        FROM student_insights ORDER BY user_id
+    """).fetchall()
+    conn.close()
+    return rows
+
+
+def run_status(db_path):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT id, status, checkpoint, students FROM pipeline_runs ORDER BY id DESC LIMIT 1").fetchone()
+    conn.close()
+    return row
+
+
+def failing_after(calls, monkeypatch):
+    """Make process_chunk raise once it has written `calls` chunks"""
+    done = []
+
+    def flaky(*args):
+        if len(done) == calls:
+            raise RuntimeError('worker crashed')
+        done.append(args)
+        return PROCESS_CHUNK(*args)
+
+    monkeypatch.setattr(nightly_pipeline, 'process_chunk', flaky)
+    return done
+
+
+@pytest.fixture
+def copy_of(tmp_path):
+    """copy_of(db_path) -> path of a second database with the same contents"""
+    def copy(db_path):
+        target = str(tmp_path / 'copy.db')
+        source, destination = sqlite3.connect(db_path), sqlite3.connect(target)
+        source.backup(destination)
+        source.close()
+        destination.close()
+        return target
+    return copy
+
+
+def test_full_run_covers_every_student(cohort, db):
+    report = nightly_pipeline.run_pipeline(db, workers=1, chunk_size=CHUNK)
+    assert report['students'] == report['total'] == len(cohort)
+    assert report['chunks'] == 3
+    assert [row[0] for row in insights(db)] == cohort
+    assert run_status(db) == (report['run_id'], 'completed', cohort[-1], len(cohort))
+
+
+def test_resumed_run_matches_an_uninterrupted_one(cohort, db, copy_of, monkeypatch):
+    uninterrupted = copy_of(db)
+    nightly_pipeline.run_pipeline(uninterrupted, workers=1, chunk_size=CHUNK)
+
+    # Inline chunks run as they are submitted: two are written before the third fails
+    failing_after(2, monkeypatch)
+    with pytest.raises(RuntimeError):
+        nightly_pipeline.run_pipeline(db, workers=1, chunk_size=CHUNK)
+    run_id, status, checkpoint, students = run_status(db)
+    assert (status, checkpoint, students) == ('failed', cohort[2 * CHUNK - 1], 2 * CHUNK)
+
+    monkeypatch.setattr(nightly_pipeline, 'process_chunk', PROCESS_CHUNK)
+    report = nightly_pipeline.run_pipeline(db, workers=1, chunk_size=CHUNK)
+    assert (report['run_id'], report['resumed_from']) == (run_id, checkpoint)
+    assert report['students'] == len(cohort) - 2 * CHUNK
+    assert run_status(db) == (run_id, 'completed', cohort[-1], len(cohort))
+    assert insights(db) == insights(uninterrupted)
+
+
+def test_fresh_run_ignores_the_checkpoint(cohort, db, monkeypatch):
+    failing_after(1, monkeypatch)
+    with pytest.raises(RuntimeError):
+        nightly_pipeline.run_pipeline(db, workers=1, chunk_size=CHUNK)
+    monkeypatch.setattr(nightly_pipeline, 'process_chunk', PROCESS_CHUNK)
+
+    report = nightly_pipeline.run_pipeline(db, workers=1, chunk_size=CHUNK, resume=False)
+    assert (report['run_id'], report['resumed_from'], report['students']) == (2, 0, len(cohort))
+
+
+def test_worker_setup_failure_is_recorded(cohort, db, monkeypatch):
+    def broken(*args):
+        raise OSError('model file missing')
+
+    monkeypatch.setattr(nightly_pipeline, '_init_worker', broken)
+    with pytest.raises(OSError):
+        nightly_pipeline.run_pipeline(db, workers=1, chunk_size=CHUNK)
+    assert run_status(db) == (1, 'failed', 0, 0)
+    assert insights(db) == []
@@ -0,0 +1,91 @@
+"""OfflineEvaluator: scores depend only on the (question, answer) pair, never on what was scored before"""
+import asyncio
+import json
+import random
+
+import pytest
+
+from offline_evaluator import REFERENCE_ANSWERS_PATH, OfflineEvaluator
+from question_bank import QuestionBank
+
+UNSEEN = [
+    ("Explain how a bloom filter trades memory for false positives.",
+     "A bloom filter hashes each key into a bit array so lookups may return false positives but never false negatives"),
+    ("What does Kubernetes use etcd for?", "etcd stores the cluster state as a consistent key value store"),
+    ("Describe quaternion rotation.", "quaternions avoid gimbal lock when composing rotations"),
+]
+
+
+FILLER = "so basically I think that this is used a lot in practice and it depends".split()
+
+
+def make_answers(count, seed):
+    """Answers sampled from each question's reference answer words, plus filler"""
+    rng = random.Random(seed)
+    with open(REFERENCE_ANSWERS_PATH, encoding='utf-8') as f:
+        references = json.load(f)
+    questions = list(references)
+    pairs = []
+    for _ in range(count):
+        question = rng.choice(questions)
+        words = references[question]['answer'].split()
+        kept = rng.sample(words, rng.randint(0, len(words))) + rng.choices(FILLER, k=rng.randint(0, 20))
+        rng.shuffle(kept)
+        pairs.append((question, ' '.join(kept)))
+    return pairs
+
+
+@pytest.fixture(scope='module')
+def evaluator():
+    return OfflineEvaluator(QuestionBank.load().as_dict())
+
+
+@pytest.fixture(scope='module')
+def pairs():
+    # Half the answers borrow words that only the unseen questions use
+    rng = random.Random(11)
+    borrowed = ' '.join(q + ' ' + a for q, a in UNSEEN).split()
+    return [
+        (question, answer + ' ' + ' '.join(rng.sample(borrowed, 8)) if i % 2 else answer)
+        for i, (question, answer) in enumerate(make_answers(300, seed=11))
+    ]
+
+
+def test_batch_matches_one_at_a_time(evaluator, pairs):
+    single = [asyncio.run(evaluator.evaluate(q, a)) for q, a in pairs[:100]]
+    assert evaluator.score_batch(pairs)[:100] == single
+
+
+def test_unseen_questions_do_not_move_bank_scores(pairs):
+    # Regression: scoring a question outside the bank used to grow the shared
+    # vocabulary and IDF, so later scores depended on call order
+    fresh = OfflineEvaluator(QuestionBank.load().as_dict())
+    before = fresh.score_batch(pairs)
+    unseen = fresh.score_batch(UNSEEN)
+    assert fresh.score_batch(pairs) == before
+    assert fresh.score_batch(UNSEEN) == unseen
+    assert OfflineEvaluator(QuestionBank.load().as_dict()).score_batch(UNSEEN) == unseen
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_scores_do_not_depend_on_order(evaluator, pairs, seed):
+    mixed = pairs[:60] + UNSEEN
+    expected = dict(zip(mixed, evaluator.score_batch(mixed)))
+
+    shuffled = list(mixed)
+    random.Random(seed).shuffle(shuffled)
+    other = OfflineEvaluator(QuestionBank.load().as_dict())
+    for pair, evaluation in zip(shuffled, other.score_batch(shuffled)):
+        assert evaluation == expected[pair]
+    for question, answer in reversed(shuffled):
+        assert asyncio.run(other.evaluate(question, answer)) == expected[(question, answer)]
+
+
+def test_sql_statement_keywords_are_not_stopwords(evaluator):
+    question = 'How do you optimize a slow SQL query?'
+    with_explain, without = evaluator.score_batch([
+        (question, 'Read the plan with EXPLAIN, add an index to avoid a full scan'),
+        (question, 'Read the plan, add an index to avoid a full scan'),
+    ])
+    assert 'explain' in with_explain['strengths'][0]
+    assert with_explain['score'] > without['score']
@@ -0,0 +1,49 @@
+"""ProfileIndex against sklearn StandardScaler + NearestNeighbors (benchmarks/bench_profile_index.py)"""
+import numpy as np
+import pytest
+
+from profile_index import BRUTE_FORCE_MAX, ProfileIndex
+from role_catalog import RoleCatalog
+from skill_analyzer import NUM_SKILLS, SKILL_LABELS
+
+preprocessing = pytest.importorskip('sklearn.preprocessing')
+neighbors = pytest.importorskip('sklearn.neighbors')
+
+
+def reference(profiles, n_neighbors):
+    scaler = preprocessing.StandardScaler().fit(profiles)
+    model = neighbors.NearestNeighbors(n_neighbors=n_neighbors, metric='euclidean').fit(scaler.transform(profiles))
+    return lambda X: model.kneighbors(scaler.transform(X))
+
+
+@pytest.mark.parametrize('profiles, backend', [
+    ('catalog', 'auto'),
+    (200, 'brute'),
+    (BRUTE_FORCE_MAX + 500, 'auto'),
+    (300, 'kd_tree'),
+])
+@pytest.mark.parametrize('n_neighbors', [1, 2, 6])
+def test_matches_sklearn(profiles, backend, n_neighbors):
+    rng = np.random.default_rng(42)
+    if profiles == 'catalog':
+        profiles = RoleCatalog.load(skills=SKILL_LABELS).vectors
+    else:
+        profiles = rng.uniform(40, 100, size=(profiles, NUM_SKILLS))
+    # The role catalog holds only a few profiles
+    n_neighbors = min(n_neighbors, len(profiles))
+    X = rng.uniform(0, 100, size=(1000, NUM_SKILLS))
+
+    expected_dist, expected_idx = reference(profiles, n_neighbors)(X)
+    index = ProfileIndex(n_neighbors=n_neighbors, backend=backend).fit(profiles)
+    actual_dist, actual_idx = index.kneighbors(index.transform(X))
+
+    assert np.array_equal(expected_idx, actual_idx)
+    assert np.allclose(expected_dist, actual_dist)
+
+
+def test_constant_columns_are_left_unscaled():
+    profiles = np.random.default_rng(0).uniform(40, 100, size=(50, NUM_SKILLS))
+    profiles[:, 3] = 70.0
+    scaler = preprocessing.StandardScaler().fit(profiles)
+    index = ProfileIndex().fit(profiles)
+    assert np.allclose(index.scale_, scaler.scale_)
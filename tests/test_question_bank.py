@@ -0,0 +1,53 @@
+"""Weighted question sampling without replacement, and the engine's no-repeat rounds"""
+import random
+from collections import Counter
+
+from evaluation_cache import EvaluationCache
+from mock_interview_engine import MockInterviewEngine
+from question_bank import QuestionBank
+
+TINY = {'Python': ['What is a decorator?', 'What is the GIL?'], 'SQL': ['What is a JOIN?']}
+
+
+def test_sample_stops_when_a_tiny_bank_runs_out():
+    bank = QuestionBank(TINY)
+    ids = bank.sample({'Python': 10}, 50, rng=random.Random(1))
+    assert sorted(ids) == [0, 1, 2]
+    assert bank.sample({}, 5, exclude=ids) == []
+    assert bank.sample({}, 5, exclude=[0, 1], rng=random.Random(1)) == [2]
+
+
+def test_zero_weight_skills_are_used_only_when_nothing_else_is_left():
+    bank = QuestionBank(TINY)
+    ids = bank.sample({'Python': 1, 'SQL': 0}, 3, default_weight=0, rng=random.Random(2))
+    assert sorted(ids[:2]) == [0, 1] and ids[2] == 2
+    assert bank.sample({}, 3, default_weight=0, rng=random.Random(2)) != []
+
+
+def test_empty_bank():
+    assert QuestionBank({}).sample({'Python': 1}, 3) == []
+
+
+def test_draws_follow_skill_weights():
+    bank = QuestionBank({'Python': [f'python {i}' for i in range(100)], 'SQL': [f'sql {i}' for i in range(100)]})
+    rng = random.Random(3)
+    skills = Counter(bank.question_skill[qid] for _ in range(2000) for qid in bank.sample({'Python': 3, 'SQL': 1}, 1, rng=rng))
+    assert 0.7 < skills[0] / 2000 < 0.8
+
+
+def test_duplicates_and_blank_texts_are_kept_once():
+    bank = QuestionBank({'Python': ['What is the GIL?', ' What is the GIL? ', ''], 'python ': ['What is PEP 8?']})
+    assert bank.texts == ['What is the GIL?', 'What is PEP 8?']
+    assert bank.as_dict() == {'Python': ['What is the GIL?', 'What is PEP 8?']}
+
+
+def test_engine_does_not_repeat_questions_before_the_bank_is_used_up():
+    bank = QuestionBank(TINY)
+    engine = MockInterviewEngine(backend=object(), cache=EvaluationCache(), question_bank=bank)
+    gaps = [{'skill': 'Python', 'gap': 30}]
+    first = engine.generate_questions(gaps, 2, student_id=1, rng=random.Random(4))
+    second = engine.generate_questions(gaps, 2, student_id=1, rng=random.Random(4))
+    assert len(set(first)) == 2 and len(set(second)) == 2
+    # The second interview used up the bank and started a new round
+    assert set(first) | set(second) == set(bank.texts)
+    assert len(engine.generate_questions(gaps, 10, rng=random.Random(4))) == 3
@@ -0,0 +1,50 @@
+"""Cohort analysis and recommendations must agree exactly with handling one student at a time"""
+import numpy as np
+import pytest
+
+from conftest import ROLES
+from skill_analyzer import NUM_SKILLS
+
+
+def test_analyze_cohort_matches_per_student(analyzer, skill_lists):
+    students = skill_lists(500, seed=7)
+    assert analyzer.analyze_cohort(students) == [analyzer.analyze_skill_gaps(s) for s in students]
+
+
+def test_empty_cohort(analyzer):
+    assert analyzer.analyze_cohort([]) == []
+
+
+def test_one_student_matrix_matches_cohort_row(analyzer, skill_lists):
+    students = skill_lists(50, seed=3)
+    matrix = analyzer.build_skill_matrix(students)
+    for row, student in zip(matrix, students):
+        assert np.array_equal(analyzer.build_skill_matrix([student])[0], row)
+
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_recommend_cohort_matches_per_student(analyzer, seed):
+    rng = np.random.default_rng(seed)
+    matrix = rng.integers(0, 101, (500, NUM_SKILLS)).astype(float)
+    roles = rng.choice(ROLES, len(matrix)).tolist()
+    standards = analyzer.nearest_standards(matrix, roles)
+    gaps = analyzer.analyze_matrix(matrix, roles, standards)
+
+    expected = [analyzer.generate_recommendations(g) for g in gaps]
+    assert analyzer.recommend_cohort(matrix, roles, standards) == expected
+
+
+def test_one_level_for_every_skill(analyzer):
+    matrix = np.random.default_rng(3).integers(0, 101, (50, NUM_SKILLS)).astype(float)
+    gaps = analyzer.analyze_matrix(matrix, 'Data Scientist')
+    expected = [analyzer.generate_recommendations(g, student_level='advanced') for g in gaps]
+    assert analyzer.recommend_cohort(matrix, 'Data Scientist', student_level='advanced') == expected
+
+
+def test_unknown_student_level_names_the_allowed_ones(analyzer):
+    matrix = np.zeros((2, NUM_SKILLS))
+    gaps = analyzer.analyze_matrix(matrix, 'Data Scientist')[0]
+    with pytest.raises(ValueError, match='beginner, intermediate, advanced'):
+        analyzer.generate_recommendations(gaps, student_level='expert')
+    with pytest.raises(ValueError, match="'Advanced'"):
+        analyzer.recommend_cohort(matrix, student_level='Advanced')
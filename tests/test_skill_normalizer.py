@@ -0,0 +1,55 @@
+"""Free-text skill names onto the analyzer's skill dimensions: exact, folded and typo matches"""
+import pytest
+
+from skill_analyzer import SKILL_LABELS, SKILL_MAPPING, SKILL_NORMALIZER
+from skill_normalizer import SkillNormalizer, _edit_distance, fold
+
+
+@pytest.mark.parametrize('name', list(SKILL_MAPPING) + SKILL_LABELS)
+def test_every_alias_and_label_matches_exactly(name):
+    expected = SKILL_MAPPING.get(name, SKILL_LABELS.index(name) if name in SKILL_LABELS else None)
+    assert SKILL_NORMALIZER.index(name) == expected
+
+
+@pytest.mark.parametrize('name, label', [
+    ('  python  3 ', 'Python'),
+    ('machine-learning', 'Machine Learning'),
+    ('Deep-Learning!', 'Deep Learning'),
+    ('AWS ', 'Cloud Computing'),
+    ('sql', 'SQL'),
+])
+def test_case_and_punctuation_are_folded(name, label):
+    assert SKILL_NORMALIZER.canonical(name) == label
+
+
+@pytest.mark.parametrize('name, label', [
+    ('Pyhton', 'Python'),
+    ('Machine Lerning', 'Machine Learning'),
+    ('Statistcs', 'Statistics'),
+    ('Commmunication', 'Communication'),
+    ('Tensorflwo', 'Deep Learning'),
+    ('Postgre SQL', 'SQL'),
+])
+def test_typos_match_the_closest_alias(name, label):
+    assert SKILL_NORMALIZER.canonical(name) == label
+
+
+@pytest.mark.parametrize('name', ['R', 'C++', 'Go', 'Java', 'Excel', 'Rust', 'Docker', 'Pandas', 'xyz', '', 12, None])
+def test_unrelated_and_short_names_do_not_match(name):
+    assert SKILL_NORMALIZER.canonical(name) is None
+
+
+def test_fold_keeps_plus_and_hash():
+    assert fold('  C++ / C#  ') == 'c++ c#'
+
+
+def test_edit_distance_counts_swaps_as_one_edit():
+    assert _edit_distance('python', 'pyhton', 2) == 1
+    assert _edit_distance('python', 'java', 1) == 2
+
+
+def test_lookups_are_memoized():
+    normalizer = SkillNormalizer(SKILL_MAPPING, SKILL_LABELS, cache_size=16)
+    normalizer.canonical('Pyhton')
+    normalizer.canonical('Pyhton')
+    assert normalizer.cache_info().hits == 1